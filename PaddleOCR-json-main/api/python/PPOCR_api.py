@@ -3,15 +3,58 @@
 # https://github.com/hiroi-sora/PaddleOCR-json
 
 import os
+import asyncio  # 异步接口
 import socket  # 套接字
+import select  # 检查空闲连接
 import atexit  # 退出处理
 import subprocess  # 进程，管道
 import re  # regex
+import threading  # 并发发送
+from queue import Queue
+from collections import deque
 from json import loads as jsonLoads, dumps as jsonDumps
 from sys import platform as sysPlatform  # popen静默模式
 from base64 import b64encode  # base64 编码
 
 
+def buildCommand(exePath: str, modelsPath: str = None, argument: dict = None):
+    """生成启动识别器进程的命令行。\n
+    `return`: (命令行列表, 工作目录)"""
+    exePath = os.path.abspath(exePath)
+    cwd = os.path.abspath(os.path.join(exePath, os.pardir))  # 获取exe父文件夹
+    cmds = [exePath]
+    # 处理启动参数
+    if modelsPath is not None:
+        if os.path.exists(modelsPath) and os.path.isdir(modelsPath):
+            cmds += ["--models_path", os.path.abspath(modelsPath)]
+        else:
+            raise Exception(
+                f"Input modelsPath doesn't exits or isn't a directory. modelsPath: [{modelsPath}]"
+            )
+    if isinstance(argument, dict):
+        for key, value in argument.items():
+            # Popen() 要求输入list里所有的元素都是 str 或 bytes
+            if isinstance(value, bool):
+                cmds += [f"--{key}={value}"]  # 布尔参数必须键和值连在一起
+            elif isinstance(value, str):
+                cmds += [f"--{key}", value]
+            else:
+                cmds += [f"--{key}", str(value)]
+    return cmds, cwd
+
+
+def hiddenStartupInfo():
+    """Windows下隐藏子进程控制台窗口的启动信息，其他平台返回None"""
+    startupinfo = None
+    if "win32" in str(sysPlatform).lower():
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags = (
+            subprocess.CREATE_NEW_CONSOLE | subprocess.STARTF_USESHOWWINDOW
+        )
+        startupinfo.wShowWindow = subprocess.SW_HIDE
+    return startupinfo
+
+
 class PPOCR_pipe:  # 调用OCR（管道模式）
     def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None):
         """初始化识别器（管道模式）。\n
@@ -22,35 +65,10 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
         # 私有成员变量
         self.__ENABLE_CLIPBOARD = False
 
-        exePath = os.path.abspath(exePath)
-        cwd = os.path.abspath(os.path.join(exePath, os.pardir))  # 获取exe父文件夹
-        cmds = [exePath]
-        # 处理启动参数
-        if modelsPath is not None:
-            if os.path.exists(modelsPath) and os.path.isdir(modelsPath):
-                cmds += ["--models_path", os.path.abspath(modelsPath)]
-            else:
-                raise Exception(
-                    f"Input modelsPath doesn't exits or isn't a directory. modelsPath: [{modelsPath}]"
-                )
-        if isinstance(argument, dict):
-            for key, value in argument.items():
-                # Popen() 要求输入list里所有的元素都是 str 或 bytes
-                if isinstance(value, bool):
-                    cmds += [f"--{key}={value}"]  # 布尔参数必须键和值连在一起
-                elif isinstance(value, str):
-                    cmds += [f"--{key}", value]
-                else:
-                    cmds += [f"--{key}", str(value)]
+        cmds, cwd = buildCommand(exePath, modelsPath, argument)
         # 设置子进程启用静默模式，不显示控制台窗口
         self.ret = None
-        startupinfo = None
-        if "win32" in str(sysPlatform).lower():
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags = (
-                subprocess.CREATE_NEW_CONSOLE | subprocess.STARTF_USESHOWWINDOW
-            )
-            startupinfo.wShowWindow = subprocess.SW_HIDE
+        startupinfo = hiddenStartupInfo()
         self.ret = subprocess.Popen(  # 打开管道
             cmds,
             cwd=cwd,
@@ -81,15 +99,21 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
         """传入指令字典，发送给引擎进程。\n
         `writeDict`: 指令字典。\n
         `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
+        writeStr = jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n"
+        return self.runRaw(writeStr.encode("utf-8"))
+
+    def runRaw(self, writeBytes: bytes):
+        """传入已序列化为一行JSON的指令字节串，发送给引擎进程。\n
+        `writeBytes`: 以换行符结尾的指令字节串。\n
+        `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
         # 检查子进程
         if not self.ret:
             return {"code": 901, "data": f"引擎实例不存在。"}
         if not self.ret.poll() == None:
             return {"code": 902, "data": f"子进程已崩溃。"}
         # 输入信息
-        writeStr = jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n"
         try:
-            self.ret.stdin.write(writeStr.encode("utf-8"))
+            self.ret.stdin.write(writeBytes)
             self.ret.stdin.flush()
         except Exception as e:
             return {
@@ -109,6 +133,12 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
                 "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{getStr}]",
             }
 
+    def runRawMany(self, writeBytesList: list):
+        """依次发送多条已序列化的指令，按顺序返回结果列表。\n
+        `writeBytesList`: 指令字节串列表。\n
+        `return`:  [{"code": 识别码, "data": 内容列表或错误信息字符串}, ...]\n"""
+        return [self.runRaw(writeBytes) for writeBytes in writeBytesList]
+
     def run(self, imgPath: str):
         """对一张本地图片进行文字识别。\n
         `exePath`: 图片路径。\n
@@ -135,8 +165,19 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
         """对一张图片的字节流信息进行文字识别。\n
         `imageBytes`: 图片字节流。\n
         `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
-        imageBase64 = b64encode(imageBytes).decode("utf-8")
-        return self.runBase64(imageBase64)
+        return self.runRaw(self.__bytesToLine(imageBytes))
+
+    def runBytesMany(self, imageBytesList: list):
+        """对多张图片的字节流信息进行文字识别，套接字模式下多条指令同时在途。\n
+        `imageBytesList`: 图片字节流列表。\n
+        `return`:  [{"code": 识别码, "data": 内容列表或错误信息字符串}, ...]\n"""
+        return self.runRawMany([self.__bytesToLine(b) for b in imageBytesList])
+
+    @staticmethod
+    def __bytesToLine(imageBytes) -> bytes:
+        """将图片字节流拼接为一行指令"""
+        # base64字符集无需JSON转义，直接拼接指令，省去字符串编解码和JSON序列化的拷贝
+        return b'{"image_base64":"' + b64encode(imageBytes) + b'"}\n'
 
     def exit(self):
         """关闭引擎子进程"""
@@ -177,12 +218,27 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
 class PPOCR_socket(PPOCR_pipe):
     """调用OCR（套接字模式）"""
 
-    def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None):
+    def __init__(
+        self,
+        exePath: str,
+        modelsPath: str = None,
+        argument: dict = None,
+        prefetch: int = 0,
+    ):
         """初始化识别器（套接字模式）。\n
         `exePath`: 识别器`PaddleOCR_json.exe`的路径。\n
         `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
-        `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json
+        `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json\n
+        `prefetch`: 预先建立并保持的空闲连接数。引擎每个连接只处理一条指令，
+        预连接把建立连接的开销隐藏在上一次识别期间。引擎按连接建立的顺序逐个处理，
+        空闲的预连接会占住引擎，因此引擎被多个客户端共享时应保持为0。
         """
+        # 连接管理
+        self.__prefetch = prefetch
+        self.__idleSockets = deque()  # 已建立、尚未发送指令的连接，按建立顺序排列
+        self.__socketLock = threading.Lock()  # 保证发送顺序与连接建立顺序一致
+        self.__recvHint = 65536  # 接收缓冲区初始大小，按历史最大响应自动增长
+
         # 处理参数
         if not argument:
             argument = {}
@@ -230,9 +286,9 @@ class PPOCR_socket(PPOCR_pipe):
     def getRunningMode(self) -> str:
         return self.__runningMode
 
-    def runDict(self, writeDict: dict):
-        """传入指令字典，发送给引擎进程。\n
-        `writeDict`: 指令字典。\n
+    def runRaw(self, writeBytes: bytes):
+        """传入已序列化为一行JSON的指令字节串，发送给引擎进程。\n
+        `writeBytes`: 以换行符结尾的指令字节串。\n
         `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
 
         # 仅在本地模式下检查引擎进程
@@ -242,35 +298,147 @@ class PPOCR_socket(PPOCR_pipe):
                 return {"code": 901, "data": f"子进程已崩溃。"}
 
         # 通信
-        writeStr = jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n"
         try:
-            # 创建TCP连接
-            clientSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            clientSocket = self.__sendRequest(writeBytes)
+            resData = self.__recvResponse(clientSocket)
+        except Exception as e:
+            return self.__errorResult(e)
+        return self.__loadResult(resData)
+
+    def runRawMany(self, writeBytesList: list):
+        """同时发送多条已序列化的指令，按顺序返回结果列表。\n
+        后台线程按顺序逐条建立连接并发送，当前线程按同样顺序读取响应，
+        引擎处理完一条后下一条指令已在连接中等待。\n
+        `writeBytesList`: 指令字节串列表。\n
+        `return`:  [{"code": 识别码, "data": 内容列表或错误信息字符串}, ...]\n"""
+        if self.__runningMode == "local":
+            if not self.ret.poll() == None:
+                return [{"code": 901, "data": f"子进程已崩溃。"} for _ in writeBytesList]
+
+        sentQueue = Queue()
+
+        def sender():
+            for writeBytes in writeBytesList:
+                try:
+                    sentQueue.put(self.__sendRequest(writeBytes))
+                except Exception as e:
+                    sentQueue.put(e)
+
+        threading.Thread(target=sender, daemon=True).start()
+
+        results = []
+        for _ in writeBytesList:
+            item = sentQueue.get()
+            if isinstance(item, Exception):
+                results.append(self.__errorResult(item))
+                continue
+            try:
+                resData = self.__recvResponse(item)
+            except Exception as e:
+                results.append(self.__errorResult(e))
+                continue
+            results.append(self.__loadResult(resData))
+        return results
+
+    def __connect(self):
+        """建立一个到引擎的TCP连接"""
+        clientSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
             clientSocket.connect((self.ip, self.port))
-            # 发送数据
-            clientSocket.sendall(writeStr.encode())
-            # 发送完所有数据，关闭我方套接字，之后只能从服务器读取数据
-            clientSocket.shutdown(socket.SHUT_WR)
-            # 接收数据
-            resData = b""
+        except Exception:
+            clientSocket.close()
+            raise
+        return clientSocket
+
+    def __sendRequest(self, writeBytes: bytes):
+        """取出最早建立的连接发送一条指令，并补足预连接。返回已发送指令的连接。\n
+        预连接可能已经失效（例如引擎重启），此时丢弃全部预连接，用新连接重试一次。"""
+        with self.__socketLock:
+            clientSocket = None
+            if self.__idleSockets:
+                clientSocket = self.__idleSockets.popleft()
+                try:
+                    if not self.__isAlive(clientSocket):
+                        raise ConnectionResetError("预连接已失效")
+                    self.__send(clientSocket, writeBytes)
+                except Exception:
+                    clientSocket.close()
+                    clientSocket = None
+                    while self.__idleSockets:
+                        self.__idleSockets.popleft().close()
+            if clientSocket is None:
+                clientSocket = self.__connect()
+                try:
+                    self.__send(clientSocket, writeBytes)
+                except Exception:
+                    clientSocket.close()
+                    raise
+            # 引擎识别期间提前建立下一次使用的连接。预连接失败不影响本次已发送的指令，
+            # 下一次请求时再直接建立连接
+            try:
+                while len(self.__idleSockets) < self.__prefetch:
+                    self.__idleSockets.append(self.__connect())
+            except Exception as e:
+                print(f"[Warning] 预连接失败：{e}")
+        return clientSocket
+
+    @staticmethod
+    def __isAlive(clientSocket) -> bool:
+        """引擎在收到指令前不会发送数据，空闲连接可读说明已被对方关闭或重置"""
+        try:
+            readable, _, _ = select.select([clientSocket], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    @staticmethod
+    def __send(clientSocket, writeBytes: bytes):
+        """在连接上发送一条指令"""
+        # 发送数据
+        clientSocket.sendall(writeBytes)
+        # 发送完所有数据，关闭我方套接字，之后只能从服务器读取数据
+        clientSocket.shutdown(socket.SHUT_WR)
+
+    def __recvResponse(self, clientSocket) -> bytearray:
+        """读取一个连接上的完整响应，直到引擎关闭连接。"""
+        buffer = bytearray(self.__recvHint)  # 预分配接收缓冲区
+        view = memoryview(buffer)
+        size = 0
+        try:
             while True:
-                chunk = clientSocket.recv(1024)
-                if not chunk:
+                if size == len(buffer):
+                    # 缓冲区已满，释放视图后倍增
+                    view.release()
+                    buffer.extend(bytes(len(buffer)))
+                    view = memoryview(buffer)
+                n = clientSocket.recv_into(view[size:])
+                if not n:
                     break
-                resData += chunk
-            getStr = resData.decode()
-        except ConnectionRefusedError:
-            return {"code": 902, "data": "连接被拒绝"}
-        except TimeoutError:
-            return {"code": 903, "data": "连接超时"}
-        except Exception as e:
-            return {"code": 904, "data": f"网络错误：{e}"}
+                size += n
         finally:
+            view.release()
             clientSocket.close()  # 关闭连接
-        # 反序列输出信息
+        if size >= self.__recvHint:
+            self.__recvHint = size + 1
+        del buffer[size:]
+        return buffer
+
+    @staticmethod
+    def __errorResult(e: Exception) -> dict:
+        """将通信异常转换为错误结果"""
+        if isinstance(e, ConnectionRefusedError):
+            return {"code": 902, "data": "连接被拒绝"}
+        if isinstance(e, TimeoutError):
+            return {"code": 903, "data": "连接超时"}
+        return {"code": 904, "data": f"网络错误：{e}"}
+
+    @staticmethod
+    def __loadResult(resData: bytearray) -> dict:
+        """反序列输出信息"""
         try:
-            return jsonLoads(getStr)
+            return jsonLoads(resData)
         except Exception as e:
+            getStr = resData.decode("utf-8", errors="ignore")
             return {
                 "code": 905,
                 "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{getStr}]",
@@ -278,6 +446,10 @@ class PPOCR_socket(PPOCR_pipe):
 
     def exit(self):
         """关闭引擎子进程"""
+        # 关闭预连接
+        with self.__socketLock:
+            while self.__idleSockets:
+                self.__idleSockets.popleft().close()
         # 仅在本地模式下关闭引擎进程
         if hasattr(self, "ret"):
             if self.__runningMode == "local":
@@ -318,20 +490,240 @@ class PPOCR_socket(PPOCR_pipe):
             return None
 
 
+class AsyncPPOCR:
+    """调用OCR（asyncio模式）。\n
+    管道模式下多条指令可以同时写入引擎，引擎按顺序逐行返回结果；
+    套接字模式下每条指令使用独立连接，引擎按连接顺序处理。
+    调用方可以在等待识别结果的同时进行截图等其他工作。"""
+
+    def __init__(
+        self,
+        exePath: str,
+        modelsPath: str = None,
+        argument: dict = None,
+        ipcMode: str = "pipe",
+    ):
+        """创建识别器对象，需要`await start()`后才能使用。\n
+        `exePath`: 识别器`PaddleOCR_json.exe`的路径，套接字模式下也可以是`remote://ip:port`。\n
+        `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
+        `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json\n
+        `ipcMode`: 进程通信模式，可选值为套接字模式`socket` 或 管道模式`pipe`。
+        """
+        if ipcMode not in ("pipe", "socket"):
+            raise Exception(
+                f'ipcMode可选值为 套接字模式"socket" 或 管道模式"pipe" ，不允许{ipcMode}。'
+            )
+        self.exePath = exePath
+        self.modelsPath = modelsPath
+        self.argument = dict(argument) if argument else {}
+        self.ipcMode = ipcMode
+        self.ret = None  # 引擎子进程
+        self.ip = None
+        self.port = None
+        self.__pending = deque()  # 管道模式下等待结果的Future，与写入顺序一致
+        self.__writeLock = None
+        self.__reader = None
+
+    async def start(self):
+        """启动引擎进程（或连接远程引擎），等待初始化完成。"""
+        self.__writeLock = asyncio.Lock()
+        match = re.search(r"remote://(.*):(\d+)", self.exePath)
+        if self.ipcMode == "socket" and match:
+            self.ip = match.group(1)
+            self.port = int(match.group(2))
+            if self.ip == "loopback":
+                self.ip = "127.0.0.1"
+            return self
+
+        if self.ipcMode == "socket":
+            self.argument.setdefault("port", 0)  # 随机端口号
+            self.argument.setdefault("addr", "loopback")  # 本地环回地址
+        cmds, cwd = buildCommand(self.exePath, self.modelsPath, self.argument)
+        self.ret = await asyncio.create_subprocess_exec(
+            *cmds,
+            cwd=cwd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,  # 丢弃stderr的内容
+            startupinfo=hiddenStartupInfo(),  # 开启静默模式
+            limit=2**26,  # 识别结果可能是很长的一行
+        )
+        # 等待初始化完成
+        while True:
+            initStr = (await self.ret.stdout.readline()).decode("utf-8", errors="ignore")
+            if not initStr:  # 子进程已退出，初始化失败
+                raise Exception(f"OCR init fail.")
+            if "OCR init completed." in initStr:
+                break
+        if self.ipcMode == "socket":
+            initStr = (await self.ret.stdout.readline()).decode("utf-8", errors="ignore")
+            if "Socket init completed. " not in initStr:
+                await self.exit()
+                raise Exception(f"Socket init fail.")
+            splits = initStr.split(":")
+            self.ip = splits[0].split("Socket init completed. ")[1]
+            self.port = int(splits[1])
+        # 套接字模式下没有等待中的指令，读取循环只负责清空输出，防止缓冲区填满导致堵塞
+        self.__reader = asyncio.create_task(self.__readLoop())
+        return self
+
+    async def __readLoop(self):
+        """管道模式下持续读取引擎输出，按顺序交给等待中的Future"""
+        while True:
+            getStr = await self.ret.stdout.readline()
+            if not getStr:
+                break
+            if not self.__pending:
+                continue  # 没有等待中的指令，丢弃多余输出
+            future = self.__pending.popleft()
+            if future.done():
+                continue
+            try:
+                future.set_result(jsonLoads(getStr))
+            except Exception as e:
+                # 与套接字模式相同，反序列化失败使用905（904为网络错误）
+                future.set_result(
+                    {
+                        "code": 905,
+                        "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{getStr}]",
+                    }
+                )
+        # 子进程已退出，通知所有等待中的指令
+        while self.__pending:
+            future = self.__pending.popleft()
+            if not future.done():
+                future.set_result({"code": 902, "data": f"子进程已崩溃。"})
+
+    async def runRaw(self, writeBytes: bytes):
+        """传入已序列化为一行JSON的指令字节串，发送给引擎。\n
+        `writeBytes`: 以换行符结尾的指令字节串。\n
+        `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
+        if self.ipcMode == "socket":
+            return await self.__runSocket(writeBytes)
+
+        if not self.ret:
+            return {"code": 901, "data": f"引擎实例不存在。"}
+        if self.ret.returncode is not None:
+            return {"code": 902, "data": f"子进程已崩溃。"}
+        future = asyncio.get_running_loop().create_future()
+        # 写入顺序必须与登记顺序一致
+        async with self.__writeLock:
+            self.__pending.append(future)
+            try:
+                self.ret.stdin.write(writeBytes)
+                await self.ret.stdin.drain()
+            except Exception as e:
+                # 指令没有写入引擎，不会有对应的输出行，移出等待队列，否则后续结果会错位
+                self.__pending.remove(future)
+                if not future.done():
+                    future.set_result(
+                        {
+                            "code": 902,
+                            "data": f"向识别器进程传入指令失败，疑似子进程已崩溃。{e}",
+                        }
+                    )
+        return await future
+
+    async def __runSocket(self, writeBytes: bytes):
+        """套接字模式下，使用一个新连接发送指令并读取结果"""
+        if self.ret and self.ret.returncode is not None:
+            return {"code": 901, "data": f"子进程已崩溃。"}
+        try:
+            reader, writer = await asyncio.open_connection(self.ip, self.port)
+        except ConnectionRefusedError:
+            return {"code": 902, "data": "连接被拒绝"}
+        except Exception as e:
+            return {"code": 904, "data": f"网络错误：{e}"}
+        try:
+            writer.write(writeBytes)
+            await writer.drain()
+            writer.write_eof()
+            resData = await reader.read()
+        except Exception as e:
+            return {"code": 904, "data": f"网络错误：{e}"}
+        finally:
+            writer.close()
+        try:
+            return jsonLoads(resData)
+        except Exception as e:
+            return {
+                "code": 905,
+                "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{resData}]",
+            }
+
+    async def runDict(self, writeDict: dict):
+        """传入指令字典，发送给引擎。\n
+        `writeDict`: 指令字典。\n
+        `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
+        writeStr = jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n"
+        return await self.runRaw(writeStr.encode("utf-8"))
+
+    async def run(self, imgPath: str):
+        """对一张本地图片进行文字识别。\n
+        `imgPath`: 图片路径。\n
+        `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
+        return await self.runDict({"image_path": imgPath})
+
+    async def runBase64(self, imageBase64: str):
+        """对一张编码为base64字符串的图片进行文字识别。\n
+        `imageBase64`: 图片base64字符串。\n
+        `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
+        return await self.runDict({"image_base64": imageBase64})
+
+    async def runBytes(self, imageBytes):
+        """对一张图片的字节流信息进行文字识别。\n
+        `imageBytes`: 图片字节流。\n
+        `return`:  {"code": 识别码, "data": 内容列表或错误信息字符串}\n"""
+        return await self.runRaw(b'{"image_base64":"' + b64encode(imageBytes) + b'"}\n')
+
+    async def exit(self):
+        """关闭引擎子进程"""
+        if self.ret:
+            try:
+                self.ret.kill()  # 关闭子进程
+                await self.ret.wait()
+            except ProcessLookupError:
+                pass
+            self.ret = None
+        if self.__reader:
+            await self.__reader
+            self.__reader = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *excInfo):
+        await self.exit()
+
+
 def GetOcrApi(
-    exePath: str, modelsPath: str = None, argument: dict = None, ipcMode: str = "pipe"
+    exePath: str,
+    modelsPath: str = None,
+    argument: dict = None,
+    ipcMode: str = "pipe",
+    prefetch: int = 0,
 ):
     """获取识别器API对象。\n
     `exePath`: 识别器`PaddleOCR_json.exe`的路径。\n
     `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
     `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json\n
-    `ipcMode`: 进程通信模式，可选值为套接字模式`socket` 或 管道模式`pipe`。用法上完全一致。
+    `ipcMode`: 进程通信模式，可选值为套接字模式`socket` 或 管道模式`pipe`。用法上完全一致。\n
+    `prefetch`: 套接字模式下预先建立的连接数，见`PPOCR_socket`。
     """
     if ipcMode == "socket":
-        return PPOCR_socket(exePath, modelsPath, argument)
+        return PPOCR_socket(exePath, modelsPath, argument, prefetch)
     elif ipcMode == "pipe":
         return PPOCR_pipe(exePath, modelsPath, argument)
     else:
         raise Exception(
             f'ipcMode可选值为 套接字模式"socket" 或 管道模式"pipe" ，不允许{ipcMode}。'
         )
+
+
+async def GetAsyncOcrApi(
+    exePath: str, modelsPath: str = None, argument: dict = None, ipcMode: str = "pipe"
+):
+    """获取并启动asyncio识别器API对象。参数同`GetOcrApi`。\n
+    `return`: 已完成初始化的`AsyncPPOCR`对象。
+    """
+    return await AsyncPPOCR(exePath, modelsPath, argument, ipcMode).start()
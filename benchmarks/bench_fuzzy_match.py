@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模糊匹配性能测试
+
+对比原有的逐条计算词集合Jaccard相似度(遍历全部策略)和名称、效果的n元组BM25索引
+在30、1000、50000条策略下的建索引耗时、每帧查询耗时和首位命中率。
+查询文本模拟一帧OCR结果：一条策略的名称和效果，随机替换少量字符并夹杂其他文字。
+
+用法:
+    python benchmarks/bench_fuzzy_match.py [--queries 50]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_strategy_index import CHARS, SIZES, make_strategies
+from fuzzy_index import NGramIndex
+
+
+def jaccard_scan(strategies, text):
+    """原有方式：每条策略都重新提取名称和效果的词集合，计算与识别文本的Jaccard相似度"""
+    words = set(re.findall(r'\w+', text))
+    results = []
+    for index, row in enumerate(strategies):
+        strategy_words = set(re.findall(r'\w+', row["名称"] + row["效果"]))
+        union = len(words | strategy_words)
+        results.append((index, len(words & strategy_words) / union if union else 0.0))
+    results.sort(key=lambda item: (-item[1], item[0]))
+    return results
+
+
+def make_queries(strategies, count, seed=1):
+    """生成count帧模拟OCR文本，返回[(文本, 正确的策略下标), ...]"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        index = rng.randrange(len(strategies))
+        chars = list(strategies[index]["名称"] + "，" + strategies[index]["效果"])
+        for _ in range(2):
+            chars[rng.randrange(len(chars))] = rng.choice(CHARS)
+        noise = "".join(rng.choice(CHARS) for _ in range(rng.randint(5, 15)))
+        queries.append((noise + "".join(chars), index))
+    return queries
+
+
+def measure(search, queries):
+    """返回(每帧查询耗时ms, 首位命中率)"""
+    start = time.perf_counter()
+    hits = sum(1 for text, index in queries if search(text)[:1] == [index])
+    elapsed = (time.perf_counter() - start) / len(queries) * 1000
+    return elapsed, hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模糊匹配性能测试")
+    parser.add_argument("--queries", type=int, default=50, help="查询帧数")
+    args = parser.parse_args()
+
+    print(f"{'策略数':>8}{'实现':>10}{'建索引ms':>12}{'查询ms':>10}{'命中率':>8}")
+    for count in SIZES:
+        strategies = make_strategies(count)
+        queries = make_queries(strategies, args.queries)
+
+        scan_time, scan_hits = measure(
+            lambda text: [index for index, _ in jaccard_scan(strategies, text)[:1]], queries)
+        print(f"{count:>8}{'jaccard':>10}{0.0:>12.1f}{scan_time:>10.2f}{scan_hits:>8.0%}")
+
+        start = time.perf_counter()
+        index = NGramIndex([(row["名称"] + "\n" + row["效果"], i) for i, row in enumerate(strategies)])
+        build_time = (time.perf_counter() - start) * 1000
+        index_time, index_hits = measure(lambda text: [i for i, _ in index.search(text, k=1)], queries)
+        print(f"{count:>8}{'bm25':>10}{build_time:>12.1f}{index_time:>10.2f}{index_hits:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量匹配吞吐量测试
+
+模拟离线分析录制的对局：生成1000条策略和大量OCR结果帧，画面静止时相邻帧的识别结果相同，
+只有一部分帧是不重复的。对比逐帧调用match_strategy和match_many在1、4、8个进程下每秒匹配的帧数。
+
+用法:
+    python benchmarks/bench_match_many.py [--frames 20000] [--unique 0.25] [--workers 1 4 8]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_strategy_index import CHARS, make_strategies, write_csv
+from data_matcher import DataMatcher
+
+
+def make_frames(names, count, unique, seed=1):
+    """生成count帧OCR结果，其中约unique比例的帧不重复"""
+    rng = random.Random(seed)
+    noise = CHARS + "0123456789+%，。："
+    pool = []
+    for _ in range(max(1, int(count * unique))):
+        frame = []
+        for _ in range(rng.randint(6, 10)):
+            text = "".join(rng.choice(noise) for _ in range(rng.randint(2, 12)))
+            frame.append({"text": text, "score": rng.uniform(0.5, 1.0)})
+        for name in rng.sample(names, 3):
+            frame.insert(rng.randrange(len(frame) + 1), {"text": name, "score": rng.uniform(0.75, 1.0)})
+        pool.append(frame)
+    # 同一画面连续出现多帧
+    frames = []
+    while len(frames) < count:
+        frames.extend([rng.choice(pool)] * rng.randint(1, int(2 / unique)))
+    return frames[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量匹配吞吐量测试")
+    parser.add_argument("--frames", type=int, default=20000, help="帧数")
+    parser.add_argument("--unique", type=float, default=0.25, help="不重复的帧所占的比例")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="进程数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "strategies.csv")
+        strategies = make_strategies(1000)
+        write_csv(csv_path, strategies)
+        matcher = DataMatcher(csv_path)
+        frames = make_frames([row["名称"] for row in strategies], args.frames, args.unique)
+        distinct = len({tuple(result["text"] for result in frame) for frame in frames})
+        print(f"{args.frames}帧，不重复{distinct}帧，CPU核数{os.cpu_count()}")
+
+        start = time.perf_counter()
+        expected = [matcher.match_strategy(frame) for frame in frames]
+        elapsed = time.perf_counter() - start
+        print(f"{'逐帧match_strategy':<24}{args.frames / elapsed:>10.0f} 帧/s")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            results = matcher.match_many(frames, workers=workers)
+            elapsed = time.perf_counter() - start
+            assert results == expected, "批量匹配的结果不同"
+            print(f"{f'match_many {workers}进程':<24}{args.frames / elapsed:>10.0f} 帧/s")
+        matcher.strategy_index.close()
+
+
+if __name__ == '__main__':
+    main()
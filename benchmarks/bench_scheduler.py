@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别调度性能测试
+
+模拟游戏画面：长时间静止的选择界面之间穿插约0.3秒的切换动画，
+对比原有的固定0.5秒间隔循环与自适应调度流水线的
+出结果耗时(画面稳定到显示对应策略)、OCR次数和本进程平均CPU占用率，
+再单独对比画面一直静止时的CPU占用率。
+OCR用sleep模拟，其CPU开销在引擎子进程中，不计入本进程，用OCR次数衡量。
+自适应调度在画面静止时只截取缩略图(与界面相同)，GDI的StretchBlt取样缩小用最近邻缩小模拟。
+
+用法:
+    python benchmarks/bench_scheduler.py [--transitions 6] [--static 2.0] [--ocr-time 0.2] [--idle 10]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PIL import Image, ImageDraw
+
+from frame_change import FrameChangeDetector
+from pipeline import RecognitionPipeline
+from scheduler import AdaptiveScheduler
+
+
+ANIMATION_TIME = 0.3
+
+
+def make_screen(state, size=(1920, 1080)):
+    """生成指定状态的画面，不同状态的卡牌位置不同"""
+    image = Image.new("RGB", size, (30, 30, 60))
+    draw = ImageDraw.Draw(image)
+    x = 200 + (state * 137) % 1400
+    draw.rectangle((x, 300, x + 300, 700), fill=(220, 220, 220))
+    return image
+
+
+class SimulatedScreen:
+    """按时间线切换画面状态的模拟屏幕"""
+
+    def __init__(self, transitions, static_time):
+        self.static_time = static_time
+        self.transitions = transitions
+        self.screens = [make_screen(state) for state in range(transitions + 1)]
+        self.animation = [make_screen(1000 + i) for i in range(8)]
+        self.start = None
+
+    def begin(self):
+        self.start = time.perf_counter()
+
+    def period(self):
+        return self.static_time + ANIMATION_TIME
+
+    def state_at(self, now):
+        """返回(画面状态, 是否处于动画中)，状态为-1表示模拟结束"""
+        elapsed = now - self.start
+        index = int(elapsed // self.period())
+        if index > self.transitions:
+            return -1, False
+        in_animation = index > 0 and elapsed - index * self.period() < ANIMATION_TIME
+        return index, in_animation
+
+    def settled_time(self, state):
+        """画面进入某个状态并结束动画的时间"""
+        if state == 0:
+            return self.start
+        return self.start + state * self.period() + ANIMATION_TIME
+
+    def capture(self):
+        """截图，返回(图像, 状态)"""
+        state, in_animation = self.state_at(time.perf_counter())
+        if state < 0:
+            return None, state
+        if in_animation:
+            frame = self.animation[int(time.perf_counter() * 30) % len(self.animation)]
+            return frame.copy(), None
+        return self.screens[state].copy(), state
+
+    def capture_thumbnail(self, size):
+        """截取缩略图，模拟StretchBlt按取样方式缩小"""
+        state, in_animation = self.state_at(time.perf_counter())
+        if state < 0:
+            return None
+        if in_animation:
+            frame = self.animation[int(time.perf_counter() * 30) % len(self.animation)]
+        else:
+            frame = self.screens[state]
+        return frame.resize(size, Image.Resampling.NEAREST)
+
+
+def run_fixed(screen, ocr_time):
+    """原有方式：截图 -> 变化检测 -> OCR -> 匹配 -> 固定等待0.5秒"""
+    detector = FrameChangeDetector(grid=(3, 3))
+    shown = {}
+    ocr_count = 0
+    screen.begin()
+    while True:
+        image, state = screen.capture()
+        if image is None:
+            break
+        if detector.changed_tiles(image):
+            ocr_count += 1
+            time.sleep(ocr_time)
+            if state is not None and state not in shown:
+                shown[state] = time.perf_counter()
+        time.sleep(0.5)
+    return shown, ocr_count
+
+
+def run_adaptive(screen, ocr_time, cpu_budget):
+    """自适应调度 + 三阶段流水线，截图阶段与界面的capture_frame相同"""
+    detector = FrameChangeDetector(grid=(3, 3))
+    probe_detector = FrameChangeDetector(grid=(3, 3))
+    scheduler = AdaptiveScheduler(cpu_budget=cpu_budget)
+    shown = {}
+    finished = threading.Event()
+
+    def capture():
+        if scheduler.should_probe():
+            thumbnail = screen.capture_thumbnail(probe_detector.thumb_size)
+            if thumbnail is None:
+                finished.set()
+                return None
+            if not probe_detector.changed_tiles(thumbnail):
+                scheduler.observe(False, probe=True)
+                return None
+        image, state = screen.capture()
+        if image is None:
+            finished.set()
+            return None
+        changed = bool(detector.changed_tiles(image))
+        if not scheduler.observe(changed):
+            return None
+        return state
+
+    def ocr(state):
+        time.sleep(ocr_time)
+        return state
+
+    def on_match(state, latency):
+        if state is not None and state not in shown:
+            shown[state] = time.perf_counter()
+
+    pipeline = RecognitionPipeline(capture, ocr, lambda state: state, on_match=on_match, scheduler=scheduler)
+    screen.begin()
+    pipeline.start()
+    finished.wait()
+    pipeline.stop()
+    return shown, pipeline.stats["ocr"].count
+
+
+def measure(name, func, screen, *args):
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    shown, ocr_count = func(screen, *args)
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    delays = [shown[state] - screen.settled_time(state) for state in range(1, screen.transitions + 1) if state in shown]
+    missed = screen.transitions - len(delays)
+    average = sum(delays) / len(delays) * 1000 if delays else float("nan")
+    worst = max(delays) * 1000 if delays else float("nan")
+    print(f"{name:<10}{average:>14.0f}{worst:>14.0f}{missed:>8}{ocr_count:>8}{cpu * 100:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="识别调度性能测试")
+    parser.add_argument("--transitions", type=int, default=6, help="画面切换次数")
+    parser.add_argument("--static", type=float, default=2.0, help="每个画面静止的时间(秒)")
+    parser.add_argument("--ocr-time", type=float, default=0.2, help="模拟的OCR耗时(秒)")
+    parser.add_argument("--cpu-budget", type=float, default=0.2, help="自适应调度的CPU预算")
+    parser.add_argument("--idle", type=float, default=10.0, help="静止画面测试的时长(秒)，为0时不测试")
+    args = parser.parse_args()
+
+    screen = SimulatedScreen(args.transitions, args.static)
+    print(f"{'方式':<10}{'平均出结果ms':>14}{'最长出结果ms':>14}{'漏识别':>8}{'OCR次数':>8}{'CPU%':>10}")
+    measure("fixed", run_fixed, screen, args.ocr_time)
+    measure("adaptive", run_adaptive, screen, args.ocr_time, args.cpu_budget)
+
+    if args.idle > 0:
+        print(f"\n画面静止{args.idle:.0f}秒:")
+        idle_screen = SimulatedScreen(0, args.idle)
+        measure("fixed", run_fixed, idle_screen, args.ocr_time)
+        measure("adaptive", run_adaptive, idle_screen, args.ocr_time, args.cpu_budget)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+策略数据加载性能测试
+
+分别生成30、1000、50000条策略的CSV，对比读取CSV并构建节点式AC自动机(原有方式)、
+编译策略索引、以及打开已编译的索引文件(内存映射)三种方式的耗时。
+
+用法:
+    python benchmarks/bench_strategy_index.py [--repeat 5]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_matcher import AhoCorasick
+from strategy_index import build_index, load_index, read_strategy_csv
+
+
+SIZES = (30, 1000, 50000)
+
+# 生成策略名称用的常用字
+CHARS = "复仇心切第一二三位面强化随从敌人速度血量伤害护盾暴击攻击生命防御能量回复战技终结技天赋秘技" \
+        "连携追加反击燃烧冻结触电风化裂伤纠缠禁锢虚弱减速易伤增益减益货币利息投资收益商店刷新折扣"
+
+
+def make_strategies(count, seed=0):
+    """生成count条模拟策略，名称为4到8个常用字，不重复"""
+    rng = random.Random(seed)
+    names = set()
+    strategies = []
+    while len(strategies) < count:
+        name = "".join(rng.choice(CHARS) for _ in range(rng.randint(4, 8)))
+        if name in names:
+            continue
+        names.add(name)
+        effect = "".join(rng.choice(CHARS) for _ in range(rng.randint(10, 30))) + f"+{rng.randint(5, 60)}%"
+        strategies.append({"类别": rng.choice(["位面强化", "敌方强化", "投资策略"]), "名称": name,
+                           "效果": effect, "推荐": "".join(rng.choice(CHARS) for _ in range(8))})
+    return strategies
+
+
+def write_csv(path, strategies):
+    """写入与策略数据文件相同格式(GBK编码)的CSV"""
+    with open(path, "w", encoding="gbk", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["效果总结", "词条", "效果", "策略"])
+        for row in strategies:
+            writer.writerow([row["类别"], row["名称"], row["效果"], row["推荐"]])
+
+
+def original_load(path):
+    """原有方式：读取CSV后逐条加入节点式AC自动机"""
+    strategies, _ = read_strategy_csv(path, encodings=("gbk",))
+    automaton = AhoCorasick()
+    for index, row in enumerate(strategies):
+        if len(row["名称"]) >= 4:
+            automaton.add_pattern(row["名称"], index)
+    automaton.build_fail_links()
+    return automaton
+
+
+def timed(func, repeat):
+    """返回平均耗时(ms)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="策略数据加载性能测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    print(f"{'策略数':>8}{'CSV+节点自动机ms':>20}{'编译索引ms':>14}{'打开索引ms':>14}{'索引文件KB':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in SIZES:
+            csv_path = os.path.join(directory, f"strategies_{count}.csv")
+            index_path = csv_path + ".idx"
+            write_csv(csv_path, make_strategies(count))
+
+            original = timed(lambda: original_load(csv_path), args.repeat)
+            build = timed(lambda: build_index(csv_path, index_path).close(), args.repeat)
+            load = timed(lambda: load_index(csv_path, index_path).close(), args.repeat)
+            index = load_index(csv_path, index_path)
+            size = os.path.getsize(index.path) / 1024
+            index.close()
+            print(f"{count:>8}{original:>20.2f}{build:>14.2f}{load:>14.3f}{size:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图像传输方式性能测试
+
+统计每种传输方式每帧的编码耗时、传输准备耗时(base64编码及拼接指令，或写入临时文件)和数据量。
+指定--exe时额外测量经由OCR引擎的完整识别耗时。
+
+用法:
+    python benchmarks/bench_transport.py [--exe PaddleOCR-json.exe路径] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from base64 import b64encode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'PaddleOCR-json-main', 'api', 'python'))
+
+from PIL import Image, ImageDraw
+
+from ocr_engine import TRANSPORT_FORMATS, encode_image, OCREngine
+
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4K": (3840, 2160),
+}
+
+
+def make_frame(size, seed=0):
+    """生成一张模拟游戏画面：渐变背景、三张卡牌和若干文字"""
+    rng = random.Random(seed)
+    width, height = size
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    card_width = width // 5
+    for i in range(3):
+        left = width // 10 + i * (card_width + width // 20)
+        draw.rectangle((left, height // 5, left + card_width, height * 4 // 5), fill=(40, 40, 90))
+        for line in range(12):
+            y = height // 5 + 20 + line * 30
+            text = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789%+") for _ in range(24))
+            draw.text((left + 10, y), text, fill=(255, 255, 255))
+    return image
+
+
+def prepare_payload(data, transport, temp_path):
+    """模拟发送前的准备工作，返回实际传给引擎的字节数"""
+    if transport == "file":
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        return len(temp_path.encode("utf-8"))
+    line = b'{"image_base64":"' + b64encode(data) + b'"}\n'
+    return len(line)
+
+
+def bench(frame, transport, repeat, temp_path):
+    """测试一种传输方式，返回(编码耗时ms, 准备耗时ms, 传输字节数)"""
+    encode_total = 0.0
+    prepare_total = 0.0
+    payload = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = encode_image(frame, transport)
+        middle = time.perf_counter()
+        payload = prepare_payload(data, transport, temp_path)
+        end = time.perf_counter()
+        encode_total += middle - start
+        prepare_total += end - middle
+    return encode_total / repeat * 1000, prepare_total / repeat * 1000, payload
+
+
+def bench_engine(exe_path, frame, transport, repeat):
+    """经由OCR引擎测试完整识别耗时(ms)"""
+    engine = OCREngine(exe_path, transport=transport)
+    try:
+        engine.run_image(frame)  # 预热
+        start = time.perf_counter()
+        for _ in range(repeat):
+            engine.run_image(frame)
+        return (time.perf_counter() - start) / repeat * 1000
+    finally:
+        engine.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图像传输方式性能测试")
+    parser.add_argument("--exe", help="PaddleOCR-json.exe路径，指定时测量完整识别耗时")
+    parser.add_argument("--repeat", type=int, default=20, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    fd, temp_path = tempfile.mkstemp(suffix=".bmp")
+    os.close(fd)
+    try:
+        for name, size in RESOLUTIONS.items():
+            rgb = make_frame(size)
+            # 默认预处理后为二值灰度图
+            binary = rgb.convert("L").point(lambda p: p > 128 and 255)
+            for label, frame in (("RGB", rgb), ("二值化", binary)):
+                print(f"\n{name} {label} ({size[0]}x{size[1]})")
+                print(f"{'方式':<10}{'编码ms':>10}{'准备ms':>10}{'合计ms':>10}{'传输KB':>12}" + (f"{'引擎ms':>10}" if args.exe else ""))
+                for transport in TRANSPORT_FORMATS:
+                    encode_ms, prepare_ms, payload = bench(frame, transport, args.repeat, temp_path)
+                    line = f"{transport:<10}{encode_ms:>10.2f}{prepare_ms:>10.2f}{encode_ms + prepare_ms:>10.2f}{payload / 1024:>12.1f}"
+                    if args.exe:
+                        line += f"{bench_engine(args.exe, frame, transport, args.repeat):>10.1f}"
+                    print(line)
+    finally:
+        os.remove(temp_path)
+
+
+if __name__ == '__main__':
+    main()
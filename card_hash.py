@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+卡牌标题感知哈希识别模块
+"""
+
+import json
+import os
+import threading
+import time
+
+from PIL import Image
+
+from roi_profiles import ROIProfile
+
+
+def dhash(image, hash_size=(32, 8)):
+    """计算图像的差值哈希(dHash)
+
+    缩小为(宽+1)x高的灰度图后比较每行相邻像素的亮度，对亮度、缩放和轻微模糊不敏感。
+    卡牌标题是横向的文字条，默认使用32x8共256位的哈希。
+
+    Args:
+        image: PIL.Image对象
+        hash_size: 哈希的(宽, 高)
+
+    Returns:
+        int: 哈希值
+    """
+    width, height = hash_size
+    small = image.convert("L").resize((width + 1, height), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for y in range(height):
+        row = pixels[y * (width + 1):(y + 1) * (width + 1)]
+        for x in range(width):
+            value = (value << 1) | (row[x] > row[x + 1])
+    return value
+
+
+def hamming_distance(a, b):
+    """两个哈希值不同的位数"""
+    return bin(a ^ b).count("1")
+
+
+class CardHashIndex:
+    """卡牌标题哈希索引类
+
+    保存已经通过OCR确认过的卡牌标题图像的哈希和对应的策略名称，
+    后续画面用汉明距离最近的哈希直接得到名称。
+    """
+
+    def __init__(self, max_distance=24, margin=8, hash_size=(32, 8), path=None):
+        """初始化哈希索引
+
+        Args:
+            max_distance: 汉明距离不超过该值才视为同一张卡牌
+            margin: 最近的两个不同名称的距离差小于该值时视为无法区分，返回未命中
+            hash_size: 哈希的(宽, 高)
+            path: 索引文件路径，指定时启动时加载
+        """
+        self.max_distance = max_distance
+        self.margin = margin
+        self.hash_size = hash_size
+        self.path = path
+        self.entries = []  # [(哈希值, 策略名称), ...]
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def add(self, image, name):
+        """添加一张卡牌标题图像
+
+        Args:
+            image: 卡牌标题区域的图像
+            name: 策略名称
+        """
+        value = dhash(image, self.hash_size)
+        with self.lock:
+            # 与已有条目完全相同时不重复添加
+            if (value, name) not in self.entries:
+                self.entries.append((value, name))
+
+    def lookup(self, image):
+        """查找最接近的卡牌
+
+        Args:
+            image: 卡牌标题区域的图像
+
+        Returns:
+            tuple: (策略名称, 汉明距离)，未命中时返回None
+        """
+        value = dhash(image, self.hash_size)
+        best = {}
+        with self.lock:
+            for entry_value, name in self.entries:
+                distance = hamming_distance(value, entry_value)
+                if distance < best.get(name, self.max_distance + 1):
+                    best[name] = distance
+        if not best:
+            return None
+        ranked = sorted(best.items(), key=lambda item: item[1])
+        name, distance = ranked[0]
+        if len(ranked) > 1 and ranked[1][1] - distance < self.margin:
+            return None
+        return name, distance
+
+    def load(self):
+        """从索引文件加载"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if tuple(data["hash_size"]) != tuple(self.hash_size):
+                print("卡牌哈希索引的哈希尺寸不同，忽略已保存的索引")
+                return
+            with self.lock:
+                self.entries = [(int(value, 16), name) for value, name in data["entries"]]
+            print(f"加载卡牌哈希索引{len(self.entries)}条")
+        except Exception as e:
+            print(f"加载卡牌哈希索引失败: {e}")
+
+    def save(self):
+        """保存到索引文件"""
+        if not self.path:
+            return
+        try:
+            with self.lock:
+                entries = [(format(value, "x"), name) for value, name in self.entries]
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"hash_size": list(self.hash_size), "entries": entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"保存卡牌哈希索引失败: {e}")
+
+
+class CardHashRecognizer:
+    """卡牌标题快速识别类
+
+    只处理卡牌标题区域：哈希索引命中时直接生成策略名称的文本块，跳过OCR；
+    未命中时用OCR识别该区域，识别结果能确定唯一的策略时把该区域加入索引。
+    """
+
+    def __init__(self, ocr_engine, match_func, index=None, profile=None, min_confidence=0.9):
+        """初始化
+
+        Args:
+            ocr_engine: OCR引擎实例
+            match_func: 匹配函数，参数为OCR识别结果，返回匹配到的策略列表
+            index: CardHashIndex实例，默认使用默认参数创建
+            profile: 卡牌标题的识别区域配置，默认为currency_war_titles
+            min_confidence: 区域内所有文本块的置信度都不低于该值时才加入索引
+        """
+        self.ocr_engine = ocr_engine
+        self.match_func = match_func
+        self.index = index or CardHashIndex()
+        self.profile = profile or ROIProfile.from_config("currency_war_titles")
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self.lookup_time = 0.0
+
+    def recognize(self, image, preprocess=True):
+        """识别图像中的卡牌标题
+
+        Args:
+            image: PIL.Image对象
+            preprocess: OCR时是否进行图像预处理
+
+        Returns:
+            list: 识别结果，格式同OCREngine.recognize_text，命中索引的文本块置信度为1.0
+        """
+        results = []
+        for region in self.profile.regions(image.size):
+            left, top, right, bottom = region
+            crop = image.crop(region)
+
+            start = time.perf_counter()
+            found = self.index.lookup(crop)
+            self.lookup_time += time.perf_counter() - start
+            if found:
+                self.hits += 1
+                box = [[left, top], [right, top], [right, bottom], [left, bottom]]
+                results.append({"text": found[0], "score": 1.0, "box": box})
+                continue
+
+            self.misses += 1
+            crop_results = self.ocr_engine.recognize_text(crop, preprocess)
+            strategies = self.match_func(crop_results) if crop_results else []
+            confident = all(result["score"] >= self.min_confidence for result in crop_results)
+            if len(strategies) == 1 and confident:
+                self.index.add(crop, str(strategies[0]["名称"]))
+            for result in crop_results:
+                result["box"] = [[x + left, y + top] for x, y in result["box"]]
+                results.append(result)
+        return results
+
+    def hit_rate(self):
+        """索引命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def average_lookup_time(self):
+        """平均每个区域的哈希查找耗时(秒)"""
+        total = self.hits + self.misses
+        return self.lookup_time / total if total else 0.0
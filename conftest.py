@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试公共配置
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+# 与main.py一致，添加PaddleOCR API路径到系统路径
+sys.path.append(os.path.join(os.path.dirname(__file__), 'PaddleOCR-json-main', 'api', 'python'))
+
+
+# 模拟PaddleOCR-json引擎的脚本，使用相同的JSON行协议
+# 每张图片返回一个覆盖整张图片的文本框，文本为"宽x高"
+FAKE_ENGINE_SOURCE = r'''
+import base64
+import io
+import json
+import socket
+import sys
+
+from PIL import Image
+
+
+def run_ocr(line):
+    try:
+        request = json.loads(line)
+    except Exception as e:
+        return {"code": 299, "data": f"json error: {e}"}
+    if "image_base64" in request:
+        image = Image.open(io.BytesIO(base64.b64decode(request["image_base64"])))
+    elif "image_path" in request:
+        image = Image.open(request["image_path"])
+    else:
+        return {"code": 200, "data": "No image."}
+    w, h = image.size
+    if w == 1:
+        # 宽度为1像素的图像模拟没有文字
+        return {"code": 101, "data": "No text found in image."}
+    box = [[0, 0], [w, 0], [w, h], [0, h]]
+    return {"code": 100, "data": [{"text": f"{w}x{h}", "score": 0.99, "box": box}]}
+
+
+def main():
+    args = sys.argv[1:]
+    print("OCR init completed.", flush=True)
+    if "--port" not in args:
+        for line in sys.stdin:
+            print(json.dumps(run_ocr(line)), flush=True)
+        return
+    port = int(args[args.index("--port") + 1])
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", port))
+    server.listen(16)
+    print(f"Socket init completed. 127.0.0.1:{server.getsockname()[1]}", flush=True)
+    # 与引擎一致：每个连接只处理一条指令，按连接顺序逐个处理
+    while True:
+        client, _ = server.accept()
+        data = b""
+        while True:
+            chunk = client.recv(1024)
+            if not chunk:
+                break
+            data += chunk
+            if chunk.endswith(b"\n"):
+                break
+        client.sendall(json.dumps(run_ocr(data.decode())).encode())
+        client.close()
+
+
+main()
+'''
+
+
+@pytest.fixture
+def fake_engine_path(tmp_path):
+    """生成模拟OCR引擎可执行脚本，返回其路径"""
+    path = tmp_path / "fake_engine.py"
+    path.write_text(f"#!{sys.executable}\n" + FAKE_ENGINE_SOURCE, encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
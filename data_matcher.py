@@ -5,8 +5,19 @@
 """
 
 import os
-import pandas as pd
 import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from fuzzy_index import FuzzyNameIndex, NGramIndex
+from strategy_index import MIN_PATTERN_LENGTH, StrategyIndex, load_index
+
+
+# 匹配时只保留的汉字
+CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fa5]+')
 
 
 class AhoCorasickNode:
@@ -100,170 +111,455 @@ class AhoCorasick:
         return list(matched_indices)
 
 
+class MatchStream:
+    """增量匹配类
+    
+    逐个输入OCR文本块，AC自动机的状态在文本块之间延续，结果与把所有文本拼接后搜索相同；
+    每输入一块就返回在这一块中完成的匹配，不需要等待整帧文本拼接完成。
+    原文和只保留汉字的文本各维护一个自动机状态，一次遍历完成原有的两次搜索。
+    """
+    
+    def __init__(self, strategy_data, automaton, min_score=0.7, name_lengths=None):
+        """初始化
+        
+        Args:
+            strategy_data: 策略记录，按下标访问
+            automaton: 带scan方法的AC自动机，为None时不匹配任何策略
+            min_score: 最低OCR置信度，低于该值的文本块不参与匹配
+            name_lengths: 策略下标到名称长度的缓存，可以在多个匹配器之间共用
+        """
+        self.strategy_data = strategy_data
+        self.automaton = automaton
+        self.min_score = min_score
+        self.name_lengths = name_lengths if name_lengths is not None else {}
+        self.block_count = 0
+        self.text_state = 0
+        self.text_length = 0
+        self.block_starts = []  # 参与匹配的文本块在拼接文本中的起点
+        self.block_indices = []  # 参与匹配的文本块的下标
+        self.chinese_state = 0
+        self.chinese_length = 0
+        self.run_starts = []  # 每段连续汉字在只保留汉字的文本中的起点
+        self.runs = []  # 每段连续汉字所在的(文本块下标, 起点)
+        self.text_hits = {}  # 原文中匹配到的策略下标到第一次匹配的映射，按匹配完成的顺序
+        self.chinese_hits = {}  # 只保留汉字的文本中匹配到的策略
+    
+    def locate(self, offset):
+        """拼接文本中的位置对应的(文本块下标, 位置)"""
+        block = bisect_right(self.block_starts, offset) - 1
+        return self.block_indices[block], offset - self.block_starts[block]
+    
+    def locate_chinese(self, offset):
+        """只保留汉字的文本中的位置对应的(文本块下标, 位置)"""
+        run = bisect_right(self.run_starts, offset) - 1
+        block, start = self.runs[run]
+        return block, start + offset - self.run_starts[run]
+    
+    def name_length(self, index):
+        """策略名称的长度"""
+        length = self.name_lengths.get(index)
+        if length is None:
+            length = self.name_lengths[index] = len(self.strategy_data[index].name)
+        return length
+    
+    def feed(self, result):
+        """输入一个OCR文本块
+        
+        Args:
+            result: OCR识别结果中的一项，{"text": 文本内容, "score": 置信度, ...}
+            
+        Returns:
+            list: 这一块中完成的、之前没有匹配到的策略，
+                  格式为[{"index": 策略下标, "start": (文本块下标, 起点), "end": (文本块下标, 终点(不含))}, ...]，
+                  匹配可能从前面的文本块开始
+        """
+        block = self.block_count
+        self.block_count += 1
+        if self.automaton is None or result["score"] < self.min_score:
+            return []
+        text = result["text"]
+        new_hits = []
+        
+        # 原文
+        self.block_starts.append(self.text_length)
+        self.block_indices.append(block)
+        text_state = self.text_state
+        self.text_state, text_hits = self.automaton.scan(text, text_state)
+        for index, end in text_hits:
+            if index in self.text_hits:
+                continue
+            start = self.text_length + end - self.name_length(index)
+            hit = {"index": index, "start": self.locate(start), "end": (block, end)}
+            self.text_hits[index] = hit
+            if index not in self.chinese_hits:
+                new_hits.append(hit)
+        self.text_length += len(text)
+        
+        # 只保留汉字的文本，汉字之间的其他字符被跳过
+        for run in CHINESE_PATTERN.finditer(text):
+            run_text = run.group()
+            self.run_starts.append(self.chinese_length)
+            self.runs.append((block, run.start()))
+            if run_text == text and self.chinese_state == text_state:
+                # 文本块全是汉字且两个状态相同时，结果与原文的搜索相同
+                hits = text_hits
+                self.chinese_state = self.text_state
+            else:
+                self.chinese_state, hits = self.automaton.scan(run_text, self.chinese_state)
+            for index, end in hits:
+                if index in self.chinese_hits:
+                    continue
+                end += self.chinese_length
+                last_block, last_position = self.locate_chinese(end - 1)
+                start = self.locate_chinese(end - self.name_length(index))
+                hit = {"index": index, "start": start, "end": (last_block, last_position + 1)}
+                self.chinese_hits[index] = hit
+                if index not in self.text_hits:
+                    new_hits.append(hit)
+            self.chinese_length += len(run_text)
+        return new_hits
+    
+    def strategies(self):
+        """已输入的文本匹配到的策略，排序与DataMatcher.match_strategy相同
+        
+        原文中匹配到策略时只使用这些策略，完整名称出现在原文中得10分，出现在只保留汉字的文本中得8分；
+        原文中没有匹配时使用只保留汉字的文本中匹配到的策略。分数相同时按匹配完成的先后排序。
+        
+        Returns:
+            list: 匹配到的策略，格式为[{"类别": "类别", "名称": "名称", "效果": "效果", "推荐": "推荐"}, ...]
+        """
+        return [self.strategy_data[index] for index in self.indices()]
+    
+    def indices(self):
+        """已输入的文本匹配到的策略下标，排序与strategies相同"""
+        if self.text_hits:
+            scores = {index: 10.0 + (8.0 if index in self.chinese_hits else 0.0) for index in self.text_hits}
+        else:
+            scores = {index: 8.0 for index in self.chinese_hits}
+        return sorted(scores, key=lambda index: scores[index], reverse=True)
+
+
+class StrategySnapshot:
+    """一次加载得到的策略数据
+    
+    包括策略索引、策略记录、AC自动机，以及由它们生成的名称长度缓存、容错匹配索引和匹配结果缓存。
+    重新加载时创建新的快照整体替换，匹配开始时取出当前快照并一直使用，
+    匹配期间重新加载不会让同一次匹配用到两份不同的数据。
+    """
+    
+    def __init__(self, strategy_index):
+        """初始化
+        
+        Args:
+            strategy_index: 策略索引(StrategyIndex)
+        """
+        self.strategy_index = strategy_index
+        self.strategy_data = strategy_index.records
+        self.ac_automaton = strategy_index.automaton
+        self.name_lengths = {}  # 策略下标到名称长度的缓存
+        self.fuzzy_index = None  # 容错匹配索引，第一次使用时建立
+        self.text_index = None  # 名称和效果的n元组索引，第一次模糊匹配时建立
+        self.match_cache = OrderedDict()  # 过滤后的文本序列和容错阈值到匹配结果的映射，按最近使用排序
+    
+    def name_length(self, index):
+        """策略名称的长度，缓存在name_lengths中"""
+        length = self.name_lengths.get(index)
+        if length is None:
+            length = self.name_lengths[index] = len(self.strategy_data[index].name)
+        return length
+    
+    def get_fuzzy_index(self):
+        """容错匹配索引，第一次调用时建立"""
+        if self.fuzzy_index is None:
+            names = [(row.name, index) for index, row in enumerate(self.strategy_data)
+                     if row.name is not None and len(row.name) >= MIN_PATTERN_LENGTH]
+            self.fuzzy_index = FuzzyNameIndex(names)
+        return self.fuzzy_index
+    
+    def get_text_index(self):
+        """名称和效果的n元组索引，第一次调用时建立"""
+        if self.text_index is None:
+            documents = [("\n".join(field for field in (row.name, row.effect) if field is not None), index)
+                         for index, row in enumerate(self.strategy_data)]
+            self.text_index = NGramIndex(documents)
+        return self.text_index
+
+
 class DataMatcher:
-    """数据匹配类"""
+    """数据匹配类
+    
+    策略数据保存在StrategySnapshot中，重新加载时整体替换。每次匹配开始时取出当前快照，
+    后台线程重新加载(见StrategyFileWatcher)不影响正在进行的匹配。
+    """
     
-    def __init__(self, strategy_data_path):
+    def __init__(self, strategy_data_path, index_path=None, match_cache_size=256, snapshot=None):
         """初始化数据匹配器
         
         Args:
             strategy_data_path: 策略数据CSV路径
+            index_path: 编译后的策略索引文件路径，默认为CSV路径加.idx
+            match_cache_size: match_strategy最多缓存的结果数，为0时不缓存
+            snapshot: 使用给定的策略数据快照，不读取CSV、不写入索引文件(批量匹配的子进程)
         """
         self.strategy_data_path = strategy_data_path
-        self.strategy_data = None
-        self.ac_automaton = None
-        self.pattern_index_map = {}  # 模式串到索引的映射
-        self.index_pattern_map = {}  # 索引到模式串的映射
-        self.load_strategy_data()
+        self.index_path = index_path
+        self.snapshot = snapshot  # 当前的策略数据快照，没有加载成功时为None
+        self.match_cache_size = match_cache_size
+        self.match_cache_lock = threading.Lock()
+        if snapshot is None:
+            self.load_strategy_data()
+    
+    @property
+    def strategy_index(self):
+        """当前快照的策略索引"""
+        return self.snapshot.strategy_index if self.snapshot else None
+    
+    @property
+    def strategy_data(self):
+        """当前快照的策略记录"""
+        return self.snapshot.strategy_data if self.snapshot else None
+    
+    @property
+    def ac_automaton(self):
+        """当前快照的AC自动机"""
+        return self.snapshot.ac_automaton if self.snapshot else None
+    
+    @property
+    def match_cache(self):
+        """当前快照的匹配结果缓存"""
+        return self.snapshot.match_cache if self.snapshot else OrderedDict()
     
     def load_strategy_data(self):
-        """加载策略数据"""
+        """加载策略数据
+        
+        打开编译好的策略索引(内存映射)，索引不存在或CSV已变化时先读取CSV重新编译。
+        策略记录和AC自动机都直接使用索引中的数据。加载成功后替换当前快照，
+        旧的快照不主动关闭，仍在使用它的匹配结束后随引用一起释放；加载失败时保留原来的策略数据。
+        
+        Returns:
+            bool: 是否加载成功
+        """
         try:
-            # 尝试使用不同编码读取CSV文件
-            encodings = ['utf-8', 'gbk', 'gb2312', 'ansi']
-            
-            for encoding in encodings:
-                try:
-                    # 读取CSV文件
-                    self.strategy_data = pd.read_csv(
-                        self.strategy_data_path,
-                        encoding=encoding,
-                        header=None,
-                        skiprows=1,  # 跳过表头
-                        usecols=[0, 1, 2, 3]  # 只读取前4列
-                    )
-                    
-                    # 检查数据是否正确加载
-                    if not self.strategy_data.empty:
-                        print(f"使用编码{encoding}成功加载策略数据")
-                        break
-                except Exception as e:
-                    print(f"使用编码{encoding}读取CSV失败: {e}")
-            
-            if self.strategy_data is None or self.strategy_data.empty:
+            strategy_index = load_index(self.strategy_data_path, self.index_path)
+            if strategy_index is None:
                 print("无法加载策略数据")
-                return
-            
-            # 设置列名
-            self.strategy_data.columns = ['类别', '名称', '效果', '推荐']
-            
-            # 构建关键词索引
-            self.build_keyword_index()
-            
-            print(f"策略数据加载成功，共{len(self.strategy_data)}条记录")
+                return False
+            self.snapshot = StrategySnapshot(strategy_index)
+            print(f"策略数据加载成功，共{len(strategy_index.records)}条记录")
+            return True
         except Exception as e:
             print(f"加载策略数据失败: {e}")
-            self.strategy_data = None
-    
-    def build_keyword_index(self):
-        """构建AC自动机索引"""
-        if self.strategy_data is None:
-            return
-        
-        # 创建AC自动机实例
-        self.ac_automaton = AhoCorasick()
-        
-        # 重置映射
-        self.pattern_index_map.clear()
-        self.index_pattern_map.clear()
-        
-        # 遍历每条策略数据
-        for index, row in self.strategy_data.iterrows():
-            # 将完整策略名称作为模式串
-            if pd.notna(row['名称']):
-                name = str(row['名称'])
-                # 只添加4个汉字及以上的名称
-                if len(name) >= 4:
-                    # 添加到AC自动机
-                    self.ac_automaton.add_pattern(name, index)
-                    # 更新映射
-                    self.pattern_index_map[name] = index
-                    self.index_pattern_map[index] = name
-        
-        # 构建失败指针
-        self.ac_automaton.build_fail_links()
-    
-    def match_strategy(self, ocr_results, min_score=0.7):
+            return False
+    
+    def match_strategy(self, ocr_results, min_score=0.7, fuzzy_threshold=None):
         """匹配策略
         
         Args:
             ocr_results: OCR识别结果，格式为[{"text": "文本内容", "score": 置信度}, ...]
             min_score: 最低匹配分数
+            fuzzy_threshold: 精确匹配不到任何策略时，容错匹配的最低相似度(0-1)，为None时不进行容错匹配
             
         Returns:
-            list: 匹配到的策略，格式为[{"类别": "类别", "名称": "名称", "效果": "效果", "推荐": "推荐"}, ...]
+            tuple: 匹配到的策略，格式为({"类别": "类别", "名称": "名称", "效果": "效果", "推荐": "推荐"}, ...)，
+                   相同的输入返回同一个缓存的元组，调用方不应修改其中的策略
         """
-        if self.strategy_data is None or self.ac_automaton is None:
-            return []
+        snapshot = self.snapshot
+        if snapshot is None:
+            return ()
+        
+        # 结果只取决于置信度达到min_score的文本和容错阈值，连续的画面一般识别出相同的文本，直接返回缓存的结果；
+        # 缓存属于快照，重新加载后自动失效
+        texts = tuple(result["text"] for result in ocr_results if result["score"] >= min_score)
+        key = (texts, fuzzy_threshold)
+        cache = snapshot.match_cache
+        with self.match_cache_lock:
+            strategies = cache.get(key)
+            if strategies is not None:
+                cache.move_to_end(key)
+                return strategies
+        
+        strategies = tuple(snapshot.strategy_data[index]
+                           for index in self.match_texts(texts, fuzzy_threshold, snapshot))
+        if self.match_cache_size > 0:
+            with self.match_cache_lock:
+                cache[key] = strategies
+                while len(cache) > self.match_cache_size:
+                    cache.popitem(last=False)
+        return strategies
+    
+    def match_indices(self, ocr_results, min_score=0.7, fuzzy_threshold=None, snapshot=None):
+        """匹配策略，返回策略下标，参数和排序与match_strategy相同
         
-        # 过滤低置信度的OCR结果
-        filtered_results = [r for r in ocr_results if r["score"] >= min_score]
-        if not filtered_results:
+        Args:
+            snapshot: 使用的策略数据快照，默认为当前快照
+            
+        Returns:
+            list: 匹配到的策略下标
+        """
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
             return []
         
-        # 提取识别到的文本
-        recognized_text = "".join([r["text"] for r in filtered_results])
+        # 逐个文本块输入增量匹配器，低置信度的文本块被跳过
+        stream = self.match_stream(min_score, snapshot)
+        for result in ocr_results:
+            stream.feed(result)
+        indices = stream.indices()
+        if indices or fuzzy_threshold is None:
+            return indices
+        
+        # 个别字识别错误时，在每个文本块中查找近似出现的名称
+        similarities = {}
+        for result in ocr_results:
+            if result["score"] < min_score:
+                continue
+            for index, similarity in self.search_fuzzy(result["text"], threshold=fuzzy_threshold, snapshot=snapshot):
+                similarities[index] = max(similarity, similarities.get(index, 0.0))
+        return sorted(similarities, key=lambda index: similarities[index], reverse=True)
+    
+    def match_texts(self, texts, fuzzy_threshold=None, snapshot=None):
+        """匹配已按置信度过滤的一帧文本，返回策略下标
         
-        # 使用AC自动机搜索匹配的策略
-        matched_indices = self.ac_automaton.search(recognized_text)
+        Args:
+            texts: 文本块的文本序列
+            fuzzy_threshold: 同match_strategy
+            snapshot: 使用的策略数据快照，默认为当前快照
+            
+        Returns:
+            list: 匹配到的策略下标
+        """
+        return self.match_indices([{"text": text, "score": 1.0} for text in texts], 0.0, fuzzy_threshold, snapshot)
+    
+    def match_many(self, frames, min_score=0.7, fuzzy_threshold=None, workers=1, chunk_size=256):
+        """批量匹配多帧OCR结果，用于离线分析录制的对局
         
-        # 如果没有匹配到结果，尝试提取中文文本后再次匹配
-        if not matched_indices:
-            # 提取中文文本
-            chinese_text = ''.join(re.findall(r'[\u4e00-\u9fa5]+', recognized_text))
-            # 再次搜索
-            matched_indices = self.ac_automaton.search(chinese_text)
+        先一次性按置信度过滤所有帧的文本块，以每帧剩下的文本序列为键去重，相同的输入只匹配一次。
+        workers大于1时把不重复的输入分批交给进程池，每个子进程以只读方式打开当前快照的策略索引文件
+        (内存映射)，只传递文本和策略下标。子进程不读取CSV，索引文件的CSV校验和与快照不同或无法打开时
+        (例如CSV已变化，旧的索引文件被删除)，改为在当前进程中匹配，保证策略下标对应当前快照的策略记录。
         
-        # 如果仍然没有匹配到结果，返回空列表
-        if not matched_indices:
-            return []
+        Args:
+            frames: 多帧OCR识别结果，每帧的格式与match_strategy相同
+            min_score: 最低OCR置信度
+            fuzzy_threshold: 同match_strategy
+            workers: 进程数，为1或不重复的输入不超过一批时在当前进程中匹配
+            chunk_size: 每批交给子进程的输入数量
+            
+        Returns:
+            list: 每帧匹配到的策略元组，与frames一一对应，输入相同的帧共用同一个元组
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return [() for _ in frames]
+        
+        keys = [tuple(result["text"] for result in frame if result["score"] >= min_score) for frame in frames]
+        unique = list(dict.fromkeys(keys))
+        results = None
+        strategy_index = snapshot.strategy_index
+        # 只在内存中的索引(索引文件写入失败)无法交给子进程
+        if workers > 1 and len(unique) > chunk_size and strategy_index.path is not None:
+            chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+            try:
+                with ProcessPoolExecutor(workers, initializer=init_match_worker,
+                                         initargs=(self.strategy_data_path, strategy_index.path,
+                                                   strategy_index.source_digest)) as executor:
+                    results = [indices
+                               for chunk in executor.map(match_texts_worker, chunks, repeat(fuzzy_threshold))
+                               for indices in chunk]
+            except Exception as e:
+                print(f"批量匹配子进程失败，改为在当前进程中匹配: {e}")
+                results = None
+        if results is None:
+            results = [self.match_texts(texts, fuzzy_threshold, snapshot) for texts in unique]
+        
+        memo = {key: tuple(snapshot.strategy_data[index] for index in indices) for key, indices in zip(unique, results)}
+        return [memo[key] for key in keys]
+    
+    def match_blocks(self, ocr_results, min_score=0.7):
+        """逐个文本块匹配策略，保留每个匹配所在的文本块和位置
         
-        # 计算每个策略的匹配分数
-        strategy_scores = {}
+        每个文本块单独搜索，自动机状态不跨越文本块，不会出现相邻文本块拼接造成的误匹配。
+        文本块的原文和只保留汉字的文本都会搜索，后者可以匹配被空格、标点隔开的名称。
+        同一文本块中两种文本匹配到同一策略时只保留一个，不同文本块中的同一策略分别返回。
         
-        # 遍历匹配到的索引
-        for index in matched_indices:
-            # 获取策略名称
-            strategy_name = self.index_pattern_map.get(index, "")
-            if not strategy_name:
-                continue
-            
-            # 计算匹配分数
-            score = 0.0
-            
-            # 检查完整名称匹配
-            if strategy_name in recognized_text:
-                score += 10.0
+        Args:
+            ocr_results: OCR识别结果，格式为[{"text": "文本内容", "score": 置信度, "box": 文本框四角坐标}, ...]
+            min_score: 最低OCR置信度，低于该值的文本块不参与匹配
             
-            # 检查在中文文本中的匹配
-            chinese_text = ''.join(re.findall(r'[\u4e00-\u9fa5]+', recognized_text))
-            if strategy_name in chinese_text:
-                score += 8.0
+        Returns:
+            list: [{"strategy": 策略, "index": 策略下标, "block": 文本块下标, "start": 起点, "end": 终点(不含),
+                    "box": 文本框四角坐标, "score": OCR置信度}, ...]，
+                  按置信度从高到低排序，置信度相同时按文本框从上到下、从左到右排序
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        automaton, name_length = snapshot.ac_automaton, snapshot.name_length
+        
+        hits = []
+        for block, result in enumerate(ocr_results):
+            if result["score"] < min_score:
+                continue
+            text = result["text"]
+            found = {}
+            for index, end in automaton.scan(text, 0)[1]:
+                found.setdefault(index, (end - name_length(index), end))
             
-            # 检查在OCR结果中的匹配
-            # 暂时注释掉OCR置信度参与匹配的逻辑
-            # for result in filtered_results:
-            #     if strategy_name in result["text"]:
-            #         # 结合OCR置信度计算分数
-            #         score += 5.0 * result["score"]
+            # 只保留汉字的文本中的位置换算回原文中的位置
+            offsets = [position for run in CHINESE_PATTERN.finditer(text) for position in range(*run.span())]
+            if len(offsets) < len(text):
+                chinese_text = "".join(text[position] for position in offsets)
+                for index, end in automaton.scan(chinese_text, 0)[1]:
+                    if index not in found:
+                        found[index] = (offsets[end - name_length(index)], offsets[end - 1] + 1)
             
-            strategy_scores[index] = score
-        
-        # 按分数降序排序
-        sorted_indices = sorted(strategy_scores.keys(), key=lambda x: strategy_scores[x], reverse=True)
+            box = result.get("box")
+            for index, (start, end) in found.items():
+                hits.append({"strategy": snapshot.strategy_data[index], "index": index, "block": block,
+                             "start": start, "end": end, "box": box, "score": result["score"]})
+        
+        def rank(hit):
+            box = hit["box"]
+            top = min(point[1] for point in box) if box else float("inf")
+            left = min(point[0] for point in box) if box else float("inf")
+            return -hit["score"], top, left, hit["block"], hit["start"]
+        
+        hits.sort(key=rank)
+        return hits
+    
+    def search_fuzzy(self, text, k=5, threshold=0.6, snapshot=None):
+        """容错查找文本中近似出现的策略名称
         
-        # 获取匹配的策略
-        matched_strategies = []
-        for index in sorted_indices:
-            row = self.strategy_data.loc[index]
-            matched_strategies.append({
-                "类别": row["类别"],
-                "名称": row["名称"],
-                "效果": row["效果"],
-                "推荐": row["推荐"]
-            })
+        Args:
+            text: OCR识别的文本
+            k: 最多返回的候选数量
+            threshold: 最低相似度，相似度为1减去编辑距离与名称长度之比，形近字替换的距离为0.3
+            snapshot: 使用的策略数据快照，默认为当前快照
+            
+        Returns:
+            list: [(策略下标, 相似度), ...]，按相似度从高到低排序
+        """
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            return []
+        fuzzy_index = snapshot.get_fuzzy_index()
+        return [(index, 1.0 - distance / len(fuzzy_index.names[index]))
+                for index, distance in fuzzy_index.search(text, k, max_error_rate=1.0 - threshold)]
+    
+    def match_stream(self, min_score=0.7, snapshot=None):
+        """创建增量匹配器，OCR文本块可以逐个输入，每块完成的匹配立即返回
         
-        return matched_strategies
+        Args:
+            min_score: 最低OCR置信度
+            snapshot: 使用的策略数据快照，默认为当前快照
+            
+        Returns:
+            MatchStream: 增量匹配器
+        """
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            return MatchStream(None, None, min_score)
+        return MatchStream(snapshot.strategy_data, snapshot.ac_automaton, min_score, snapshot.name_lengths)
     
     def fuzzy_match(self, ocr_results, threshold=0.6):
         """模糊匹配策略
@@ -275,7 +571,8 @@ class DataMatcher:
         Returns:
             list: 匹配到的策略
         """
-        if self.strategy_data is None:
+        snapshot = self.snapshot
+        if snapshot is None:
             return []
         
         # 过滤低置信度的OCR结果
@@ -286,36 +583,9 @@ class DataMatcher:
         # 提取识别到的文本
         recognized_text = "".join([r["text"] for r in filtered_results])
         
-        # 计算每条策略与识别文本的相似度
-        matched_strategies = []
-        
-        for index, row in self.strategy_data.iterrows():
-            # 构建策略文本
-            strategy_text = ""
-            for column in ['名称', '效果']:
-                if pd.notna(row[column]):
-                    strategy_text += str(row[column])
-            
-            # 计算相似度
-            similarity = self.calculate_similarity(recognized_text, strategy_text)
-            
-            if similarity >= threshold:
-                matched_strategies.append({
-                    "类别": row["类别"],
-                    "名称": row["名称"],
-                    "效果": row["效果"],
-                    "推荐": row["推荐"],
-                    "相似度": similarity
-                })
-        
-        # 按相似度排序
-        matched_strategies.sort(key=lambda x: x["相似度"], reverse=True)
-        
-        # 移除相似度字段
-        for strategy in matched_strategies:
-            del strategy["相似度"]
-        
-        return matched_strategies
+        # 在名称和效果的n元组索引中查找，只访问识别文本中出现的n元组
+        return [snapshot.strategy_data[index]
+                for index, _ in snapshot.get_text_index().search(recognized_text, threshold=threshold)]
     
     def calculate_similarity(self, text1, text2):
         """计算文本相似度（简单的Jaccard相似度）
@@ -348,21 +618,48 @@ class DataMatcher:
             name: 策略名称
             
         Returns:
-            dict: 策略信息，或None
+            Strategy: 策略记录，或None
         """
-        if self.strategy_data is None:
+        strategy_data = self.strategy_data
+        if strategy_data is None:
             return None
         
         # 查找策略
-        matched = self.strategy_data[self.strategy_data['名称'].str.contains(name, na=False)]
-        
-        if not matched.empty:
-            row = matched.iloc[0]
-            return {
-                "类别": row["类别"],
-                "名称": row["名称"],
-                "效果": row["效果"],
-                "推荐": row["推荐"]
-            }
+        for row in strategy_data:
+            if row.name is not None and name in row.name:
+                return row
         
         return None
+
+
+# 批量匹配的子进程中使用的数据匹配器，由init_match_worker创建，索引无法使用时为None
+worker_matcher = None
+worker_error = None
+
+
+def init_match_worker(strategy_data_path, index_file, source_digest):
+    """批量匹配子进程的初始化函数，以只读方式打开主进程快照的策略索引文件
+
+    Args:
+        strategy_data_path: 策略数据CSV路径
+        index_file: 主进程快照的索引文件路径
+        source_digest: 主进程快照的CSV校验和
+    """
+    global worker_matcher, worker_error
+    try:
+        strategy_index = StrategyIndex.open(index_file)
+    except Exception as e:
+        worker_error = f"打开策略索引文件失败: {e}"
+        return
+    if strategy_index.source_digest != source_digest:
+        strategy_index.close()
+        worker_error = "策略索引与主进程的策略数据不一致"
+        return
+    worker_matcher = DataMatcher(strategy_data_path, snapshot=StrategySnapshot(strategy_index))
+
+
+def match_texts_worker(keys, fuzzy_threshold):
+    """在子进程中匹配一批已过滤的文本序列，返回每个序列匹配到的策略下标"""
+    if worker_matcher is None:
+        raise RuntimeError(worker_error)
+    return [worker_matcher.match_texts(texts, fuzzy_threshold) for texts in keys]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+画面变化检测模块
+"""
+
+from PIL import Image, ImageChops
+
+
+def grid_rects(size, grid):
+    """将指定大小的区域按网格划分
+
+    Args:
+        size: 区域大小(宽, 高)
+        grid: 网格(列数, 行数)
+
+    Returns:
+        list: 按行优先排列的分块列表，格式为[(left, top, right, bottom), ...]
+    """
+    width, height = size
+    cols, rows = grid
+    rects = []
+    for row in range(rows):
+        for col in range(cols):
+            rects.append((
+                col * width // cols,
+                row * height // rows,
+                (col + 1) * width // cols,
+                (row + 1) * height // rows
+            ))
+    return rects
+
+
+class FrameChangeDetector:
+    """画面变化检测类
+
+    将截图缩小为灰度缩略图后与上一次识别时的缩略图逐像素比较，
+    只有变化像素数量超过阈值时才认为画面发生了变化。
+    按网格分块统计时可以得到具体是哪些分块发生了变化。
+    """
+
+    def __init__(self, thumb_size=(160, 90), pixel_threshold=12, min_changed_pixels=3, grid=(1, 1)):
+        """初始化画面变化检测器
+
+        Args:
+            thumb_size: 缩略图大小(宽, 高)
+            pixel_threshold: 单个像素灰度差超过该值才算变化
+            min_changed_pixels: 单个分块中变化像素数量达到该值才认为该分块变化
+            grid: 分块网格(列数, 行数)
+        """
+        self.thumb_size = thumb_size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.grid = grid
+        self.thumb_tiles = grid_rects(thumb_size, grid)
+        self.reference = None
+
+    def signature(self, image):
+        """计算图像的灰度缩略图
+
+        Args:
+            image: PIL.Image对象
+
+        Returns:
+            PIL.Image: 灰度缩略图
+        """
+        # 先缩小再转灰度，避免对整幅截图做颜色转换
+        return image.resize(self.thumb_size, Image.Resampling.BOX).convert("L")
+
+    def changed_tiles(self, image):
+        """找出相对上一次变化时发生了变化的分块
+
+        只更新变化分块的参考缩略图，因此缓慢的渐变最终也会被检测到。
+
+        Args:
+            image: PIL.Image对象
+
+        Returns:
+            list: 变化分块的序号列表，序号按行优先排列
+        """
+        thumb = self.signature(image)
+        if self.reference is None:
+            self.reference = thumb
+            return list(range(len(self.thumb_tiles)))
+
+        diff = ImageChops.difference(self.reference, thumb)
+        changed = []
+        for index, tile in enumerate(self.thumb_tiles):
+            histogram = diff.crop(tile).histogram()
+            if sum(histogram[self.pixel_threshold + 1:]) >= self.min_changed_pixels:
+                changed.append(index)
+                self.reference.paste(thumb.crop(tile), tile[:2])
+        return changed
+
+    def has_changed(self, image):
+        """判断画面相对上一次变化时是否发生了变化
+
+        Args:
+            image: PIL.Image对象
+
+        Returns:
+            bool: 画面是否变化
+        """
+        return bool(self.changed_tiles(image))
+
+    def tile_rect(self, index, size):
+        """获取分块在原始图像中的坐标
+
+        Args:
+            index: 分块序号
+            size: 原始图像大小(宽, 高)
+
+        Returns:
+            tuple: 分块区域(left, top, right, bottom)
+        """
+        return grid_rects(size, self.grid)[index]
+
+    def reset(self):
+        """清除参考缩略图，下一帧必定视为变化"""
+        self.reference = None
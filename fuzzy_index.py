@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+容错匹配索引模块
+
+OCR把策略名称中的个别字识别错时(如"复仇心切"识别为"复仇心初")，精确匹配找不到策略。
+本模块用字符二元组倒排索引找出候选名称，再用加权编辑距离在文本中查找最接近的位置，
+形近字之间的替换代价较低。
+
+另有名称和效果文本的字符n元组倒排索引，按BM25计算OCR文本与每条策略的相关度，
+只访问OCR文本中出现的n元组的倒排表，不需要遍历所有策略。
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+
+# 常见的OCR形近字，同一组内的字互相替换的代价为CONFUSABLE_COST
+CONFUSABLE_GROUPS = [
+    "切初", "己已巳", "未末", "人入八", "土士", "天夭", "日曰", "戊戌戍", "贝见", "拔拨",
+    "候侯", "析折", "微徽", "辨辩辫", "免兔", "鸟乌", "历厉", "准淮", "千干于", "王玉主",
+    "大太犬", "力刀", "口囗", "二三", "材村", "枚牧", "治冶", "汩汨", "间问",
+    "0OoD", "1lI|", "5S", "8B", "2Z",
+]
+CONFUSABLE_COST = 0.3
+
+# 字符到所在形近字组代表字的映射，建立索引时同组的字视为相同
+CANONICAL = {}
+for group in CONFUSABLE_GROUPS:
+    for char in group:
+        CANONICAL.setdefault(char, group[0])
+
+
+def normalize(text):
+    """统一全角半角等写法(NFKC)"""
+    return unicodedata.normalize("NFKC", text)
+
+
+def canonical(text):
+    """把形近字替换为所在组的代表字"""
+    return "".join(CANONICAL.get(char, char) for char in text)
+
+
+def substitution_cost(a, b):
+    """把字符a替换为b的代价"""
+    if a == b:
+        return 0.0
+    if CANONICAL.get(a, a) == CANONICAL.get(b, b):
+        return CONFUSABLE_COST
+    return 1.0
+
+
+def substring_distance(pattern, text, limit=None):
+    """pattern与text中最接近的子串之间的加权编辑距离
+
+    插入和删除的代价为1，替换的代价见substitution_cost。text的首尾可以跳过任意字符。
+
+    Args:
+        pattern: 模式串
+        text: 文本
+        limit: 距离上限，某一行的最小值已经超过上限时提前结束
+
+    Returns:
+        float: 距离，提前结束时返回大于limit的值
+    """
+    # 与substitution_cost相同，先把两边都转换为代表字，内层循环中不调用函数
+    canonical_text = canonical(text)
+    pairs = list(zip(text, canonical_text))
+    previous = [0.0] * (len(text) + 1)
+    for i, (pattern_char, canonical_char) in enumerate(zip(pattern, canonical(pattern)), 1):
+        current = [float(i)]
+        left = float(i)
+        for j, (text_char, canonical_text_char) in enumerate(pairs):
+            if text_char == pattern_char:
+                cost = previous[j]
+            elif canonical_text_char == canonical_char:
+                cost = previous[j] + CONFUSABLE_COST
+            else:
+                cost = previous[j] + 1.0
+            up = previous[j + 1] + 1.0
+            left += 1.0
+            if up < cost:
+                cost = up
+            if left < cost:
+                cost = left
+            current.append(cost)
+            left = cost
+        if limit is not None and min(current) > limit:
+            return min(current)
+        previous = current
+    return min(previous)
+
+
+class FuzzyNameIndex:
+    """容错匹配索引类
+
+    以去掉形近差异后的名称的字符二元组建立倒排索引。名称有g个不同的二元组，在文本中出现且有d处编辑时，
+    每处编辑最多破坏2个二元组，至少保留g-2d个；形近字替换不影响二元组。
+    据此得到每个候选名称编辑距离的下界，只对可能进入前k个的名称计算编辑距离。
+    较短的名称在允许的编辑距离内可能一个二元组也不保留，这些名称另外按单字建立倒排索引：
+    名称有u个不同的字，每处编辑最多去掉其中1个，缺少m个字时编辑距离至少为m。
+    """
+
+    def __init__(self, names, max_error_rate=0.4):
+        """建立索引
+
+        Args:
+            names: [(名称, 策略下标), ...]
+            max_error_rate: 允许的最大编辑距离与名称长度之比
+        """
+        self.max_error_rate = max_error_rate
+        self.names = {}
+        self.gram_counts = {}  # 策略下标到名称中不同二元组数量的映射
+        self.postings = {}  # 二元组到策略下标列表的映射
+        self.char_counts = {}  # 策略下标到名称中不同字数量的映射
+        # 单字到[(不保留任何二元组时的距离下界与名称长度之比, 策略下标), ...]的映射
+        self.char_postings = {}
+        for name, index in names:
+            name = normalize(name)
+            grams = set(self.grams(canonical(name)))
+            self.names[index] = name
+            self.gram_counts[index] = len(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(index)
+            chars = set(canonical(name))
+            self.char_counts[index] = len(chars)
+            if name:
+                rate = ((len(grams) + 1) // 2) / len(name)
+                for char in chars:
+                    self.char_postings.setdefault(char, []).append((rate, index))
+        for postings in self.char_postings.values():
+            postings.sort()
+
+    @staticmethod
+    def grams(text):
+        """字符二元组"""
+        return [text[i:i + 2] for i in range(len(text) - 1)]
+
+    def search(self, text, k=5, max_error_rate=None):
+        """查找文本中近似出现的名称
+
+        Args:
+            text: OCR识别的文本
+            k: 最多返回的候选数量
+            max_error_rate: 允许的最大编辑距离与名称长度之比，默认使用建立索引时的设置
+
+        Returns:
+            list: [(策略下标, 编辑距离), ...]，按距离从小到大排序
+        """
+        if max_error_rate is None:
+            max_error_rate = self.max_error_rate
+        text = normalize(text)
+        counts = {}
+        for gram in set(self.grams(canonical(text))):
+            for index in self.postings.get(gram, ()):
+                counts[index] = counts.get(index, 0) + 1
+
+        # 由二元组计数得到编辑距离的下界，按下界从小到大验证，
+        # 已有k个候选且下界超过其中最大的距离时，后面的名称不可能进入前k个
+        bounds = []
+        for index, count in counts.items():
+            missing = self.gram_counts[index] - count
+            bounds.append(((missing + 1) // 2, index))
+        # 没有共同二元组、但二元组下界仍在允许范围内的短名称，按共同的单字计算下界
+        char_counts = {}
+        for char in set(canonical(text)):
+            for rate, index in self.char_postings.get(char, ()):
+                if rate > max_error_rate + 1e-9:
+                    break
+                if index not in counts:
+                    char_counts[index] = char_counts.get(index, 0) + 1
+        for index, count in char_counts.items():
+            bound = max((self.gram_counts[index] + 1) // 2, self.char_counts[index] - count)
+            bounds.append((bound, index))
+        bounds.sort()
+
+        candidates = []
+        for bound, index in bounds:
+            if len(candidates) >= k and bound > candidates[k - 1][0]:
+                break
+            name = self.names[index]
+            limit = len(name) * max_error_rate
+            if bound > limit:
+                continue
+            if len(candidates) >= k:
+                limit = min(limit, candidates[k - 1][0])
+            distance = substring_distance(name, text, limit)
+            if distance <= limit:
+                candidates.append((distance, index))
+                candidates.sort()
+        return [(index, distance) for distance, index in candidates[:k]]
+
+
+# 建立n元组时去掉的空白和标点
+SEPARATOR_PATTERN = re.compile(r"[\s,.;:!?，。；：！？、()（）【】\[\]\"'“”‘’]+")
+
+
+def ngrams(text, sizes=(2, 3)):
+    """文本去掉空白和标点后的字符n元组，各段分别计算，不跨越标点"""
+    grams = []
+    for part in SEPARATOR_PATTERN.split(normalize(text)):
+        for size in sizes:
+            grams.extend(part[i:i + size] for i in range(len(part) - size + 1))
+    return grams
+
+
+class NGramIndex:
+    """字符n元组BM25索引类
+
+    以每条策略的名称和效果的二元组、三元组建立倒排索引，倒排表中直接保存每个n元组对该策略的BM25权重。
+    查询时只累加OCR文本中出现的n元组的倒排表，再除以策略自身全部n元组的权重之和，
+    得到0-1之间的相关度：策略的n元组都出现在OCR文本中时为1。
+    """
+
+    def __init__(self, documents, sizes=(2, 3), k1=1.2, b=0.75):
+        """建立索引
+
+        Args:
+            documents: [(文本, 策略下标), ...]，文本一般为名称加效果，多个字段可以用换行分隔
+            sizes: n元组的长度
+            k1: BM25的词频饱和参数
+            b: BM25的文档长度归一化参数
+        """
+        self.sizes = sizes
+        counts = {}
+        lengths = {}
+        document_frequency = Counter()
+        for text, index in documents:
+            grams = ngrams(text, sizes)
+            lengths[index] = len(grams)
+            tf = counts[index] = Counter(grams)
+            document_frequency.update(tf.keys())
+        total = len(counts)
+        average_length = sum(lengths.values()) / total if total else 0.0
+        idf = {gram: math.log(1 + (total - df + 0.5) / (df + 0.5)) for gram, df in document_frequency.items()}
+
+        # 倒排表分为策略下标和BM25权重两个列表，查询时用zip同时遍历
+        self.postings = {gram: ([], []) for gram in idf}  # n元组到(策略下标列表, 权重列表)的映射
+        self.totals = {}  # 策略下标到全部n元组权重之和的映射
+        k1_plus = k1 + 1
+        for index, tf in counts.items():
+            norm = k1 * (1 - b + b * lengths[index] / average_length) if average_length else k1
+            total_weight = 0.0
+            for gram, frequency in tf.items():
+                weight = idf[gram] * frequency * k1_plus / (frequency + norm)
+                indices, weights = self.postings[gram]
+                indices.append(index)
+                weights.append(weight)
+                total_weight += weight
+            self.totals[index] = total_weight
+
+    def search(self, text, k=None, threshold=0.0):
+        """查找与文本相关的策略
+
+        Args:
+            text: OCR识别的文本
+            k: 最多返回的数量，为None时不限制
+            threshold: 最低相关度(0-1)
+
+        Returns:
+            list: [(策略下标, 相关度), ...]，按相关度从高到低排序
+        """
+        scores = defaultdict(float)
+        empty = ((), ())
+        for gram in set(ngrams(text, self.sizes)):
+            indices, weights = self.postings.get(gram, empty)
+            for index, weight in zip(indices, weights):
+                scores[index] += weight
+        results = []
+        for index, score in scores.items():
+            relevance = score / self.totals[index]
+            if relevance >= threshold:
+                results.append((index, relevance))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results if k is None else results[:k]
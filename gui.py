@@ -7,14 +7,21 @@ GUI界面模块
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from PIL import Image, ImageTk
-import threading
-import time
+
+from card_hash import CardHashRecognizer
+from frame_change import FrameChangeDetector
+from pipeline import RecognitionPipeline
+from roi_learner import LearnedRegionOCR
+from roi_profiles import ROI_PROFILES, ROIProfile, RegionOCR
+from scheduler import AdaptiveScheduler
+from tiled_ocr import TiledOCR
 
 
 class StrategyGUI:
     """策略助手GUI类"""
     
-    def __init__(self, root, screen_capture, ocr_engine, data_matcher):
+    def __init__(self, root, screen_capture, ocr_engine, data_matcher, scheduler=None,
+                 roi_profiles=None, roi_profile=None, roi_mode="composite", card_index=None):
         """初始化GUI
         
         Args:
@@ -22,6 +29,12 @@ class StrategyGUI:
             screen_capture: 屏幕捕获实例
             ocr_engine: OCR引擎实例
             data_matcher: 数据匹配实例
+            scheduler: 自适应调度器实例，默认使用默认参数创建
+            roi_profiles: 识别区域配置字典，默认为内置配置
+            roi_profile: 启动时选择的识别区域配置名称，为None时识别完整画面，为"auto"时自动学习识别区域，
+                为"card_hash"时用卡牌标题哈希识别
+            card_index: 卡牌标题哈希索引(CardHashIndex)，默认使用默认参数创建
+            roi_mode: 区域发送方式，见RegionOCR
         """
         self.root = root
         self.screen_capture = screen_capture
@@ -34,10 +47,48 @@ class StrategyGUI:
         
         # 标志位
         self.is_running = False
-        self.thread = None
+        
+        # 画面未变化时不送入OCR，复用上一次的识别结果
+        self.frame_detector = FrameChangeDetector(grid=(3, 3))
+        # 画面静止时比较GDI直接截取的缩略图，缩略图变化后才完整截图
+        self.probe_detector = FrameChangeDetector(grid=(3, 3))
+        # 画面变化稳定后才触发OCR，静止时降低轮询频率
+        self.scheduler = scheduler or AdaptiveScheduler()
+        self.pending_tiles = set()
+        # 分块模式下只重新识别变化的区域
+        self.tiled_ocr = TiledOCR(ocr_engine, grid=self.frame_detector.grid)
+        # 选择识别区域配置后只截取和识别卡牌文字所在的区域
+        self.roi_profiles = roi_profiles or ROI_PROFILES
+        self.roi_mode = roi_mode
+        self.region_ocr = None
+        self.learned_ocr = LearnedRegionOCR(ocr_engine, mode=roi_mode)
+        # 已经确认过的卡牌标题直接按图像哈希得到名称，跳过OCR
+        self.card_recognizer = CardHashRecognizer(
+            ocr_engine,
+            lambda results: self.data_matcher.match_strategy(results, min_score=self.ocr_threshold_var.get()),
+            index=card_index
+        )
+        
+        # 截图、OCR、匹配三阶段流水线，回调在界面线程中执行
+        self.pipeline = RecognitionPipeline(
+            self.capture_frame,
+            self.recognize_frame,
+            self.match_ocr_results,
+            on_capture=lambda frame: self.update_image(frame[0]),
+            on_ocr=self.update_ocr_results,
+            on_match=self.on_strategies_matched,
+            merge_frames=lambda old, new: (new[0], sorted(set(old[1]) | set(new[1]))),
+            scheduler=self.scheduler,
+            # Tkinter不是线程安全的，各阶段的结果转到界面线程显示
+            dispatch=lambda func: self.root.after(0, func)
+        )
         
         # 创建UI组件
         self.create_widgets()
+        if roi_profile:
+            label = next(label for label, name in self.roi_labels.items() if name == roi_profile)
+            self.roi_var.set(label)
+            self.change_roi_profile()
     
     def create_widgets(self):
         """创建UI组件"""
@@ -69,6 +120,14 @@ class StrategyGUI:
         self.toggle_btn = ttk.Button(control_frame, text="启动识别", command=self.toggle_recognition)
         self.toggle_btn.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
         
+        # 流水线状态
+        self.status_label = ttk.Label(control_frame, text="")
+        self.status_label.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # OCR引擎状态
+        self.engine_label = ttk.Label(control_frame, text="")
+        self.engine_label.grid(row=4, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
         # 设置区域
         settings_frame = ttk.LabelFrame(control_frame, text="设置", padding="10")
         settings_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
@@ -81,6 +140,7 @@ class StrategyGUI:
         self.ocr_threshold_label = ttk.Label(settings_frame, text="0.7")
         self.ocr_threshold_label.grid(row=0, column=2, sticky=tk.W, pady=5)
         self.ocr_threshold_scale.bind("<Motion>", self.update_ocr_threshold_label)
+        self.ocr_threshold_scale.bind("<ButtonRelease-1>", lambda event: self.pipeline.rematch())
         
         # 匹配阈值
         ttk.Label(settings_frame, text="匹配阈值:").grid(row=1, column=0, sticky=tk.W, pady=5)
@@ -90,6 +150,22 @@ class StrategyGUI:
         self.match_threshold_label = ttk.Label(settings_frame, text="0.6")
         self.match_threshold_label.grid(row=1, column=2, sticky=tk.W, pady=5)
         self.match_threshold_scale.bind("<Motion>", self.update_match_threshold_label)
+        self.match_threshold_scale.bind("<ButtonRelease-1>", lambda event: self.pipeline.rematch())
+        
+        # 分块识别
+        self.tiled_var = tk.BooleanVar(value=False)
+        self.tiled_check = ttk.Checkbutton(settings_frame, text="分块识别（仅识别变化区域）", variable=self.tiled_var, command=self.tiled_ocr.reset)
+        self.tiled_check.grid(row=2, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # 识别区域
+        ttk.Label(settings_frame, text="识别区域:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        self.roi_labels = {"完整画面": None, "自动学习": "auto", "卡牌标题哈希": "card_hash"}
+        for name, profile in self.roi_profiles.items():
+            self.roi_labels[profile.get("label", name)] = name
+        self.roi_var = tk.StringVar(value="完整画面")
+        self.roi_combobox = ttk.Combobox(settings_frame, textvariable=self.roi_var, values=list(self.roi_labels), state="readonly")
+        self.roi_combobox.grid(row=3, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5, padx=5)
+        self.roi_combobox.bind("<<ComboboxSelected>>", lambda event: self.change_roi_profile())
         
         # 创建右侧显示区域
         display_frame = ttk.Frame(main_frame)
@@ -135,6 +211,10 @@ class StrategyGUI:
         
         # 刷新窗口列表
         self.refresh_window_list()
+        
+        # 引擎在后台启动，定期显示引擎状态
+        if hasattr(self.ocr_engine, "report"):
+            self.update_engine_status()
     
     def refresh_window_list(self):
         """刷新窗口列表"""
@@ -156,47 +236,138 @@ class StrategyGUI:
         value = round(self.match_threshold_var.get(), 2)
         self.match_threshold_label.config(text=str(value))
     
+    def change_roi_profile(self):
+        """切换识别区域配置"""
+        name = self.roi_labels.get(self.roi_var.get())
+        if name == "auto":
+            # 需要完整截图，以便定期识别完整画面
+            self.learned_ocr.reset()
+            self.region_ocr = self.learned_ocr
+        elif name == "card_hash":
+            self.region_ocr = self.card_recognizer
+        elif name:
+            profile = ROIProfile.from_config(name, self.roi_profiles)
+            self.region_ocr = RegionOCR(self.ocr_engine, profile, mode=self.roi_mode)
+        else:
+            self.region_ocr = None
+        # 截图范围变化，强制重新识别
+        self.frame_detector.reset()
+        self.tiled_ocr.reset()
+        self.scheduler.request_full_poll()
+    
     def toggle_recognition(self):
         """切换识别状态"""
         if self.is_running:
-            # 停止识别
+            # 停止识别，流水线线程自行退出，避免主线程等待导致卡死
             self.is_running = False
             self.toggle_btn.config(text="启动识别")
-            # 移除join()调用，避免主线程等待子线程导致卡死
+            self.pipeline.stop()
         else:
             # 启动识别
             self.is_running = True
             self.toggle_btn.config(text="停止识别")
-            # 使用守护线程，确保程序退出时子线程能自动结束
-            self.thread = threading.Thread(target=self.recognition_loop, daemon=True)
-            self.thread.start()
-    
-    def recognition_loop(self):
-        """识别循环"""
-        while self.is_running:
-            try:
-                # 捕获屏幕
-                screenshot = self.screen_capture.capture_window(self.window_var.get())
-                if screenshot:
-                    # 更新图像显示
-                    self.update_image(screenshot)
-                    
-                    # OCR识别
-                    ocr_results = self.ocr_engine.recognize_text(screenshot)
-                    
-                    # 更新OCR结果
-                    self.update_ocr_results(ocr_results)
-                    
-                    # 匹配策略
-                    strategies = self.data_matcher.match_strategy(ocr_results, min_score=self.ocr_threshold_var.get())
-                    
-                    # 更新策略建议
-                    self.update_strategies(strategies)
-            except Exception as e:
-                print(f"识别循环错误: {e}")
+            # 重新开始时强制识别第一帧
+            self.frame_detector.reset()
+            self.probe_detector.reset()
+            self.tiled_ocr.reset()
+            self.scheduler.reset()
+            self.pending_tiles.clear()
+            self.pipeline.start()
+    
+    def capture_frame(self):
+        """截图阶段：捕获屏幕，由调度器决定是否需要识别
+        
+        Returns:
+            tuple: (截图, 自上次识别以来变化的分块列表)，不需要识别时返回None
+        """
+        if self.scheduler.should_probe():
+            thumbnail = self.screen_capture.capture_thumbnail(self.probe_detector.thumb_size)
+            # 缩略图没有变化时不完整截图；无法截取缩略图时按原方式完整截图
+            if thumbnail is not None and not self.probe_detector.changed_tiles(thumbnail):
+                self.scheduler.observe(False, probe=True)
+                return None
+        
+        region_ocr = self.region_ocr
+        # 使用固定识别区域时只截取区域部分；自动学习没有固定区域，需要完整截图
+        roi_profile = getattr(region_ocr, "profile", None)
+        screenshot = self.screen_capture.capture_window(self.window_var.get(), roi_profile)
+        if not screenshot:
+            return None
+        changed_tiles = self.frame_detector.changed_tiles(screenshot)
+        self.pending_tiles.update(changed_tiles)
+        if not self.scheduler.observe(bool(changed_tiles)):
+            return None
+        changed_tiles, self.pending_tiles = sorted(self.pending_tiles), set()
+        return screenshot, changed_tiles
+    
+    def recognize_frame(self, frame):
+        """OCR阶段：识别截图
+        
+        Args:
+            frame: (截图, 变化分块列表)
             
-            # 控制识别频率
-            time.sleep(0.5)
+        Returns:
+            list: OCR识别结果
+        """
+        screenshot, changed_tiles = frame
+        region_ocr = self.region_ocr
+        if region_ocr:
+            return region_ocr.recognize(screenshot)
+        if self.tiled_var.get():
+            return self.tiled_ocr.recognize(screenshot, changed_tiles)
+        return self.ocr_engine.recognize_text(screenshot)
+    
+    def match_ocr_results(self, ocr_results):
+        """匹配阶段：根据OCR结果匹配策略，精确匹配不到时按匹配阈值容错匹配"""
+        strategies = self.data_matcher.match_strategy(ocr_results, min_score=self.ocr_threshold_var.get(),
+                                                      fuzzy_threshold=self.match_threshold_var.get())
+        if self.region_ocr is self.learned_ocr:
+            # 用匹配到策略的文本框位置学习识别区域
+            self.learned_ocr.feedback(ocr_results, strategies)
+        return strategies
+    
+    def on_strategy_reloaded(self, count):
+        """策略数据重新加载后(在监视线程中调用)，转到界面线程用最近一次的OCR结果重新匹配"""
+        print(f"策略数据已更新，共{count}条记录")
+        self.root.after(0, self.pipeline.rematch)
+    
+    def on_strategies_matched(self, strategies, latency):
+        """匹配完成回调：更新策略建议和流水线状态"""
+        self.update_strategies(strategies)
+        try:
+            report = self.pipeline.report()
+            cache = getattr(self.ocr_engine, "cache", None)
+            cache_text = f"  缓存命中率 {cache.hit_rate() * 100:.0f}%" if cache else ""
+            if self.region_ocr is self.card_recognizer:
+                cache_text += f"  卡牌哈希命中率 {self.card_recognizer.hit_rate() * 100:.0f}%"
+            self.status_label.config(text=(
+                f"截图 {report['capture']['throughput']:.1f}/s  "
+                f"识别 {report['ocr']['throughput']:.1f}/s  "
+                f"匹配 {report['match']['throughput']:.1f}/s\n"
+                f"丢弃过时画面 {report['ocr']['dropped']}  出结果耗时 {latency * 1000:.0f}ms\n"
+                f"轮询间隔 {self.scheduler.interval * 1000:.0f}ms  CPU {self.scheduler.cpu_usage() * 100:.1f}%{cache_text}"
+            ))
+        except Exception as e:
+            print(f"更新流水线状态失败: {e}")
+    
+    def update_engine_status(self):
+        """更新OCR引擎状态，每秒刷新一次"""
+        try:
+            report = self.ocr_engine.report()
+            states = {"starting": "启动中", "running": "运行中", "restarting": "重新启动中", "closed": "已关闭"}
+            text = f"OCR引擎{states.get(report['state'], report['state'])}"
+            if report["startup_time"] is not None:
+                text += f"  启动耗时 {report['startup_time']:.1f}s"
+            if report["first_frame_time"] is not None:
+                text += f"  首帧 {report['first_frame_time']:.1f}s"
+            if report["restarts"]:
+                text += f"\n重启 {report['restarts']}次  最近恢复耗时 {report['last_recovery_time'] or 0:.2f}s"
+            if report["standby"]:
+                text += "  备用引擎就绪"
+            self.engine_label.config(text=text)
+        except Exception as e:
+            print(f"更新引擎状态失败: {e}")
+        self.root.after(1000, self.update_engine_status)
     
     def update_image(self, image):
         """更新图像显示"""
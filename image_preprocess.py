@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图像预处理模块
+
+逐像素的运算(灰度转换、查表、均值滤波)都交给PIL的C实现，不在Python中逐像素处理；
+Python只在256级灰度直方图上计算阈值和查找表，不需要NumPy。
+"""
+
+from bisect import bisect_left
+from itertools import accumulate
+
+from PIL import Image, ImageChops, ImageFilter
+
+
+# 预处理方式：none不处理；threshold为原有的固定阈值二值化；
+# otsu按灰度直方图自动选择阈值；adaptive按局部均值二值化，适合渐变背景；
+# stretch只做对比度拉伸，保留灰度信息
+PREPROCESS_METHODS = ("none", "threshold", "otsu", "adaptive", "stretch")
+
+
+def threshold_lut(value):
+    """生成二值化查找表，灰度大于阈值的像素为255，其余为0
+
+    Args:
+        value: 阈值
+
+    Returns:
+        list: 256项查找表
+    """
+    return [255 if level > value else 0 for level in range(256)]
+
+
+def grayscale(image):
+    """转换为灰度图"""
+    return image if image.mode == "L" else image.convert("L")
+
+
+def threshold(gray, value=128):
+    """固定阈值二值化
+
+    Args:
+        gray: 灰度图
+        value: 阈值
+
+    Returns:
+        PIL.Image: 二值图
+    """
+    return gray.point(threshold_lut(value))
+
+
+def otsu_value(histogram):
+    """用大津法计算二值化阈值
+
+    Args:
+        histogram: 256级灰度直方图
+
+    Returns:
+        int: 使类间方差最大的阈值
+    """
+    total = sum(histogram)
+    sum_total = sum(level * count for level, count in enumerate(histogram))
+    weight_low = 0
+    sum_low = 0
+    # 纯色图像没有可分的两类，返回128
+    best_value, best_variance = 128, -1.0
+    for level, count in enumerate(histogram):
+        weight_low += count
+        sum_low += level * count
+        weight_high = total - weight_low
+        if not weight_low or not weight_high:
+            continue
+        mean_low = sum_low / weight_low
+        mean_high = (sum_total - sum_low) / weight_high
+        variance = weight_low * weight_high * (mean_low - mean_high) ** 2
+        if variance > best_variance:
+            best_value, best_variance = level, variance
+    return best_value
+
+
+def otsu_threshold(gray):
+    """大津法自动阈值二值化"""
+    return threshold(gray, otsu_value(gray.histogram()))
+
+
+def adaptive_threshold(gray, radius=15, offset=5):
+    """局部均值自适应二值化，比周围radius范围内的均值亮offset以上的像素为255
+
+    卡牌背景是渐变色，固定阈值会把一侧的背景和文字一起二值化为白色，局部均值可以跟随背景亮度。
+
+    Args:
+        gray: 灰度图
+        radius: 局部区域半径(像素)
+        offset: 比局部均值亮多少才视为文字
+
+    Returns:
+        PIL.Image: 二值图
+    """
+    local_mean = gray.filter(ImageFilter.BoxBlur(radius))
+    # 差值小于0时截断为0
+    brighter = ImageChops.subtract(gray, local_mean)
+    return brighter.point(threshold_lut(offset))
+
+
+def stretch_lut(histogram, low=1.0, high=99.0):
+    """生成对比度拉伸查找表，把low到high百分位之间的灰度线性映射到0-255
+
+    Args:
+        histogram: 256级灰度直方图
+        low: 下百分位
+        high: 上百分位
+
+    Returns:
+        list: 256项查找表，灰度范围过窄时返回None
+    """
+    cumulative = list(accumulate(histogram))
+    low_value = bisect_left(cumulative, cumulative[-1] * low / 100.0)
+    high_value = bisect_left(cumulative, cumulative[-1] * high / 100.0)
+    if high_value <= low_value:
+        return None
+    span = high_value - low_value
+    return [int(min(255.0, max(0.0, (level - low_value) * 255.0 / span))) for level in range(256)]
+
+
+def contrast_stretch(gray, low=1.0, high=99.0):
+    """对比度拉伸"""
+    lut = stretch_lut(gray.histogram(), low, high)
+    return gray.point(lut) if lut else gray
+
+
+def upscale(image, min_height):
+    """放大高度不足min_height的小图像，提高小字的识别率
+
+    Args:
+        image: PIL.Image对象
+        min_height: 最小高度(像素)，为0时不放大
+
+    Returns:
+        PIL.Image: 放大后的图像
+    """
+    if not min_height or image.height >= min_height:
+        return image
+    scale = min_height / image.height
+    return image.resize((round(image.width * scale), min_height), Image.Resampling.BICUBIC)
+
+
+def preprocess(image, method="threshold", threshold_value=128, upscale_min_height=0):
+    """按指定方式预处理图像
+
+    Args:
+        image: PIL.Image对象
+        method: 预处理方式，见PREPROCESS_METHODS
+        threshold_value: threshold方式的阈值
+        upscale_min_height: 图像高度小于该值时先放大，为0时不放大
+
+    Returns:
+        PIL.Image: 预处理后的图像，除none外均为灰度图
+    """
+    if method not in PREPROCESS_METHODS:
+        raise ValueError(f"不支持的预处理方式: {method}")
+    image = upscale(image, upscale_min_height)
+    if method == "none":
+        return image
+
+    gray = grayscale(image)
+    if method == "threshold":
+        return threshold(gray, threshold_value)
+    if method == "otsu":
+        return otsu_threshold(gray)
+    if method == "adaptive":
+        return adaptive_threshold(gray)
+    return contrast_stretch(gray)
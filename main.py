@@ -4,12 +4,20 @@
 崩铁货币战争策略助手主程序
 """
 
+import argparse
 import os
 import sys
 import time
 import threading
 import logging
 
+from startup_timer import StartupTimer
+
+# 尽早开始计时；指定--startup-timing时统计之后每个模块的导入耗时
+startup_timer = StartupTimer()
+if "--startup-timing" in sys.argv:
+    startup_timer.track_imports()
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -24,25 +32,74 @@ logger = logging.getLogger(__name__)
 # 添加PaddleOCR API路径到系统路径
 sys.path.append(os.path.join(os.path.dirname(__file__), 'PaddleOCR-json-main', 'api', 'python'))
 
+# 启动时只导入解析命令行参数需要的模块，界面、截图等模块在main中创建实例前才导入，
+# PaddleOCR API在后台启动引擎时导入
 try:
-    from PPOCR_api import GetOcrApi
-    from data_matcher import DataMatcher
-    from screen_capture import ScreenCapture
-    from ocr_engine import OCREngine
-    from gui import StrategyGUI
-    
-    # GUI相关导入
-    from tkinter import Tk
-    from PIL import Image, ImageTk
-    import mss
-    import mss.tools
+    from ocr_engine import TRANSPORT_FORMATS
+    from roi_profiles import ROI_PROFILES, load_profiles
+    from image_preprocess import PREPROCESS_METHODS
 except ImportError as e:
     logger.error(f"导入模块失败: {e}")
     sys.exit(1)
 
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="崩铁货币战争策略助手")
+    parser.add_argument("--ocr-workers", type=int, default=1,
+                        help="OCR引擎进程数量，大于1时使用进程池并行识别分块")
+    parser.add_argument("--ocr-standby", action="store_true",
+                        help="保留一个备用OCR引擎进程，主引擎崩溃时立即切换")
+    parser.add_argument("--transport", choices=list(TRANSPORT_FORMATS), default="png",
+                        help="发送给OCR引擎的图像传输方式")
+    parser.add_argument("--preprocess", choices=PREPROCESS_METHODS, default="threshold",
+                        help="图像预处理方式，识别区域配置中可以为每个区域单独指定")
+    parser.add_argument("--threshold", type=int, default=128,
+                        help="threshold预处理方式的二值化阈值")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        help="OCR结果缓存的最大条目数，为0时不使用缓存")
+    parser.add_argument("--cache-max-age", type=float, default=None,
+                        help="OCR结果缓存条目的最长存活时间(秒)，默认不过期")
+    parser.add_argument("--cache-file", default=None,
+                        help="OCR结果缓存文件，指定时在两次运行之间保留缓存")
+    parser.add_argument("--card-index", default=None,
+                        help="卡牌标题哈希索引文件，指定时在两次运行之间保留已确认的卡牌")
+    parser.add_argument("--cpu-budget", type=float, default=0.2,
+                        help="截图及画面变化检测允许占用的CPU时间比例(0-1]")
+    parser.add_argument("--roi-profile", default=None,
+                        help=f"启动时使用的识别区域配置，auto为自动学习，card_hash为卡牌标题哈希识别，"
+                             f"内置配置: {', '.join(ROI_PROFILES)}")
+    parser.add_argument("--roi-config", default=None,
+                        help="自定义识别区域配置JSON文件，格式同roi_profiles.ROI_PROFILES")
+    parser.add_argument("--roi-mode", choices=["composite", "separate"], default=None,
+                        help="识别区域的发送方式：拼接为一张图像或分别发送，默认单引擎拼接、进程池分别发送")
+    parser.add_argument("--watch-interval", type=float, default=1.0,
+                        help="检查策略数据文件变化的间隔(秒)，文件变化时在后台重新加载，为0时不检查")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="界面显示后输出各启动阶段和各模块导入的耗时")
+    return parser.parse_args()
+
+
 def main():
     """主函数"""
+    args = parse_args()
+    startup_timer.mark("导入基础模块")
+    try:
+        from data_matcher import DataMatcher
+        from strategy_watcher import StrategyFileWatcher
+        from screen_capture import ScreenCapture
+        from ocr_pool import OCREnginePool
+        from ocr_manager import ManagedOCREngine
+        from ocr_cache import OCRCache
+        from card_hash import CardHashIndex
+        from gui import StrategyGUI
+        from scheduler import AdaptiveScheduler
+        from tkinter import Tk
+    except ImportError as e:
+        logger.error(f"导入模块失败: {e}")
+        sys.exit(1)
+    startup_timer.mark("导入界面模块")
+    
     try:
         logger.info("启动崩铁货币战争策略助手")
         
@@ -66,21 +123,67 @@ def main():
         logger.info("创建屏幕捕获实例")
         screen_capture = ScreenCapture()
         
-        logger.info("创建OCR引擎实例")
-        ocr_engine = OCREngine(ocr_exe_path)
+        ocr_cache = None
+        if args.cache_size > 0:
+            ocr_cache = OCRCache(args.cache_size, max_age=args.cache_max_age, path=args.cache_file)
+        
+        if args.ocr_workers > 1:
+            # 引擎在后台启动，不阻塞界面显示
+            logger.info(f"创建OCR引擎进程池，共{args.ocr_workers}个引擎")
+            ocr_engine = OCREnginePool(ocr_exe_path, size=args.ocr_workers, transport=args.transport,
+                                       preprocess_method=args.preprocess, threshold=args.threshold,
+                                       cache=ocr_cache, wait=False)
+        else:
+            logger.info("创建OCR引擎实例")
+            ocr_engine = ManagedOCREngine(ocr_exe_path, standby=args.ocr_standby, transport=args.transport,
+                                          preprocess_method=args.preprocess, threshold=args.threshold,
+                                          cache=ocr_cache)
+        startup_timer.mark("创建OCR引擎")
         
         logger.info("创建数据匹配实例")
         data_matcher = DataMatcher(strategy_data_path)
+        startup_timer.mark("加载策略数据")
         
         # 创建GUI实例
         logger.info("创建GUI实例")
         root = Tk()
-        gui = StrategyGUI(root, screen_capture, ocr_engine, data_matcher)
+        scheduler = AdaptiveScheduler(cpu_budget=args.cpu_budget)
+        roi_profiles = load_profiles(args.roi_config) if args.roi_config else ROI_PROFILES
+        if args.roi_profile and args.roi_profile not in ("auto", "card_hash") and args.roi_profile not in roi_profiles:
+            logger.error(f"识别区域配置不存在: {args.roi_profile}")
+            return
+        roi_mode = args.roi_mode or ("separate" if args.ocr_workers > 1 else "composite")
+        card_index = CardHashIndex(path=args.card_index)
+        gui = StrategyGUI(root, screen_capture, ocr_engine, data_matcher, scheduler,
+                          roi_profiles=roi_profiles, roi_profile=args.roi_profile, roi_mode=roi_mode,
+                          card_index=card_index)
+        startup_timer.mark("创建界面")
+        
+        # 修改策略数据后在后台重新加载，不需要重启程序和OCR引擎
+        watcher = None
+        if args.watch_interval > 0:
+            watcher = StrategyFileWatcher(data_matcher, interval=args.watch_interval,
+                                          on_reload=gui.on_strategy_reloaded)
+        
+        def on_first_idle():
+            """界面第一次空闲时，即窗口已经显示，记录启动耗时"""
+            startup_timer.mark("显示界面")
+            startup_timer.stop_tracking()
+            logger.info(f"界面已显示，启动耗时{startup_timer.elapsed():.2f}秒")
+            if args.startup_timing:
+                logger.info("\n" + startup_timer.report())
         
         # 启动GUI主循环
         logger.info("启动GUI主循环")
+        root.after_idle(on_first_idle)
         root.mainloop()
         
+        if watcher:
+            watcher.close()
+        if ocr_cache:
+            ocr_cache.save()
+        card_index.save()
+        
     except Exception as e:
         logger.error(f"程序运行错误: {e}", exc_info=True)
 
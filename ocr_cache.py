@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR结果缓存模块
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def copy_results(results):
+    """复制识别结果，调用方修改文本框坐标时不影响缓存中的数据
+
+    Args:
+        results: 识别结果列表
+
+    Returns:
+        list: 识别结果的副本
+    """
+    return [dict(result, box=[list(point) for point in result["box"]]) for result in results]
+
+
+class OCRCache:
+    """OCR结果缓存类
+
+    以图像像素内容的哈希为键缓存识别结果，相同的画面或卡牌区域再次出现时直接返回缓存结果，
+    不再发送给OCR引擎。按条目数量和存活时间淘汰最久未使用的条目，可以保存到文件供下次启动使用。
+    """
+
+    def __init__(self, max_entries=256, max_age=None, path=None, clock=time.time):
+        """初始化缓存
+
+        Args:
+            max_entries: 最多缓存的条目数
+            max_age: 条目的最长存活时间(秒)，为None时不过期
+            path: 缓存文件路径，指定时启动时加载、关闭时保存
+            clock: 返回当前时间(秒)的函数，写入时间随缓存文件保存，应使用time.time
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.path = path
+        self.clock = clock
+        self.entries = OrderedDict()  # 键到(写入时间, 识别结果)的映射，按最近使用排序
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def key(image):
+        """计算图像内容的哈希键
+
+        Args:
+            image: PIL.Image对象，一般为预处理后的图像
+
+        Returns:
+            str: 哈希键
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """查找缓存
+
+        Args:
+            key: 哈希键
+
+        Returns:
+            list: 识别结果的副本，未命中时返回None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.max_age is not None and self.clock() - entry[0] > self.max_age:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return copy_results(entry[1])
+
+    def put(self, key, results):
+        """写入缓存，超过条目数时淘汰最久未使用的条目
+
+        Args:
+            key: 哈希键
+            results: 识别结果
+        """
+        with self.lock:
+            self.entries[key] = (self.clock(), copy_results(results))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存和命中统计"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def hit_rate(self):
+        """缓存命中率
+
+        Returns:
+            float: 命中次数占查找次数的比例
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """缓存统计
+
+        Returns:
+            dict: {"entries": 条目数, "hits": 命中次数, "misses": 未命中次数, "hit_rate": 命中率}
+        """
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate()
+        }
+
+    def load(self):
+        """从缓存文件加载条目，跳过已过期的条目"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            now = self.clock()
+            with self.lock:
+                for key, (saved_at, results) in data.items():
+                    if self.max_age is not None and now - saved_at > self.max_age:
+                        continue
+                    self.entries[key] = (saved_at, results)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            print(f"加载OCR缓存{len(self.entries)}条")
+        except Exception as e:
+            print(f"加载OCR缓存失败: {e}")
+
+    def save(self):
+        """保存缓存到文件，先写临时文件再替换，避免写入中断时损坏缓存文件"""
+        if not self.path:
+            return
+        try:
+            with self.lock:
+                data = {key: [saved_at, results] for key, (saved_at, results) in self.entries.items()}
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"保存OCR缓存失败: {e}")
@@ -4,36 +4,98 @@
 OCR引擎模块
 """
 
+import io
 import os
+import tempfile
 import time
 from PIL import Image
 
-from PPOCR_api import GetOcrApi
+import image_preprocess
+
+
+# 图像传输方式：传输方式名称到(PIL保存格式, 保存参数)的映射
+# png为原有方式；png_fast降低压缩等级；bmp不压缩，编码几乎没有开销
+# file方式将BMP写入临时文件，通过image_path传给引擎，省去base64编码和管道传输
+TRANSPORT_FORMATS = {
+    "png": ("PNG", {}),
+    "png_fast": ("PNG", {"compress_level": 1}),
+    "bmp": ("BMP", {}),
+    "file": ("BMP", {}),
+}
+
+
+def encode_image(image, transport="png"):
+    """按传输方式将图像编码为字节流
+    
+    Args:
+        image: PIL.Image对象
+        transport: 传输方式，见TRANSPORT_FORMATS
+        
+    Returns:
+        bytes: 编码后的图像字节流
+    """
+    image_format, params = TRANSPORT_FORMATS[transport]
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **params)
+    return buffer.getvalue()
 
 
 class OCREngine:
     """OCR引擎类"""
     
-    def __init__(self, ocr_exe_path):
+    def __init__(self, ocr_exe_path, transport="png", ipc_mode="pipe",
+                 preprocess_method="threshold", threshold=128, cache=None):
         """初始化OCR引擎
         
         Args:
             ocr_exe_path: PaddleOCR-json.exe路径
+            transport: 图像传输方式，可选png、png_fast、bmp、file
+            ipc_mode: 进程通信模式，可选pipe、socket
+            preprocess_method: 图像预处理方式，见image_preprocess.PREPROCESS_METHODS
+            threshold: threshold预处理方式的二值化阈值
+            cache: OCRCache实例，指定时相同内容的图像直接返回缓存的识别结果
         """
         self.ocr_exe_path = ocr_exe_path
+        self.transport = transport
+        self.ipc_mode = ipc_mode
+        self.preprocess_method = preprocess_method
+        self.threshold = threshold
+        self.cache = cache
+        self.temp_image_path = None
         self.ocr_api = None
+        if transport not in TRANSPORT_FORMATS:
+            raise ValueError(f"不支持的图像传输方式: {transport}")
+        if preprocess_method not in image_preprocess.PREPROCESS_METHODS:
+            raise ValueError(f"不支持的预处理方式: {preprocess_method}")
         self.init_ocr()
     
     def init_ocr(self):
         """初始化OCR引擎"""
         try:
+            # PPOCR_api依赖asyncio，导入较慢，在引擎启动时(一般在后台线程中)才导入
+            from PPOCR_api import GetOcrApi
+            
             # 初始化OCR引擎
-            self.ocr_api = GetOcrApi(self.ocr_exe_path)
+            self.ocr_api = GetOcrApi(self.ocr_exe_path, ipcMode=self.ipc_mode)
             print("OCR引擎初始化成功")
         except Exception as e:
             print(f"OCR引擎初始化失败: {e}")
             self.ocr_api = None
     
+    def is_alive(self):
+        """检查OCR引擎是否可用
+        
+        Returns:
+            bool: 引擎子进程是否仍在运行
+        """
+        if not self.ocr_api:
+            return False
+        process = getattr(self.ocr_api, "ret", None)
+        if process is None:
+            # 远程引擎没有本地子进程
+            return self.ocr_api.getRunningMode() == "remote"
+        return process.poll() is None
+    
     def preprocess_image(self, image):
         """图像预处理
         
@@ -44,14 +106,7 @@ class OCREngine:
             PIL.Image: 预处理后的图像
         """
         try:
-            # 转换为灰度图
-            gray_image = image.convert("L")
-            
-            # 二值化处理
-            threshold = 128
-            binary_image = gray_image.point(lambda p: p > threshold and 255)
-            
-            return binary_image
+            return image_preprocess.preprocess(image, self.preprocess_method, threshold_value=self.threshold)
         except Exception as e:
             print(f"图像预处理失败: {e}")
             return image
@@ -64,29 +119,44 @@ class OCREngine:
             preprocess: 是否进行图像预处理
             
         Returns:
-            list: 识别结果，格式为[{"text": "文本内容", "score": 置信度}, ...]
+            list: 识别结果，格式为[{"text": "文本内容", "score": 置信度, "box": 文本框四角坐标}, ...]
         """
-        try:
-            if not self.ocr_api:
-                # 重新初始化OCR引擎
-                self.init_ocr()
-                if not self.ocr_api:
-                    return []
+        results = self.run_recognition(image, preprocess)
+        return [] if results is None else results
+    
+    def run_recognition(self, image, preprocess=True):
+        """识别图像中的文本，区分没有文字和识别失败
+        
+        Args:
+            image: PIL.Image对象
+            preprocess: 是否进行图像预处理
             
+        Returns:
+            list: 识别结果，格式同recognize_text，图片中没有文字时为空列表，识别失败时为None
+        """
+        try:
             # 图像预处理
             if preprocess:
                 processed_image = self.preprocess_image(image)
             else:
                 processed_image = image
             
-            # 转换为字节流
-            import io
-            img_byte_arr = io.BytesIO()
-            processed_image.save(img_byte_arr, format='PNG')
-            img_byte_arr = img_byte_arr.getvalue()
+            # 按预处理后的像素内容查找缓存
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.key(processed_image)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            if not self.ocr_api:
+                # 重新初始化OCR引擎
+                self.init_ocr()
+                if not self.ocr_api:
+                    return None
             
             # 调用OCR API
-            result = self.ocr_api.runBytes(img_byte_arr)
+            result = self.run_image(processed_image)
             
             # 处理识别结果
             if result["code"] == 100:
@@ -95,16 +165,66 @@ class OCREngine:
                 for item in result["data"]:
                     ocr_results.append({
                         "text": item["text"],
-                        "score": item["score"]
+                        "score": item["score"],
+                        "box": item["box"]
                     })
+                if cache_key:
+                    self.cache.put(cache_key, ocr_results)
                 return ocr_results
+            elif result["code"] == 101:
+                # 图片中没有文字
+                if cache_key:
+                    self.cache.put(cache_key, [])
+                return []
             else:
                 # 识别失败
                 print(f"OCR识别失败: {result['data']}")
-                return []
+                return None
         except Exception as e:
             print(f"OCR识别异常: {e}")
-            return []
+            return None
+    
+    def run_image(self, image):
+        """按配置的传输方式将图像发送给OCR引擎
+        
+        Args:
+            image: PIL.Image对象
+            
+        Returns:
+            dict: OCR API返回值，格式为{"code": 识别码, "data": 内容列表或错误信息}
+        """
+        # 远程引擎无法读取本地临时文件，改用bmp字节流
+        if self.transport == "file" and self.ocr_api.getRunningMode() == "local":
+            if not self.temp_image_path:
+                fd, self.temp_image_path = tempfile.mkstemp(suffix=".bmp", prefix="ocr_frame_")
+                os.close(fd)
+            with open(self.temp_image_path, "wb") as f:
+                f.write(encode_image(image, self.transport))
+            return self.ocr_api.run(self.temp_image_path)
+        
+        transport = "bmp" if self.transport == "file" else self.transport
+        return self.ocr_api.runBytes(encode_image(image, transport))
+    
+    def recognize_regions(self, image, regions, preprocess=True):
+        """分别识别图像中的多个区域
+        
+        Args:
+            image: PIL.Image对象
+            regions: 区域列表，格式为[(left, top, right, bottom), ...]
+            preprocess: 是否进行图像预处理
+            
+        Returns:
+            list: 每个区域的识别结果列表，文本框坐标已换算为整幅图像中的坐标。
+                区域中没有文字时为空列表，识别失败时为None
+        """
+        region_results = []
+        for left, top, right, bottom in regions:
+            crop = image.crop((left, top, right, bottom))
+            results = self.run_recognition(crop, preprocess)
+            for result in results or []:
+                result["box"] = [[x + left, y + top] for x, y in result["box"]]
+            region_results.append(results)
+        return region_results
     
     def recognize_image_path(self, image_path, preprocess=True):
         """识别指定路径图像中的文本
@@ -132,6 +252,9 @@ class OCREngine:
             if self.ocr_api:
                 self.ocr_api.exit()
                 print("OCR引擎已关闭")
+            if self.temp_image_path:
+                os.remove(self.temp_image_path)
+                self.temp_image_path = None
         except Exception as e:
             print(f"关闭OCR引擎失败: {e}")
     
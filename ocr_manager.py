@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR引擎生命周期管理模块
+"""
+
+import threading
+import time
+
+import image_preprocess
+from ocr_engine import OCREngine
+
+
+class ManagedOCREngine:
+    """托管的OCR引擎类
+
+    在后台线程启动PaddleOCR-json引擎，界面无需等待引擎初始化即可显示；
+    定期发送空指令检查引擎是否存活，引擎崩溃或卡死时在后台按指数退避重新启动，
+    可选保留一个已经初始化完成的备用引擎，主引擎崩溃时立即切换。
+    对外提供与OCREngine相同的识别接口。
+    """
+
+    def __init__(self, ocr_exe_path, standby=False, heartbeat_interval=5.0, hang_timeout=30.0,
+                 start_timeout=60.0, backoff=1.0, max_backoff=30.0, **engine_args):
+        """初始化并在后台启动引擎
+
+        Args:
+            ocr_exe_path: PaddleOCR-json.exe路径
+            standby: 是否保留一个备用引擎
+            heartbeat_interval: 空闲时检查引擎的间隔(秒)
+            hang_timeout: 单次请求超过该时间(秒)未返回时视为卡死，结束引擎进程
+            start_timeout: 识别请求等待引擎启动的最长时间(秒)
+            backoff: 重新启动失败后的首次等待时间(秒)，之后每次翻倍
+            max_backoff: 重新启动等待时间的上限(秒)
+            engine_args: 传给OCREngine的其他参数(transport、preprocess_method、cache等)
+        """
+        self.ocr_exe_path = ocr_exe_path
+        self.engine_args = engine_args
+        self.use_standby = standby
+        self.heartbeat_interval = heartbeat_interval
+        self.hang_timeout = hang_timeout
+        self.start_timeout = start_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.engine = None
+        self.standby = None
+        self.ready = threading.Event()
+        self.lock = threading.Lock()  # 保证同一时间只有一个请求使用主引擎
+        self.state_lock = threading.Lock()
+        self.closed = False
+        self.busy_since = None
+        self.last_used = time.perf_counter()
+
+        # 统计
+        self.created_at = time.perf_counter()
+        self.startup_time = None  # 创建到引擎可用的耗时
+        self.first_frame_time = None  # 创建到第一次识别完成的耗时
+        self.recovery_times = []  # 每次从发现引擎失效到新引擎可用的耗时
+        self.restarts = 0
+
+        self.heartbeat_thread = None
+        threading.Thread(target=self.start_engine, daemon=True).start()
+        self.monitor_thread = threading.Thread(target=self.monitor, daemon=True)
+        self.monitor_thread.start()
+
+    # OCREngine的配置属性，供RegionOCR等读取
+    @property
+    def preprocess_method(self):
+        return self.engine_args.get("preprocess_method", "threshold")
+
+    @property
+    def threshold(self):
+        return self.engine_args.get("threshold", 128)
+
+    @property
+    def cache(self):
+        return self.engine_args.get("cache")
+
+    def create_engine(self):
+        """创建一个引擎实例，启动失败时返回None"""
+        engine = OCREngine(self.ocr_exe_path, **self.engine_args)
+        if not engine.is_alive():
+            engine.close()
+            return None
+        return engine
+
+    def start_engine(self):
+        """后台启动主引擎和备用引擎"""
+        engine = self.create_with_backoff()
+        if engine is None:
+            return
+        with self.state_lock:
+            self.engine = engine
+        self.startup_time = time.perf_counter() - self.created_at
+        print(f"OCR引擎后台启动完成，耗时{self.startup_time:.2f}秒")
+        self.ready.set()
+        if self.use_standby:
+            self.start_standby()
+
+    def create_with_backoff(self):
+        """创建引擎，失败时按指数退避重试，直到成功或已关闭
+
+        Returns:
+            OCREngine: 新引擎，已关闭时返回None
+        """
+        delay = self.backoff
+        while not self.closed:
+            engine = self.create_engine()
+            if engine is not None:
+                if self.closed:
+                    engine.close()
+                    return None
+                return engine
+            print(f"OCR引擎启动失败，{delay:.0f}秒后重试")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+        return None
+
+    def start_standby(self):
+        """在后台启动备用引擎"""
+        def run():
+            engine = self.create_with_backoff()
+            if engine is None:
+                return
+            with self.state_lock:
+                if self.standby is None and not self.closed:
+                    self.standby = engine
+                    return
+            engine.close()
+        threading.Thread(target=run, daemon=True).start()
+
+    def recover(self, failed_engine):
+        """主引擎失效：切换到备用引擎，或在后台重新启动
+
+        Args:
+            failed_engine: 失效的引擎
+        """
+        detected_at = time.perf_counter()
+        with self.state_lock:
+            if self.engine is not failed_engine or self.closed:
+                # 已经由其他线程处理
+                return
+            self.restarts += 1
+            standby, self.standby = self.standby, None
+            if standby is not None and standby.is_alive():
+                self.engine = standby
+            else:
+                self.engine = None
+                self.ready.clear()
+        failed_engine.close()
+
+        if self.engine is not None:
+            self.recovery_times.append(time.perf_counter() - detected_at)
+            print(f"OCR引擎已崩溃，已切换到备用引擎，耗时{self.recovery_times[-1] * 1000:.0f}毫秒")
+            self.start_standby()
+            return
+
+        print("OCR引擎已崩溃，正在后台重新启动")
+
+        def run():
+            engine = self.create_with_backoff()
+            if engine is None:
+                return
+            with self.state_lock:
+                self.engine = engine
+            self.recovery_times.append(time.perf_counter() - detected_at)
+            print(f"OCR引擎重新启动完成，耗时{self.recovery_times[-1]:.2f}秒")
+            self.ready.set()
+            if self.use_standby:
+                self.start_standby()
+        threading.Thread(target=run, daemon=True).start()
+
+    def call(self, method, *args):
+        """在主引擎上执行识别，引擎失效时切换或重启并在新引擎上重试一次
+
+        Args:
+            method: OCREngine的方法名
+            args: 方法参数
+
+        Returns:
+            方法返回值，引擎不可用时返回None
+        """
+        for _ in range(2):
+            if not self.ready.wait(self.start_timeout):
+                print("等待OCR引擎启动超时")
+                return None
+            with self.lock:
+                engine = self.engine
+                if engine is None:
+                    continue
+                self.busy_since = time.perf_counter()
+                try:
+                    result = getattr(engine, method)(*args)
+                finally:
+                    self.busy_since = None
+                    self.last_used = time.perf_counter()
+            if engine.is_alive():
+                if self.first_frame_time is None:
+                    self.first_frame_time = time.perf_counter() - self.created_at
+                    print(f"OCR引擎首次识别完成，距启动{self.first_frame_time:.2f}秒")
+                return result
+            self.recover(engine)
+        return None
+
+    def monitor(self):
+        """后台检查：请求或心跳卡死时结束引擎进程，空闲时发送空指令确认引擎存活
+
+        心跳在单独的线程中发送，心跳卡死时监视线程仍能按hang_timeout结束引擎进程。
+        """
+        while not self.closed:
+            time.sleep(min(self.heartbeat_interval, self.hang_timeout) / 2)
+            engine = self.engine
+            if engine is None:
+                continue
+            busy_since = self.busy_since
+            if busy_since is not None:
+                if time.perf_counter() - busy_since > self.hang_timeout:
+                    print("OCR引擎请求超时，结束引擎进程")
+                    self.kill(engine)
+                continue
+            if time.perf_counter() - self.last_used < self.heartbeat_interval:
+                continue
+            if self.heartbeat_thread is not None and self.heartbeat_thread.is_alive():
+                continue
+            self.heartbeat_thread = threading.Thread(target=self.check_heartbeat, args=(engine,), daemon=True)
+            self.heartbeat_thread.start()
+
+    def check_heartbeat(self, engine):
+        """心跳线程：发送空指令，引擎失效时切换或重启
+
+        Args:
+            engine: 主引擎
+        """
+        if not self.heartbeat(engine):
+            self.recover(engine)
+
+    def heartbeat(self, engine):
+        """向空闲的主引擎发送空指令
+
+        Args:
+            engine: 主引擎
+
+        Returns:
+            bool: 引擎是否存活，引擎正忙时视为存活
+        """
+        if not self.lock.acquire(blocking=False):
+            return True
+        try:
+            if engine is not self.engine or engine.ocr_api is None:
+                return True
+            self.busy_since = time.perf_counter()
+            result = engine.ocr_api.runDict({})
+            self.last_used = time.perf_counter()
+            # 9xx为进程或通信错误，其余返回值(包括"没有图片"的错误)说明引擎可以响应
+            return engine.is_alive() and not 900 <= result.get("code", 900) < 1000
+        except Exception as e:
+            print(f"OCR引擎心跳检查失败: {e}")
+            return False
+        finally:
+            self.busy_since = None
+            self.lock.release()
+
+    @staticmethod
+    def kill(engine):
+        """结束卡死的引擎进程，使阻塞的读取返回"""
+        process = getattr(engine.ocr_api, "ret", None)
+        if process is not None:
+            process.kill()
+
+    def is_alive(self):
+        """主引擎是否可用"""
+        engine = self.engine
+        return engine is not None and engine.is_alive()
+
+    def preprocess_image(self, image):
+        """图像预处理，与OCREngine相同"""
+        try:
+            return image_preprocess.preprocess(image, self.preprocess_method, threshold_value=self.threshold)
+        except Exception as e:
+            print(f"图像预处理失败: {e}")
+            return image
+
+    def recognize_text(self, image, preprocess=True):
+        """识别图像中的文本，格式同OCREngine.recognize_text"""
+        return self.call("recognize_text", image, preprocess) or []
+
+    def recognize_regions(self, image, regions, preprocess=True):
+        """分别识别图像中的多个区域，格式同OCREngine.recognize_regions"""
+        return self.call("recognize_regions", image, regions, preprocess) or [None for _ in regions]
+
+    def recognize_image_path(self, image_path, preprocess=True):
+        """识别指定路径图像中的文本"""
+        return self.call("recognize_image_path", image_path, preprocess) or []
+
+    def report(self):
+        """生命周期统计
+
+        Returns:
+            dict: {"state": 状态, "startup_time": 启动耗时秒数, "first_frame_time": 启动到首次识别的秒数,
+                   "restarts": 重启次数, "last_recovery_time": 最近一次恢复耗时秒数, "standby": 是否有备用引擎}
+        """
+        if self.closed:
+            state = "closed"
+        elif self.ready.is_set():
+            state = "running"
+        elif self.startup_time is None:
+            state = "starting"
+        else:
+            state = "restarting"
+        return {
+            "state": state,
+            "startup_time": self.startup_time,
+            "first_frame_time": self.first_frame_time,
+            "restarts": self.restarts,
+            "last_recovery_time": self.recovery_times[-1] if self.recovery_times else None,
+            "standby": self.standby is not None
+        }
+
+    def close(self):
+        """关闭主引擎和备用引擎"""
+        with self.state_lock:
+            self.closed = True
+            engines = [self.engine, self.standby]
+            self.engine = None
+            self.standby = None
+        for engine in engines:
+            if engine is not None:
+                engine.close()
+
+    def __del__(self):
+        """析构函数，关闭引擎"""
+        self.close()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR引擎进程池模块
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ocr_engine import OCREngine
+
+
+class OCREnginePool:
+    """OCR引擎进程池类
+
+    启动多个PaddleOCR-json引擎进程，把图像或分块分发给空闲的引擎并行识别。
+    引擎进程崩溃时在后台重新启动，并把当前请求交给其他引擎重试。
+    对外提供与OCREngine相同的recognize_text和recognize_regions接口。
+    """
+
+    def __init__(self, ocr_exe_path, size=None, transport="png", ipc_mode="pipe",
+                 preprocess_method="threshold", threshold=128, cache=None, wait=True):
+        """初始化OCR引擎进程池
+
+        Args:
+            ocr_exe_path: PaddleOCR-json.exe路径
+            size: 引擎进程数量，默认为CPU核心数的一半
+            transport: 图像传输方式，见OCREngine
+            ipc_mode: 进程通信模式，可选pipe、socket
+            preprocess_method: 图像预处理方式，见OCREngine
+            threshold: threshold预处理方式的二值化阈值
+            cache: OCRCache实例，所有引擎共用
+            wait: 是否等待所有引擎启动完成，为False时引擎在后台启动，识别请求等待第一个可用的引擎
+        """
+        self.ocr_exe_path = ocr_exe_path
+        self.size = size or max(1, (os.cpu_count() or 2) // 2)
+        self.transport = transport
+        self.ipc_mode = ipc_mode
+        self.preprocess_method = preprocess_method
+        self.threshold = threshold
+        self.cache = cache
+        self.idle_engines = queue.Queue()
+        self.engines = []
+        self.lock = threading.Lock()
+        self.closed = False
+        self.starting = self.size  # 正在启动的引擎数量
+        self.executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="ocr_pool")
+
+        # 并行启动所有引擎，每个引擎初始化都需要数秒
+        threads = [threading.Thread(target=self.spawn_engine, daemon=True) for _ in range(self.size)]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+            print(f"OCR引擎进程池初始化完成，共{self.idle_engines.qsize()}个引擎")
+
+    def spawn_engine(self):
+        """启动一个引擎并放入空闲队列
+
+        启动失败后没有可用的引擎、也没有正在启动的引擎时，放入结束标记，等待空闲引擎的请求立即失败。
+        """
+        try:
+            engine = OCREngine(self.ocr_exe_path, transport=self.transport, ipc_mode=self.ipc_mode,
+                               preprocess_method=self.preprocess_method, threshold=self.threshold,
+                               cache=self.cache)
+        except Exception as e:
+            print(f"OCR引擎启动失败: {e}")
+            with self.lock:
+                self.starting -= 1
+                if not self.closed and not self.engines and not self.starting:
+                    self.idle_engines.put(None)
+            return
+        with self.lock:
+            self.starting -= 1
+            if self.closed:
+                engine.close()
+                return
+            self.engines.append(engine)
+            self.idle_engines.put(engine)
+
+    def acquire_engine(self):
+        """取出一个空闲引擎，没有空闲引擎时等待
+
+        Returns:
+            OCREngine: 空闲引擎
+
+        Raises:
+            RuntimeError: 进程池已关闭，或所有引擎都启动失败
+        """
+        engine = self.idle_engines.get()
+        if engine is None:
+            # 结束标记放回队列，唤醒其他等待的线程
+            self.idle_engines.put(None)
+            if self.closed:
+                raise RuntimeError("OCR引擎进程池已关闭")
+            raise RuntimeError("OCR引擎进程池没有可用的引擎")
+        return engine
+
+    def release_engine(self, engine):
+        """把引擎放回空闲队列，进程池关闭后不再放回
+
+        Args:
+            engine: 使用完的引擎
+        """
+        with self.lock:
+            if not self.closed:
+                self.idle_engines.put(engine)
+
+    def respawn_engine(self, engine):
+        """关闭崩溃的引擎，并在后台启动一个新引擎替代它
+
+        Args:
+            engine: 崩溃的引擎
+        """
+        print("OCR引擎进程已崩溃，正在重新启动")
+        with self.lock:
+            if engine in self.engines:
+                self.engines.remove(engine)
+            self.starting += 1
+        engine.close()
+        threading.Thread(target=self.spawn_engine, daemon=True).start()
+
+    def run_on_idle_engine(self, method, *args, retries=None):
+        """在空闲引擎上执行识别，引擎崩溃时换一个引擎重试
+
+        Args:
+            method: OCREngine的方法名
+            args: 方法参数
+            retries: 引擎崩溃时的重试次数，默认为引擎数量，保证所有引擎同时崩溃时也能在新引擎上完成
+
+        Returns:
+            方法返回值
+
+        Raises:
+            RuntimeError: 进程池已关闭，或所有引擎都启动失败
+        """
+        if retries is None:
+            retries = self.size
+        for _ in range(retries + 1):
+            engine = self.acquire_engine()
+            result = getattr(engine, method)(*args)
+            if self.closed:
+                return result
+            if engine.is_alive():
+                self.release_engine(engine)
+                return result
+            self.respawn_engine(engine)
+        return result
+
+    def recognize_text(self, image, preprocess=True):
+        """识别图像中的文本
+
+        Args:
+            image: PIL.Image对象
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 识别结果，格式同OCREngine.recognize_text
+        """
+        return self.run_on_idle_engine("recognize_text", image, preprocess)
+
+    def recognize_many(self, images, preprocess=True):
+        """并行识别多张图像
+
+        Args:
+            images: PIL.Image对象列表
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 每张图像的识别结果列表
+        """
+        futures = [self.executor.submit(self.recognize_text, image, preprocess) for image in images]
+        return [future.result() for future in futures]
+
+    def recognize_regions(self, image, regions, preprocess=True):
+        """并行识别图像中的多个区域
+
+        Args:
+            image: PIL.Image对象
+            regions: 区域列表，格式为[(left, top, right, bottom), ...]
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 每个区域的识别结果列表，文本框坐标已换算为整幅图像中的坐标，识别失败的区域为None
+        """
+        futures = [
+            self.executor.submit(self.run_on_idle_engine, "recognize_regions", image, [region], preprocess)
+            for region in regions
+        ]
+        return [future.result()[0] for future in futures]
+
+    def close(self):
+        """关闭所有引擎，正在等待空闲引擎的请求抛出RuntimeError"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            engines = list(self.engines)
+            self.engines.clear()
+            # 清空空闲队列并放入关闭标记
+            while not self.idle_engines.empty():
+                self.idle_engines.get_nowait()
+            self.idle_engines.put(None)
+        for engine in engines:
+            engine.close()
+        self.executor.shutdown(wait=False)
+
+    def __del__(self):
+        """析构函数，关闭所有引擎"""
+        self.close()
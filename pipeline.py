@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别流水线模块
+"""
+
+import threading
+import time
+
+
+class LatestQueue:
+    """只保留最新数据的有界队列
+
+    队列已满时丢弃最旧的数据（最新数据优先），
+    可以通过merge函数把被丢弃的数据合并进新数据，避免丢失信息。
+    """
+
+    def __init__(self, maxsize=1, merge=None):
+        """初始化队列
+
+        Args:
+            maxsize: 队列容量
+            merge: 合并函数merge(旧数据, 新数据)，返回合并后的新数据
+        """
+        self.maxsize = maxsize
+        self.merge = merge
+        self.items = []
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        """放入数据，队列已满时丢弃最旧的数据
+
+        Args:
+            item: 数据
+        """
+        with self.condition:
+            while len(self.items) >= self.maxsize:
+                old = self.items.pop(0)
+                if self.merge:
+                    item = self.merge(old, item)
+                self.dropped += 1
+            self.items.append(item)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """取出最旧的数据
+
+        Args:
+            timeout: 超时时间(秒)
+
+        Returns:
+            数据，超时返回None
+        """
+        with self.condition:
+            if not self.items:
+                self.condition.wait(timeout)
+            if not self.items:
+                return None
+            return self.items.pop(0)
+
+    def clear(self):
+        """清空队列并重置丢弃计数"""
+        with self.condition:
+            self.items.clear()
+            self.dropped = 0
+
+
+class StageStats:
+    """流水线阶段统计"""
+
+    def __init__(self, name):
+        """初始化统计
+
+        Args:
+            name: 阶段名称
+        """
+        self.name = name
+        self.count = 0
+        self.busy_time = 0.0
+        self.start_time = time.perf_counter()
+
+    def record(self, duration):
+        """记录一次处理
+
+        Args:
+            duration: 处理耗时(秒)
+        """
+        self.count += 1
+        self.busy_time += duration
+
+    def throughput(self):
+        """每秒处理数量"""
+        elapsed = time.perf_counter() - self.start_time
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def average_time(self):
+        """平均处理耗时(秒)"""
+        return self.busy_time / self.count if self.count else 0.0
+
+
+class RecognitionPipeline:
+    """三阶段识别流水线
+
+    截图、OCR、匹配分别在独立线程中运行，阶段之间用只保留最新数据的有界队列连接。
+    OCR跟不上截图速度时丢弃过时的画面，端到端延迟取决于最慢的阶段而不是各阶段之和。
+    各阶段的回调通过dispatch转交给调用方(如界面线程)执行。每次启动使用新的队列，待执行的回调带有所属的运行，
+    停止或重新启动后，上一次运行的线程产生的结果不会进入新的队列，也不再显示。
+    """
+
+    def __init__(self, capture_func, ocr_func, match_func,
+                 on_capture=None, on_ocr=None, on_match=None,
+                 capture_interval=0.1, merge_frames=None, scheduler=None, dispatch=None):
+        """初始化流水线
+
+        Args:
+            capture_func: 截图函数，返回画面数据，返回None表示没有需要识别的新画面
+            ocr_func: OCR函数，参数为画面数据，返回识别结果
+            match_func: 匹配函数，参数为识别结果，返回匹配到的策略
+            on_capture: 截图完成回调on_capture(画面数据)
+            on_ocr: OCR完成回调on_ocr(识别结果)
+            on_match: 匹配完成回调on_match(策略, 端到端延迟秒数)
+            capture_interval: 两次截图之间的间隔(秒)
+            merge_frames: 丢弃过时画面时的合并函数merge(旧画面数据, 新画面数据)
+            scheduler: 自适应调度器，指定时由调度器决定截图间隔，
+                延迟从触发识别的画面变化开始计算
+            dispatch: 执行回调的函数dispatch(无参数函数)，例如lambda func: root.after(0, func)
+                把回调转到Tkinter界面线程，默认在阶段线程中直接执行
+        """
+        self.capture_func = capture_func
+        self.ocr_func = ocr_func
+        self.match_func = match_func
+        self.on_capture = on_capture
+        self.on_ocr = on_ocr
+        self.on_match = on_match
+        self.capture_interval = capture_interval
+        self.scheduler = scheduler
+        self.dispatch = dispatch or (lambda func: func())
+
+        # 队列中的数据格式为(截图时间, 数据)
+        if merge_frames:
+            self.merge = lambda old, new: (old[0], merge_frames(old[1], new[1]))
+        else:
+            self.merge = None
+        self.ocr_queue = LatestQueue(merge=self.merge)
+        self.match_queue = LatestQueue()
+
+        self.stats = {}
+        self.last_ocr = None
+        self.stop_event = None
+        self.threads = []
+
+    @property
+    def running(self):
+        """流水线是否正在运行"""
+        return self.stop_event is not None and not self.stop_event.is_set()
+
+    def start(self):
+        """启动流水线"""
+        if self.running:
+            return
+        # 每次启动使用新的停止事件和队列，上一次尚未退出的线程不受影响，也不会把结果放入新的队列
+        self.stop_event = threading.Event()
+        self.ocr_queue = LatestQueue(merge=self.merge)
+        self.match_queue = LatestQueue()
+        self.last_ocr = None
+        self.stats = {name: StageStats(name) for name in ("capture", "ocr", "match")}
+        queues = (self.ocr_queue, self.match_queue)
+        self.threads = [
+            threading.Thread(target=stage, args=(self.stop_event,) + queues, daemon=True)
+            for stage in (self.capture_stage, self.ocr_stage, self.match_stage)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """停止流水线，不等待线程结束，避免阻塞调用方"""
+        if self.stop_event:
+            self.stop_event.set()
+
+    def rematch(self):
+        """用最近一次的OCR结果重新匹配，例如匹配参数变化时"""
+        if self.last_ocr is not None and self.running:
+            self.match_queue.put((time.perf_counter(), self.last_ocr[1]))
+
+    def publish(self, stop_event, callback, *args):
+        """通过dispatch执行回调，执行时所属的运行已经停止则丢弃
+
+        Args:
+            stop_event: 产生结果的运行的停止事件
+            callback: 回调函数，为None时不执行
+            args: 回调参数
+        """
+        if callback is None or stop_event.is_set():
+            return
+
+        def run():
+            if not stop_event.is_set():
+                callback(*args)
+
+        self.dispatch(run)
+
+    def capture_stage(self, stop_event, ocr_queue, match_queue):
+        """截图阶段"""
+        while not stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                frame = self.capture_func()
+                if frame is not None:
+                    origin = start
+                    if self.scheduler and self.scheduler.last_trigger_origin is not None:
+                        origin = self.scheduler.last_trigger_origin
+                    ocr_queue.put((origin, frame))
+                    self.publish(stop_event, self.on_capture, frame)
+            except Exception as e:
+                print(f"截图阶段错误: {e}")
+            duration = time.perf_counter() - start
+            self.stats["capture"].record(duration)
+            if self.scheduler:
+                stop_event.wait(self.scheduler.next_interval(duration))
+            else:
+                stop_event.wait(max(0.0, self.capture_interval - duration))
+
+    def ocr_stage(self, stop_event, ocr_queue, match_queue):
+        """OCR阶段"""
+        while not stop_event.is_set():
+            item = ocr_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            captured_at, frame = item
+            start = time.perf_counter()
+            try:
+                ocr_results = self.ocr_func(frame)
+                # 识别期间已停止时丢弃结果，避免覆盖新一次运行的数据
+                if stop_event.is_set():
+                    break
+                self.last_ocr = (captured_at, ocr_results)
+                match_queue.put(self.last_ocr)
+                self.publish(stop_event, self.on_ocr, ocr_results)
+            except Exception as e:
+                print(f"OCR阶段错误: {e}")
+            self.stats["ocr"].record(time.perf_counter() - start)
+
+    def match_stage(self, stop_event, ocr_queue, match_queue):
+        """匹配阶段"""
+        while not stop_event.is_set():
+            item = match_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            captured_at, ocr_results = item
+            start = time.perf_counter()
+            try:
+                strategies = self.match_func(ocr_results)
+                self.publish(stop_event, self.on_match, strategies, time.perf_counter() - captured_at)
+            except Exception as e:
+                print(f"匹配阶段错误: {e}")
+            self.stats["match"].record(time.perf_counter() - start)
+
+    def report(self):
+        """生成各阶段的吞吐量统计
+
+        Returns:
+            dict: 阶段名称到{"throughput": 每秒处理数量, "average_time": 平均耗时秒数, "dropped": 丢弃数量}的映射
+        """
+        dropped = {"capture": 0, "ocr": self.ocr_queue.dropped, "match": self.match_queue.dropped}
+        return {
+            name: {
+                "throughput": stats.throughput(),
+                "average_time": stats.average_time(),
+                "dropped": dropped[name]
+            }
+            for name, stats in self.stats.items()
+        }
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别区域自动学习模块
+"""
+
+import re
+import threading
+
+from roi_profiles import RegionOCR
+
+
+def matched_blocks(ocr_results, strategies):
+    """找出与匹配到的策略名称有关的文本块
+
+    策略名称可能被OCR拆分成多个文本块，文本块包含策略名称，
+    或文本块中的汉字(至少2个)是策略名称的一部分时，都认为该文本块有用。
+
+    Args:
+        ocr_results: OCR识别结果
+        strategies: 匹配到的策略列表
+
+    Returns:
+        list: 有用的文本块
+    """
+    names = [str(strategy["名称"]) for strategy in strategies]
+    blocks = []
+    for result in ocr_results:
+        chinese_text = ''.join(re.findall(r'[\u4e00-\u9fa5]+', result["text"]))
+        for name in names:
+            if name in result["text"] or (len(chinese_text) >= 2 and chinese_text in name):
+                blocks.append(result)
+                break
+    return blocks
+
+
+class ROILearner:
+    """识别区域学习类
+
+    在相对坐标网格上累计匹配到策略的文本框位置，得到有用文字出现位置的热力图，
+    再把热度足够的格子合并为矩形区域。区域使用相对坐标，同一画面比例的不同分辨率可以共用。
+    """
+
+    def __init__(self, grid=(64, 36), min_hits=2, decay=0.98, padding=0.02):
+        """初始化识别区域学习器
+
+        Args:
+            grid: 热力图网格(列数, 行数)
+            min_hits: 格子热度达到该值才划入识别区域
+            decay: 每次学习时热力图的衰减系数，使区域能跟随界面布局变化
+            padding: 区域向外扩展的比例(相对于画面宽高)，避免切断文字
+        """
+        self.grid = grid
+        self.min_hits = min_hits
+        self.decay = decay
+        self.padding = padding
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清空热力图"""
+        with self.lock:
+            columns, rows = self.grid
+            self.heatmap = [[0.0] * columns for _ in range(rows)]
+            self.samples = 0
+            self.cached_regions = None
+
+    def observe(self, blocks, image_size):
+        """累计一帧中有用文本块的位置
+
+        Args:
+            blocks: 有用的文本块列表，见matched_blocks
+            image_size: 文本框坐标所在画面的尺寸(width, height)
+        """
+        if not blocks:
+            return
+        columns, rows = self.grid
+        width, height = image_size
+        with self.lock:
+            for row in self.heatmap:
+                for column in range(columns):
+                    row[column] *= self.decay
+            for block in blocks:
+                xs = [point[0] for point in block["box"]]
+                ys = [point[1] for point in block["box"]]
+                left = max(0, int(min(xs) / width * columns))
+                right = min(columns - 1, int(max(xs) / width * columns))
+                top = max(0, int(min(ys) / height * rows))
+                bottom = min(rows - 1, int(max(ys) / height * rows))
+                for y in range(top, bottom + 1):
+                    for x in range(left, right + 1):
+                        self.heatmap[y][x] += 1.0
+            self.samples += 1
+            self.cached_regions = None
+
+    def relative_regions(self):
+        """根据热力图计算相对坐标的识别区域
+
+        Returns:
+            list: [(left, top, right, bottom), ...]，取值0-1，还没有学习到区域时为空列表
+        """
+        with self.lock:
+            if self.cached_regions is None:
+                self.cached_regions = self.build_regions()
+            return self.cached_regions
+
+    def build_regions(self):
+        """把热度足够的相邻格子合并为外接矩形，再扩展并合并重叠的矩形"""
+        columns, rows = self.grid
+        hot = [[value >= self.min_hits for value in row] for row in self.heatmap]
+        visited = [[False] * columns for _ in range(rows)]
+        rects = []
+        for y in range(rows):
+            for x in range(columns):
+                if not hot[y][x] or visited[y][x]:
+                    continue
+                # 遍历与当前格子相连的热格子
+                left, top, right, bottom = x, y, x, y
+                stack = [(x, y)]
+                visited[y][x] = True
+                while stack:
+                    cx, cy = stack.pop()
+                    left, top = min(left, cx), min(top, cy)
+                    right, bottom = max(right, cx), max(bottom, cy)
+                    for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                        if 0 <= nx < columns and 0 <= ny < rows and hot[ny][nx] and not visited[ny][nx]:
+                            visited[ny][nx] = True
+                            stack.append((nx, ny))
+                rects.append((
+                    max(0.0, left / columns - self.padding),
+                    max(0.0, top / rows - self.padding),
+                    min(1.0, (right + 1) / columns + self.padding),
+                    min(1.0, (bottom + 1) / rows + self.padding)
+                ))
+
+        # 扩展后重叠的矩形合并为一个
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    a, b = rects[i], rects[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        rects[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                        del rects[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        rects.sort(key=lambda rect: (rect[1], rect[0]))
+        return rects
+
+    def regions(self, size):
+        """计算识别区域的像素坐标，接口与ROIProfile.regions相同
+
+        Args:
+            size: 画面尺寸(width, height)
+
+        Returns:
+            list: 区域列表，格式为[(left, top, right, bottom), ...]
+        """
+        width, height = size
+        return [
+            (round(left * width), round(top * height), round(right * width), round(bottom * height))
+            for left, top, right, bottom in self.relative_regions()
+        ]
+
+    def region_options(self, size):
+        """学习到的区域都使用OCR引擎的预处理方式，接口与ROIProfile.region_options相同"""
+        return [{} for _ in self.relative_regions()]
+
+
+class LearnedRegionOCR:
+    """自动学习识别区域的OCR类
+
+    还没有学习到区域时识别完整画面；学习到区域后只识别这些区域，
+    每隔refresh_interval帧，或者区域内没有匹配到策略时，识别一次完整画面，发现新的文字位置。
+    """
+
+    def __init__(self, ocr_engine, learner=None, refresh_interval=10, mode="composite"):
+        """初始化
+
+        Args:
+            ocr_engine: OCR引擎实例
+            learner: ROILearner实例，默认使用默认参数创建
+            refresh_interval: 完整画面识别的间隔帧数
+            mode: 区域发送方式，见RegionOCR
+        """
+        self.ocr_engine = ocr_engine
+        self.learner = learner or ROILearner()
+        self.region_ocr = RegionOCR(ocr_engine, self.learner, mode=mode)
+        self.refresh_interval = refresh_interval
+        self.frames_since_refresh = 0
+        self.force_full = True
+        self.last_full_frame = False
+        self.image_size = None
+
+    def reset(self):
+        """清空学习结果"""
+        self.learner.reset()
+        self.frames_since_refresh = 0
+        self.force_full = True
+
+    def recognize(self, image, preprocess=True):
+        """识别图像
+
+        Args:
+            image: PIL.Image对象
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 识别结果，文本框坐标为整幅图像中的坐标
+        """
+        self.image_size = image.size
+        full = (self.force_full
+                or self.frames_since_refresh >= self.refresh_interval
+                or not self.learner.relative_regions())
+        self.last_full_frame = full
+        if full:
+            self.force_full = False
+            self.frames_since_refresh = 0
+            return self.ocr_engine.recognize_text(image, preprocess)
+        self.frames_since_refresh += 1
+        return self.region_ocr.recognize(image, preprocess)
+
+    def feedback(self, ocr_results, strategies):
+        """根据匹配结果学习识别区域
+
+        Args:
+            ocr_results: OCR识别结果
+            strategies: 匹配到的策略列表
+        """
+        if not strategies:
+            # 学习到的区域里没有匹配到策略，可能界面布局变化了，下一帧识别完整画面
+            if not self.last_full_frame:
+                self.force_full = True
+            return
+        if self.image_size:
+            self.learner.observe(matched_blocks(ocr_results, strategies), self.image_size)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别区域(ROI)配置模块
+"""
+
+import json
+from bisect import bisect_right
+
+from PIL import Image
+
+import image_preprocess
+from tiled_ocr import box_center
+
+
+# 常见画面比例
+ASPECT_RATIOS = {
+    "16:9": 16 / 9,
+    "16:10": 16 / 10,
+    "21:9": 64 / 27,
+}
+
+# 内置的识别区域配置：配置名称到{"label": 显示名称, "layouts": {画面比例: [(区域名称, 相对坐标), ...]}}的映射
+# 相对坐标格式为(left, top, right, bottom)，取值0-1，相对于游戏窗口
+# 游戏界面以16:9为基准，更宽的窗口两侧留空，更高的窗口上下留空
+# 区域可以附加第三项预处理选项，格式为预处理方式名称，或{"preprocess": 预处理方式, "upscale_min_height": 最小高度}；
+# 配置中的"preprocess"为所有区域的默认预处理选项，未指定时使用OCR引擎的预处理方式
+ROI_PROFILES = {
+    "currency_war_cards": {
+        "label": "货币战争选择界面（卡牌）",
+        # 卡牌背景是渐变色，按局部均值二值化
+        "preprocess": "adaptive",
+        "layouts": {
+            "16:9": [
+                ("卡牌1", (0.170, 0.220, 0.370, 0.780)),
+                ("卡牌2", (0.400, 0.220, 0.600, 0.780)),
+                ("卡牌3", (0.630, 0.220, 0.830, 0.780)),
+            ],
+            "16:10": [
+                ("卡牌1", (0.170, 0.248, 0.370, 0.752)),
+                ("卡牌2", (0.400, 0.248, 0.600, 0.752)),
+                ("卡牌3", (0.630, 0.248, 0.830, 0.752)),
+            ],
+            "21:9": [
+                ("卡牌1", (0.253, 0.220, 0.403, 0.780)),
+                ("卡牌2", (0.425, 0.220, 0.575, 0.780)),
+                ("卡牌3", (0.598, 0.220, 0.748, 0.780)),
+            ],
+        },
+    },
+    "currency_war_titles": {
+        "label": "货币战争选择界面（仅标题）",
+        "preprocess": "otsu",
+        "layouts": {
+            "16:9": [
+                ("标题1", (0.170, 0.220, 0.370, 0.320)),
+                ("标题2", (0.400, 0.220, 0.600, 0.320)),
+                ("标题3", (0.630, 0.220, 0.830, 0.320)),
+            ],
+            "16:10": [
+                ("标题1", (0.170, 0.248, 0.370, 0.338)),
+                ("标题2", (0.400, 0.248, 0.600, 0.338)),
+                ("标题3", (0.630, 0.248, 0.830, 0.338)),
+            ],
+            "21:9": [
+                ("标题1", (0.253, 0.220, 0.403, 0.320)),
+                ("标题2", (0.425, 0.220, 0.575, 0.320)),
+                ("标题3", (0.598, 0.220, 0.748, 0.320)),
+            ],
+        },
+    },
+}
+
+
+def load_profiles(path):
+    """从JSON文件加载识别区域配置，与内置配置合并
+
+    JSON格式与ROI_PROFILES相同，同名配置覆盖内置配置。
+
+    Args:
+        path: JSON文件路径
+
+    Returns:
+        dict: 合并后的配置
+    """
+    profiles = dict(ROI_PROFILES)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for name, profile in json.load(f).items():
+                profiles[name] = {
+                    "label": profile.get("label", name),
+                    "preprocess": profile.get("preprocess"),
+                    "layouts": {
+                        ratio: [(roi[0], tuple(roi[1])) + tuple(roi[2:]) for roi in rois]
+                        for ratio, rois in profile["layouts"].items()
+                    },
+                }
+    except Exception as e:
+        print(f"加载识别区域配置失败: {e}")
+    return profiles
+
+
+def parse_options(options):
+    """把区域的预处理选项统一为字典
+
+    Args:
+        options: 预处理方式名称、选项字典或None
+
+    Returns:
+        dict: {"preprocess": 预处理方式, "upscale_min_height": 最小高度}，未指定的项不包含在内
+    """
+    if not options:
+        return {}
+    if isinstance(options, str):
+        options = {"preprocess": options}
+    method = options.get("preprocess")
+    if method and method not in image_preprocess.PREPROCESS_METHODS:
+        raise ValueError(f"不支持的预处理方式: {method}")
+    return {key: value for key, value in options.items() if value}
+
+
+def parse_ratio(ratio):
+    """将"16:9"格式的画面比例转换为数值"""
+    if ratio in ASPECT_RATIOS:
+        return ASPECT_RATIOS[ratio]
+    width, height = ratio.split(":")
+    return float(width) / float(height)
+
+
+class ROIProfile:
+    """识别区域配置类
+
+    保存一组按画面比例区分的相对矩形，根据实际窗口尺寸选择最接近的比例并换算为像素坐标。
+    """
+
+    def __init__(self, name, layouts, label=None, preprocess=None):
+        """初始化识别区域配置
+
+        Args:
+            name: 配置名称
+            layouts: 画面比例到[(区域名称, 相对坐标[, 预处理选项]), ...]的映射
+            label: 显示名称
+            preprocess: 所有区域的默认预处理选项
+        """
+        self.name = name
+        self.label = label or name
+        self.preprocess = parse_options(preprocess)
+        self.layouts = {parse_ratio(ratio): rois for ratio, rois in layouts.items()}
+
+    @classmethod
+    def from_config(cls, name, profiles=None):
+        """从配置字典创建识别区域配置
+
+        Args:
+            name: 配置名称
+            profiles: 配置字典，默认为ROI_PROFILES
+
+        Returns:
+            ROIProfile: 识别区域配置
+        """
+        profile = (profiles or ROI_PROFILES)[name]
+        return cls(name, profile["layouts"], profile.get("label"), profile.get("preprocess"))
+
+    def layout(self, size):
+        """选择与画面比例最接近的区域列表
+
+        Args:
+            size: 画面尺寸(width, height)
+
+        Returns:
+            list: [(区域名称, 相对坐标), ...]
+        """
+        ratio = size[0] / size[1]
+        closest = min(self.layouts, key=lambda layout_ratio: abs(layout_ratio - ratio))
+        return self.layouts[closest]
+
+    def regions(self, size):
+        """计算区域的像素坐标
+
+        Args:
+            size: 画面尺寸(width, height)
+
+        Returns:
+            list: 区域列表，格式为[(left, top, right, bottom), ...]
+        """
+        width, height = size
+        return [
+            (round(left * width), round(top * height), round(right * width), round(bottom * height))
+            for _, (left, top, right, bottom), *_ in self.layout(size)
+        ]
+
+    def region_options(self, size):
+        """每个区域的预处理选项
+
+        Args:
+            size: 画面尺寸(width, height)
+
+        Returns:
+            list: 与regions对应的选项字典列表，见parse_options
+        """
+        return [
+            dict(self.preprocess, **parse_options(roi[2] if len(roi) > 2 else None))
+            for roi in self.layout(size)
+        ]
+
+    def mask(self, image):
+        """只保留区域内的像素，其余部分填充为黑色
+
+        Args:
+            image: PIL.Image对象
+
+        Returns:
+            PIL.Image: 处理后的图像，尺寸不变
+        """
+        masked = Image.new(image.mode, image.size)
+        for region in self.regions(image.size):
+            masked.paste(image.crop(region), region[:2])
+        return masked
+
+
+def compose_images(images, spacing=16):
+    """把多张图像从上到下拼接成一张图像
+
+    Args:
+        images: PIL.Image对象列表，模式需要相同
+        spacing: 图像之间的空白像素数，避免相邻区域的文字被识别为同一行
+
+    Returns:
+        tuple: (拼接后的图像, 每张图像在拼接图像中的纵坐标列表)
+    """
+    width = max(image.width for image in images)
+    height = sum(image.height for image in images) + spacing * (len(images) - 1)
+    composite = Image.new(images[0].mode, (width, height))
+    offsets = []
+    y = 0
+    for image in images:
+        composite.paste(image, (0, y))
+        offsets.append(y)
+        y += image.height + spacing
+    return composite, offsets
+
+
+def compose_regions(image, regions, spacing=16):
+    """把多个区域从上到下拼接成一张图像
+
+    Args:
+        image: PIL.Image对象
+        regions: 区域列表，格式为[(left, top, right, bottom), ...]
+        spacing: 区域之间的空白像素数
+
+    Returns:
+        tuple: (拼接后的图像, 每个区域在拼接图像中的纵坐标列表)
+    """
+    return compose_images([image.crop(region) for region in regions], spacing)
+
+
+class RegionOCR:
+    """区域OCR类
+
+    只识别识别区域配置中的区域，其余界面文字(HUD、按钮等)不送入OCR引擎。
+    composite模式把所有区域拼接成一张图像，只需一次识别请求；
+    separate模式每个区域单独发送，配合引擎进程池可以并行识别。
+    """
+
+    def __init__(self, ocr_engine, profile, mode="composite"):
+        """初始化区域OCR
+
+        Args:
+            ocr_engine: OCR引擎实例，composite模式需要recognize_text方法，separate模式需要recognize_regions方法，
+                区域指定了预处理选项时separate模式使用recognize_many方法(没有时逐个调用recognize_text)
+            profile: ROIProfile实例
+            mode: 发送方式，可选composite、separate
+        """
+        if mode not in ("composite", "separate"):
+            raise ValueError(f"不支持的区域识别方式: {mode}")
+        self.ocr_engine = ocr_engine
+        self.profile = profile
+        self.mode = mode
+
+    def recognize(self, image, preprocess=True):
+        """识别图像中的区域
+
+        Args:
+            image: PIL.Image对象
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 识别结果，文本框坐标为整幅图像中的坐标，按从上到下、从左到右排序
+        """
+        regions = self.profile.regions(image.size)
+        if not regions:
+            return []
+        options = self.profile.region_options(image.size)
+        if any(options):
+            results = self.recognize_crops(image, regions, options, preprocess)
+        elif self.mode == "separate":
+            results = [
+                result
+                for region_results in self.ocr_engine.recognize_regions(image, regions, preprocess)
+                for result in region_results or []
+            ]
+        else:
+            results = self.recognize_composite(image, regions, preprocess)
+        results.sort(key=lambda result: box_center(result["box"])[::-1])
+        return results
+
+    def recognize_composite(self, image, regions, preprocess=True):
+        """把区域拼接成一张图像识别，再把文本框换算回原图坐标
+
+        Args:
+            image: PIL.Image对象
+            regions: 区域列表
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 识别结果
+        """
+        composite, offsets = compose_regions(image, regions)
+        results = []
+        for result in self.ocr_engine.recognize_text(composite, preprocess):
+            _, center_y = box_center(result["box"])
+            # 按文本框中心所在的纵向位置找到所属区域
+            index = max(0, bisect_right(offsets, center_y) - 1)
+            left, top = regions[index][:2]
+            dy = top - offsets[index]
+            result["box"] = [[x + left, y + dy] for x, y in result["box"]]
+            results.append(result)
+        return results
+
+    def prepare_crop(self, image, region, options, preprocess=True):
+        """裁剪区域并按区域的选项放大和预处理
+
+        Args:
+            image: PIL.Image对象
+            region: 区域
+            options: 区域的预处理选项
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            tuple: (处理后的图像, 放大倍数)
+        """
+        crop = image.crop(region)
+        scaled = image_preprocess.upscale(crop, options.get("upscale_min_height", 0))
+        if preprocess:
+            method = options.get("preprocess") or getattr(self.ocr_engine, "preprocess_method", "threshold")
+            threshold = getattr(self.ocr_engine, "threshold", 128)
+            scaled = image_preprocess.preprocess(scaled, method, threshold_value=threshold)
+        return scaled, scaled.height / crop.height
+
+    def recognize_crops(self, image, regions, options, preprocess=True):
+        """按区域各自的预处理选项处理后识别，再把文本框换算回原图坐标
+
+        Args:
+            image: PIL.Image对象
+            regions: 区域列表
+            options: 每个区域的预处理选项
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 识别结果
+        """
+        prepared = [self.prepare_crop(image, region, option, preprocess) for region, option in zip(regions, options)]
+        crops = [crop for crop, _ in prepared]
+        if self.mode == "separate":
+            if hasattr(self.ocr_engine, "recognize_many"):
+                crop_results = self.ocr_engine.recognize_many(crops, False)
+            else:
+                crop_results = [self.ocr_engine.recognize_text(crop, False) for crop in crops]
+            located = [
+                (index, 0, result)
+                for index, results in enumerate(crop_results)
+                for result in results
+            ]
+        else:
+            # 不同预处理方式的区域模式可能不同，统一为灰度图再拼接
+            if len({crop.mode for crop in crops}) > 1:
+                crops = [crop.convert("L") for crop in crops]
+            composite, offsets = compose_images(crops)
+            located = []
+            for result in self.ocr_engine.recognize_text(composite, False):
+                _, center_y = box_center(result["box"])
+                index = max(0, bisect_right(offsets, center_y) - 1)
+                located.append((index, offsets[index], result))
+
+        results = []
+        for index, offset, result in located:
+            left, top = regions[index][:2]
+            scale = prepared[index][1]
+            result["box"] = [[x / scale + left, (y - offset) / scale + top] for x, y in result["box"]]
+            results.append(result)
+        return results
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应识别调度模块
+"""
+
+import time
+
+
+class AdaptiveScheduler:
+    """自适应识别调度类
+
+    以较高频率做廉价的画面变化检测，画面变化稳定下来后才触发一次完整的OCR；
+    画面静止时轮询间隔按指数退避，同时限制截图阶段占用的CPU时间比例。
+    没有待稳定的变化时只截取缩略图检测变化(见should_probe)，缩略图变化后再完整截图。
+    """
+
+    def __init__(self, min_interval=0.03, max_interval=0.25, backoff=1.5,
+                 settle_time=0.1, max_settle_wait=1.0, cpu_budget=0.2, full_poll_interval=2.0):
+        """初始化调度器
+
+        Args:
+            min_interval: 最短轮询间隔(秒)，画面变化后使用
+            max_interval: 最长轮询间隔(秒)，画面长时间静止时退避到该值。短于切换动画(约0.3秒)，
+                动画期间至少检测到一次变化，画面稳定后不需要再等一个轮询间隔
+            backoff: 画面静止时轮询间隔的增长倍数
+            settle_time: 画面保持不变超过该时间(秒)才认为变化已稳定，为0时检测到变化立即触发
+            max_settle_wait: 画面持续变化(如动画)超过该时间(秒)也触发识别
+            cpu_budget: 截图阶段允许占用的CPU时间比例(0-1]
+            full_poll_interval: 只用缩略图检测变化时，至少每隔该时间(秒)完整截图检测一次，
+                发现缩略图中看不出的细小变化
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.settle_time = settle_time
+        self.max_settle_wait = max_settle_wait
+        self.cpu_budget = cpu_budget
+        self.full_poll_interval = full_poll_interval
+        self.reset()
+
+    def reset(self):
+        """重置调度状态和统计"""
+        self.interval = self.min_interval
+        self.pending_since = None  # 尚未稳定的变化开始时间
+        self.last_change = None  # 最近一次检测到变化的时间
+        self.last_trigger_origin = None  # 最近一次触发识别的变化开始时间
+        self.work_average = 0.0  # 截图阶段平均耗时
+        self.last_full_poll = None  # 最近一次完整截图检测的时间
+        self.polls = 0
+        self.probes = 0  # 只截取缩略图的轮询次数
+        self.triggers = 0
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def should_probe(self, now=None):
+        """本次轮询是否只截取缩略图检测变化
+
+        没有待稳定的变化、且距上一次完整截图检测不到full_poll_interval时只截取缩略图，
+        缩略图没有变化时直接调用observe(False, probe=True)，变化时再完整截图检测。
+
+        Args:
+            now: 当前时间(time.perf_counter)，默认为调用时间
+
+        Returns:
+            bool: 是否只截取缩略图
+        """
+        if now is None:
+            now = time.perf_counter()
+        return (self.pending_since is None and self.last_full_poll is not None
+                and now - self.last_full_poll < self.full_poll_interval)
+
+    def request_full_poll(self):
+        """下一次轮询完整截图检测，用于截图范围变化等缩略图无法反映的情况"""
+        self.last_full_poll = None
+
+    def observe(self, changed, now=None, probe=False):
+        """记录一次画面变化检测结果，判断是否需要触发OCR
+
+        Args:
+            changed: 画面是否变化
+            now: 当前时间(time.perf_counter)，默认为调用时间
+            probe: 是否只截取了缩略图
+
+        Returns:
+            bool: 是否触发OCR
+        """
+        if now is None:
+            now = time.perf_counter()
+        self.polls += 1
+        if probe:
+            self.probes += 1
+        else:
+            self.last_full_poll = now
+
+        if changed:
+            if self.pending_since is None:
+                self.pending_since = now
+            self.last_change = now
+            self.interval = self.min_interval
+            if self.settle_time <= 0 or now - self.pending_since >= self.max_settle_wait:
+                return self.trigger()
+            return False
+
+        if self.pending_since is not None:
+            # 变化后画面保持不变足够长时间，认为已经稳定
+            if now - self.last_change >= self.settle_time:
+                return self.trigger()
+            return False
+
+        # 画面静止，轮询间隔指数退避
+        self.interval = min(self.interval * self.backoff, self.max_interval)
+        return False
+
+    def trigger(self):
+        """触发一次识别"""
+        self.last_trigger_origin = self.pending_since
+        self.pending_since = None
+        self.triggers += 1
+        return True
+
+    def next_interval(self, work_time):
+        """计算到下一次轮询的等待时间
+
+        Args:
+            work_time: 本次截图阶段耗时(秒)
+
+        Returns:
+            float: 等待时间(秒)
+        """
+        self.work_average = 0.8 * self.work_average + 0.2 * work_time
+        # 工作时间占比不超过CPU预算：work / (work + wait) <= cpu_budget
+        budget_wait = self.work_average * (1.0 / self.cpu_budget - 1.0)
+        return max(self.interval, budget_wait)
+
+    def cpu_usage(self):
+        """进程自启动(或重置)以来的平均CPU占用率，不含OCR引擎子进程
+
+        Returns:
+            float: CPU占用率，1.0表示占满一个核心
+        """
+        wall = time.perf_counter() - self.wall_start
+        if wall <= 0:
+            return 0.0
+        return (time.process_time() - self.cpu_start) / wall
@@ -5,7 +5,9 @@
 """
 
 from PIL import Image, ImageGrab
+import win32con
 import win32gui
+import win32ui
 
 
 class ScreenCapture:
@@ -79,9 +81,13 @@ class ScreenCapture:
             "height": region[3]
         }
     
-    def capture_screen(self):
+    def capture_screen(self, roi_profile=None):
         """捕获屏幕
         
+        Args:
+            roi_profile: 识别区域配置(ROIProfile)，指定时只截取区域所在的部分，
+                其余部分填充为黑色，图像尺寸和坐标与完整截图一致
+        
         Returns:
             PIL.Image: 捕获的图像
         """
@@ -89,6 +95,10 @@ class ScreenCapture:
             if not self.capture_region:
                 # 如果没有设置捕获区域，捕获整个屏幕
                 img = ImageGrab.grab()
+                if roi_profile:
+                    img = roi_profile.mask(img)
+            elif roi_profile:
+                img = self.capture_roi(roi_profile)
             else:
                 # 捕获指定区域
                 bbox = (
@@ -104,11 +114,42 @@ class ScreenCapture:
             print(f"捕获屏幕失败: {e}")
             return None
     
-    def capture_window(self, window_title=None):
+    def capture_roi(self, roi_profile):
+        """只截取捕获区域中识别区域所在的部分
+        
+        Args:
+            roi_profile: 识别区域配置(ROIProfile)
+            
+        Returns:
+            PIL.Image: 与捕获区域尺寸相同的图像，识别区域以外填充为黑色
+        """
+        size = (self.capture_region["width"], self.capture_region["height"])
+        regions = roi_profile.regions(size)
+        image = Image.new("RGB", size)
+        if not regions:
+            return image
+        # 截取所有区域的外接矩形，截图耗时与像素数成正比
+        left = min(region[0] for region in regions)
+        top = min(region[1] for region in regions)
+        right = max(region[2] for region in regions)
+        bottom = max(region[3] for region in regions)
+        grabbed = ImageGrab.grab((
+            self.capture_region["left"] + left,
+            self.capture_region["top"] + top,
+            self.capture_region["left"] + right,
+            self.capture_region["top"] + bottom
+        ))
+        for region in regions:
+            crop = grabbed.crop((region[0] - left, region[1] - top, region[2] - left, region[3] - top))
+            image.paste(crop, region[:2])
+        return image
+    
+    def capture_window(self, window_title=None, roi_profile=None):
         """捕获指定窗口
         
         Args:
             window_title: 窗口标题
+            roi_profile: 识别区域配置(ROIProfile)，指定时只截取区域所在的部分
             
         Returns:
             PIL.Image: 捕获的图像
@@ -136,11 +177,55 @@ class ScreenCapture:
                     self.capture_region = None
             
             # 捕获屏幕
-            return self.capture_screen()
+            return self.capture_screen(roi_profile)
         except Exception as e:
             print(f"捕获窗口失败: {e}")
             return None
     
+    def capture_thumbnail(self, size=(160, 90)):
+        """直接截取缩小后的捕获区域，用于画面静止时低开销地检测变化
+        
+        使用上一次capture_window确定的捕获区域，不重新枚举窗口。GDI的StretchBlt在截取时按取样方式
+        (COLORONCOLOR)缩小，只有缩略图大小的数据复制到Python中，不需要先得到完整截图再缩小。
+        
+        Args:
+            size: 缩略图大小(宽, 高)
+            
+        Returns:
+            PIL.Image: 缩略图，还没有捕获区域或截取失败时返回None
+        """
+        if not self.capture_region:
+            return None
+        desktop = win32gui.GetDesktopWindow()
+        desktop_dc = win32gui.GetWindowDC(desktop)
+        source_dc = memory_dc = bitmap = None
+        try:
+            source_dc = win32ui.CreateDCFromHandle(desktop_dc)
+            memory_dc = source_dc.CreateCompatibleDC()
+            bitmap = win32ui.CreateBitmap()
+            bitmap.CreateCompatibleBitmap(source_dc, size[0], size[1])
+            memory_dc.SelectObject(bitmap)
+            memory_dc.SetStretchBltMode(win32con.COLORONCOLOR)
+            memory_dc.StretchBlt(
+                (0, 0), size, source_dc,
+                (self.capture_region["left"], self.capture_region["top"]),
+                (self.capture_region["width"], self.capture_region["height"]),
+                win32con.SRCCOPY
+            )
+            bits = bitmap.GetBitmapBits(True)
+            return Image.frombuffer("RGB", size, bits, "raw", "BGRX", 0, 1)
+        except Exception as e:
+            print(f"截取缩略图失败: {e}")
+            return None
+        finally:
+            if bitmap is not None:
+                win32gui.DeleteObject(bitmap.GetHandle())
+            if memory_dc is not None:
+                memory_dc.DeleteDC()
+            if source_dc is not None:
+                source_dc.DeleteDC()
+            win32gui.ReleaseDC(desktop, desktop_dc)
+    
     def get_window_list(self):
         """获取所有窗口列表
         
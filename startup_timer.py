@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时统计模块
+"""
+
+import builtins
+import sys
+import threading
+import time
+
+
+class StartupTimer:
+    """启动耗时统计类
+
+    按阶段记录从程序启动到界面显示的耗时；开启导入统计时替换内置的__import__，
+    记录每个首次导入的模块的累计耗时(包括它导入的其他模块)，效果类似python -X importtime。
+    """
+
+    def __init__(self, start=None):
+        """初始化
+
+        Args:
+            start: 启动时刻(time.perf_counter())，默认为当前时刻
+        """
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []  # [(阶段名称, 耗时秒数), ...]
+        self.imports = []  # [(开始顺序, 嵌套深度, 模块名, 累计耗时秒数), ...]
+        self.import_count = 0
+        self.original_import = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        """结束一个阶段
+
+        Args:
+            name: 阶段名称
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def elapsed(self):
+        """从启动到现在的秒数"""
+        return time.perf_counter() - self.start
+
+    def track_imports(self):
+        """开始统计模块导入耗时"""
+        if self.original_import is not None:
+            return
+        self.original_import = original_import = builtins.__import__
+
+        def tracked_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # 相对导入和已导入的模块不统计
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            depth = getattr(self.local, "depth", 0)
+            with self.lock:
+                order = self.import_count
+                self.import_count += 1
+            self.local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                self.local.depth = depth
+                self.imports.append((order, depth, name, time.perf_counter() - start))
+
+        builtins.__import__ = tracked_import
+
+    def stop_tracking(self):
+        """停止统计模块导入耗时"""
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    def report(self, min_import_time=0.001):
+        """生成耗时报告
+
+        Args:
+            min_import_time: 只列出累计耗时不少于该值(秒)的模块
+
+        Returns:
+            str: 多行报告文本
+        """
+        lines = ["启动耗时:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<16}{seconds * 1000:>8.1f} ms")
+        lines.append(f"  {'合计':<16}{(self.last - self.start) * 1000:>8.1f} ms")
+        imports = sorted(self.imports)
+        if imports:
+            lines.append("模块导入耗时(累计):")
+            for _, depth, name, seconds in imports:
+                if seconds >= min_import_time:
+                    lines.append(f"  {seconds * 1000:>8.1f} ms  {'  ' * depth}{name}")
+        return "\n".join(lines)
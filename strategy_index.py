@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+策略数据索引模块
+
+把策略数据CSV编译为二进制索引文件，包括策略记录、展开为数组的AC自动机和CSV的校验和。
+AC自动机预先计算每个状态对每个字符类别的转移(完整的DFA转移表)，搜索时不需要沿失败指针回退。
+启动时以内存映射方式打开索引文件，只读取文件头，策略记录在第一次访问时才解码并缓存，
+加载耗时不随策略数量增长；CSV发生变化时自动重新编译。读写策略数据都不需要pandas，
+只有导出为DataFrame时才导入。
+
+索引文件名中带有CSV校验和，每次编译写入新的文件：热加载时旧的索引文件仍被内存映射，
+Windows下无法覆盖或删除，旧文件在之后的编译或启动时再删除。
+
+用法:
+    python strategy_index.py 货币战争策略数据.csv [-o 索引文件路径]
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque, namedtuple
+
+
+# 策略数据的列名，与CSV中前4列对应
+COLUMNS = ['类别', '名称', '效果', '推荐']
+
+# 只把不少于该长度的策略名称加入AC自动机
+MIN_PATTERN_LENGTH = 4
+
+# DFA转移表的最大项数(状态数x字符类别数)，超过时只保存稀疏的转移和失败指针
+DFA_MAX_ENTRIES = 1 << 23
+
+# DFA转移表中的值为目标状态的行起点，最高位表示目标状态有输出
+OUTPUT_FLAG = 1 << 31
+ROW_MASK = OUTPUT_FLAG - 1
+
+MAGIC = b"HSRSIDX\0"
+VERSION = 2
+BYTE_ORDER_MARK = 0x01020304
+
+# 数组区段：字符串偏移、字符串内容、转移起点、转移字符、转移目标、失败指针、输出起点、输出内容、
+# 字符类别映射、DFA转移表
+SECTIONS = ("string_offsets", "strings", "edge_start", "edge_chars", "edge_targets",
+            "fail", "output_start", "output_items", "char_classes", "dfa")
+
+# 各区段的数组类型，字符串内容为原始字节
+SECTION_TYPES = {"strings": None, "char_classes": "H"}
+
+# 文件头：魔数、版本、字节序标记、记录数、状态数、字符类别映射的起始编码、DFA每行的项数、
+# CSV大小、CSV修改时间、CSV校验和、各区段的(偏移, 长度)
+HEADER = struct.Struct("<8sIIIIIIqq16s" + "QQ" * len(SECTIONS))
+HEADER_FIELDS = 10
+
+
+def read_strategy_csv(path, encodings=('utf-8-sig', 'gbk', 'gb18030')):
+    """读取策略数据CSV，依次尝试各种编码
+
+    只有几十行数据，使用标准库csv读取，不需要导入pandas。
+
+    Args:
+        path: CSV路径
+        encodings: 依次尝试的编码
+
+    Returns:
+        tuple: (策略列表，每条为{列名: 值}，空单元格为None, 成功的编码)，全部失败时为(None, None)
+    """
+    for encoding in encodings:
+        try:
+            with open(path, 'r', encoding=encoding, newline='') as f:
+                rows = list(csv.reader(f))
+        except Exception as e:
+            print(f"使用编码{encoding}读取CSV失败: {e}")
+            continue
+        strategies = []
+        # 跳过表头，只取前4列
+        for row in rows[1:]:
+            if not any(cell.strip() for cell in row):
+                continue
+            cells = (row + [''] * len(COLUMNS))[:len(COLUMNS)]
+            strategies.append({column: cell or None for column, cell in zip(COLUMNS, cells)})
+        if strategies:
+            return strategies, encoding
+    return None, None
+
+
+def file_digest(path):
+    """计算文件内容的校验和"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def build_automaton(patterns, max_dfa_entries=DFA_MAX_ENTRIES):
+    """构建AC自动机并展开为数组
+
+    状态0为根节点。每个状态的转移按字符编码排序后连续存放，
+    edge_start[s]到edge_start[s+1]为状态s的转移；输出已合并失败指针链上的输出。
+
+    模式串中出现的每个字符对应一个字符类别(从1开始)，其他字符都属于类别0。
+    DFA转移表每行对应一个状态，每列对应一个字符类别，没有转移时填入失败状态在该列的值，
+    所以搜索时每个字符只需查一次表。
+
+    Args:
+        patterns: [(模式串, 模式串索引), ...]
+        max_dfa_entries: DFA转移表的最大项数，超过时不生成转移表
+
+    Returns:
+        dict: 区段名称到array的映射(edge_start、edge_chars、edge_targets、fail、output_start、output_items、
+              char_classes、dfa)，另有char_base(字符类别映射的起始编码)和width(DFA每行的项数)
+    """
+    children = [{}]
+    outputs = [[]]
+    for pattern, index in patterns:
+        state = 0
+        for char in pattern:
+            next_state = children[state].get(char)
+            if next_state is None:
+                next_state = len(children)
+                children[state][char] = next_state
+                children.append({})
+                outputs.append([])
+            state = next_state
+        outputs[state].append(index)
+
+    # BFS构建失败指针，失败指针指向的状态更浅，其输出已经合并完成
+    fail = [0] * len(children)
+    order = []
+    queue = deque(children[0].values())
+    while queue:
+        state = queue.popleft()
+        order.append(state)
+        for char, child in children[state].items():
+            queue.append(child)
+            fail_state = fail[state]
+            while fail_state and char not in children[fail_state]:
+                fail_state = fail[fail_state]
+            target = children[fail_state].get(char, 0)
+            fail[child] = target if target != child else 0
+            outputs[child].extend(outputs[fail[child]])
+
+    arrays = {name: array('I') for name in ("edge_start", "edge_chars", "edge_targets", "output_start", "output_items")}
+    for state, edges in enumerate(children):
+        arrays["edge_start"].append(len(arrays["edge_chars"]))
+        for char, child in sorted(edges.items(), key=lambda item: ord(item[0])):
+            arrays["edge_chars"].append(ord(char))
+            arrays["edge_targets"].append(child)
+        arrays["output_start"].append(len(arrays["output_items"]))
+        arrays["output_items"].extend(sorted(set(outputs[state])))
+    arrays["edge_start"].append(len(arrays["edge_chars"]))
+    arrays["output_start"].append(len(arrays["output_items"]))
+    arrays["fail"] = array('I', fail)
+
+    # 字符类别
+    chars = sorted({ord(char) for pattern, _ in patterns for char in pattern})
+    width = len(chars) + 1
+    arrays["char_base"] = chars[0] if chars else 0
+    arrays["width"] = width
+    arrays["char_classes"] = array('H')
+    arrays["dfa"] = array('I')
+    if len(chars) >= 1 << 16 or len(children) * width > max_dfa_entries:
+        return arrays
+    classes = array('H', bytes(2 * (chars[-1] - chars[0] + 1))) if chars else array('H')
+    for index, code in enumerate(chars, 1):
+        classes[code - chars[0]] = index
+    arrays["char_classes"] = classes
+
+    # 按BFS顺序填表：先复制失败状态的行，再写入自身的转移，失败状态更浅，已经填好
+    def target(state):
+        return state * width | (OUTPUT_FLAG if outputs[state] else 0)
+
+    dfa = array('I', bytes(4 * width * len(children)))
+    for char, child in children[0].items():
+        dfa[classes[ord(char) - chars[0]]] = target(child)
+    for state in order:
+        row = state * width
+        fail_row = fail[state] * width
+        dfa[row:row + width] = dfa[fail_row:fail_row + width]
+        for char, child in children[state].items():
+            dfa[row + classes[ord(char) - chars[0]]] = target(child)
+    arrays["dfa"] = dfa
+    return arrays
+
+
+class FlatAhoCorasick:
+    """展开为数组的AC自动机
+
+    与data_matcher.AhoCorasick的search结果相同，节点数据保存在连续的数组中，
+    可以直接使用内存映射的索引文件，不需要在启动时逐个创建节点对象。
+    """
+
+    def __init__(self, edge_start, edge_chars, edge_targets, fail, output_start, output_items):
+        """初始化
+
+        Args:
+            edge_start, edge_chars, edge_targets, fail, output_start, output_items:
+                build_automaton返回的数组，或索引文件中对应区段的memoryview
+        """
+        self.edge_start = edge_start
+        self.edge_chars = edge_chars
+        self.edge_targets = edge_targets
+        self.fail = fail
+        self.output_start = output_start
+        self.output_items = output_items
+
+    def goto(self, state, code):
+        """状态state经过编码为code的字符后的状态，没有转移时返回-1"""
+        low, high = self.edge_start[state], self.edge_start[state + 1]
+        position = bisect_left(self.edge_chars, code, low, high)
+        if position < high and self.edge_chars[position] == code:
+            return self.edge_targets[position]
+        return -1
+
+    def search(self, text):
+        """搜索文本中的模式串
+
+        Args:
+            text: 待搜索文本
+
+        Returns:
+            list: 匹配到的模式串索引列表
+        """
+        # 热循环中使用局部变量，省去属性查找和方法调用
+        edge_start, edge_chars, edge_targets = self.edge_start, self.edge_chars, self.edge_targets
+        fail, output_start, output_items = self.fail, self.output_start, self.output_items
+        matched_indices = set()
+        state = 0
+        for char in text:
+            code = ord(char)
+            while True:
+                low, high = edge_start[state], edge_start[state + 1]
+                if low < high:
+                    position = bisect_left(edge_chars, code, low, high)
+                    if position < high and edge_chars[position] == code:
+                        state = edge_targets[position]
+                        break
+                if state == 0:
+                    break
+                state = fail[state]
+            start, end = output_start[state], output_start[state + 1]
+            if start < end:
+                matched_indices.update(output_items[start:end])
+        return list(matched_indices)
+
+    def scan(self, text, state=0):
+        """从指定状态开始搜索一段文本，用于逐段输入的增量搜索
+
+        Args:
+            text: 待搜索文本
+            state: 开始时的状态，上一段文本scan返回的状态，0为初始状态
+
+        Returns:
+            tuple: (结束时的状态, [(模式串索引, 匹配结束位置(不含)), ...])
+        """
+        edge_start, edge_chars, edge_targets = self.edge_start, self.edge_chars, self.edge_targets
+        fail, output_start, output_items = self.fail, self.output_start, self.output_items
+        hits = []
+        for position, char in enumerate(text, 1):
+            code = ord(char)
+            while True:
+                low, high = edge_start[state], edge_start[state + 1]
+                if low < high:
+                    index = bisect_left(edge_chars, code, low, high)
+                    if index < high and edge_chars[index] == code:
+                        state = edge_targets[index]
+                        break
+                if state == 0:
+                    break
+                state = fail[state]
+            for index in output_items[output_start[state]:output_start[state + 1]]:
+                hits.append((index, position))
+        return state, hits
+
+
+class DFAAhoCorasick:
+    """使用DFA转移表的AC自动机
+
+    与FlatAhoCorasick的search结果相同。每个字符先通过字符类别映射得到类别，
+    再在转移表中查一次得到下一个状态，不需要沿失败指针回退；
+    转移表的值直接是目标状态的行起点，最高位表示该状态有输出。
+    """
+
+    def __init__(self, char_base, char_classes, width, dfa, output_start, output_items):
+        """初始化
+
+        Args:
+            char_base: 字符类别映射的起始编码
+            char_classes: 字符编码减去char_base得到的下标到字符类别的映射
+            width: DFA每行的项数(字符类别数加1)
+            dfa: DFA转移表
+            output_start, output_items: 各状态的输出
+        """
+        self.char_base = char_base
+        self.char_classes = char_classes
+        self.width = width
+        self.dfa = dfa
+        self.output_start = output_start
+        self.output_items = output_items
+
+    def search(self, text):
+        """搜索文本中的模式串
+
+        Args:
+            text: 待搜索文本
+
+        Returns:
+            list: 匹配到的模式串索引列表
+        """
+        char_base, char_classes, size = self.char_base, self.char_classes, len(self.char_classes)
+        dfa, width = self.dfa, self.width
+        output_start, output_items = self.output_start, self.output_items
+        matched_indices = set()
+        row = 0
+        # 编码为UTF-32后按uint32遍历，直接得到每个字符的编码，省去逐字符调用ord
+        for code in memoryview(text.encode('utf-32-le')).cast('I'):
+            code -= char_base
+            target = dfa[row + (char_classes[code] if 0 <= code < size else 0)]
+            row = target & ROW_MASK
+            if target != row:
+                state = row // width
+                matched_indices.update(output_items[output_start[state]:output_start[state + 1]])
+        return list(matched_indices)
+
+    def scan(self, text, state=0):
+        """从指定状态开始搜索一段文本，用于逐段输入的增量搜索
+
+        Args:
+            text: 待搜索文本
+            state: 开始时的状态，上一段文本scan返回的状态，0为初始状态
+
+        Returns:
+            tuple: (结束时的状态, [(模式串索引, 匹配结束位置(不含)), ...])
+        """
+        char_base, char_classes, size = self.char_base, self.char_classes, len(self.char_classes)
+        dfa, width = self.dfa, self.width
+        output_start, output_items = self.output_start, self.output_items
+        hits = []
+        row = state
+        for position, code in enumerate(memoryview(text.encode('utf-32-le')).cast('I'), 1):
+            code -= char_base
+            target = dfa[row + (char_classes[code] if 0 <= code < size else 0)]
+            row = target & ROW_MASK
+            if target != row:
+                output = row // width
+                for index in output_items[output_start[output]:output_start[output + 1]]:
+                    hits.append((index, position))
+        return row, hits
+
+
+def create_automaton(arrays):
+    """用build_automaton的结果或索引文件中的区段创建AC自动机，有DFA转移表时使用DFA"""
+    if len(arrays["dfa"]):
+        return DFAAhoCorasick(arrays["char_base"], arrays["char_classes"], arrays["width"], arrays["dfa"],
+                              arrays["output_start"], arrays["output_items"])
+    return FlatAhoCorasick(arrays["edge_start"], arrays["edge_chars"], arrays["edge_targets"],
+                           arrays["fail"], arrays["output_start"], arrays["output_items"])
+
+
+class Strategy(namedtuple("Strategy", ["category", "name", "effect", "recommendation"])):
+    """一条策略记录
+
+    基于元组，不可修改，比字典占用的内存少。除了按属性和下标访问，也可以按列名访问(strategy["名称"])，
+    与原来的字典格式兼容。
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = COLUMN_INDEX[key]
+        return tuple.__getitem__(self, key)
+
+    def to_dict(self):
+        """转换为列名到值的字典，格式与read_strategy_csv相同"""
+        return dict(zip(COLUMNS, self))
+
+
+# 列名到Strategy中字段下标的映射
+COLUMN_INDEX = {column: index for index, column in enumerate(COLUMNS)}
+
+
+class StrategyRecords:
+    """索引文件中的策略记录
+
+    按下标访问时才解码对应的字符串，解码得到的Strategy保存在按策略下标排列的列表中，再次访问直接返回。
+    """
+
+    def __init__(self, offsets, strings, count):
+        """初始化
+
+        Args:
+            offsets: 每个字段在strings中的起点，共count*4+1项
+            strings: 所有字段的UTF-8编码，空单元格为空字符串
+            count: 记录数
+        """
+        self.offsets = offsets
+        self.strings = strings
+        self.count = count
+        self.records = [None] * count  # 已解码的记录
+
+    def __len__(self):
+        return self.count
+
+    def field(self, index, column):
+        """第index条记录第column列的值，空单元格为None"""
+        position = index * len(COLUMNS) + column
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return str(self.strings[start:end], 'utf-8') if end > start else None
+
+    def __getitem__(self, index):
+        record = self.records[index]
+        if record is None:
+            if index < 0:
+                index += self.count
+            record = self.records[index] = Strategy(*(self.field(index, column) for column in range(len(COLUMNS))))
+        return record
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def to_dataframe(self):
+        """导出为pandas.DataFrame，列名与COLUMNS相同，需要安装pandas
+
+        Returns:
+            pandas.DataFrame: 策略数据
+        """
+        import pandas as pd
+        return pd.DataFrame(list(self), columns=COLUMNS)
+
+
+def compile_index(strategies, source_size=0, source_mtime=0, source_digest=b"\0" * 16):
+    """把策略记录编译为索引文件内容
+
+    Args:
+        strategies: read_strategy_csv返回的策略列表
+        source_size: CSV文件大小
+        source_mtime: CSV修改时间(纳秒)
+        source_digest: CSV校验和
+
+    Returns:
+        bytes: 索引文件内容
+    """
+    offsets = array('I', [0])
+    strings = bytearray()
+    for row in strategies:
+        for column in COLUMNS:
+            strings += (row[column] or '').encode('utf-8')
+            offsets.append(len(strings))
+
+    patterns = [(row['名称'], index) for index, row in enumerate(strategies)
+                if row['名称'] is not None and len(row['名称']) >= MIN_PATTERN_LENGTH]
+    arrays = build_automaton(patterns)
+    arrays["string_offsets"] = offsets
+    arrays["strings"] = bytes(strings)
+
+    body = bytearray()
+    table = []
+    for name in SECTIONS:
+        data = arrays[name]
+        raw = data.tobytes() if isinstance(data, array) else data
+        # 各区段按4字节对齐，可以直接转换为数组类型的memoryview
+        body += b"\0" * (-len(body) % 4)
+        table += [HEADER.size + len(body), len(raw)]
+        body += raw
+    header = HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, len(strategies), len(arrays["fail"]),
+                         arrays["char_base"], arrays["width"], source_size, source_mtime, source_digest, *table)
+    return header + bytes(body)
+
+
+class StrategyIndex:
+    """策略数据索引类"""
+
+    def __init__(self, buffer, source=None):
+        """从索引文件内容创建
+
+        Args:
+            buffer: 索引文件内容(bytes或mmap)
+            source: 内存映射对象，关闭索引时一起关闭
+
+        Raises:
+            ValueError: 文件格式不正确
+        """
+        if len(buffer) < HEADER.size:
+            raise ValueError("索引文件不完整")
+        fields = HEADER.unpack_from(buffer, 0)
+        magic, version, byte_order, count, state_count, char_base, width, size, mtime, digest = fields[:HEADER_FIELDS]
+        if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER_MARK:
+            raise ValueError("索引文件格式或版本不同")
+
+        ranges = [(fields[HEADER_FIELDS + 2 * i], fields[HEADER_FIELDS + 1 + 2 * i]) for i in range(len(SECTIONS))]
+        if any(offset + length > len(buffer) or offset % 4
+               for name, (offset, length) in zip(SECTIONS, ranges)):
+            raise ValueError("索引文件不完整")
+        self.source = source
+        self.path = None  # 索引文件路径，不是从文件打开时为None
+        self.count = count
+        self.state_count = state_count
+        self.source_size = size
+        self.source_mtime = mtime
+        self.source_digest = digest
+
+        view = memoryview(buffer)
+        sections = {}
+        for name, (offset, length) in zip(SECTIONS, ranges):
+            section = view[offset:offset + length]
+            typecode = SECTION_TYPES.get(name, 'I')
+            sections[name] = section.cast(typecode) if typecode else section
+        self.views = [view] + list(sections.values())
+
+        self.records = StrategyRecords(sections["string_offsets"], sections["strings"], count)
+        self.automaton = create_automaton(dict(sections, char_base=char_base, width=width))
+
+    @classmethod
+    def open(cls, index_path):
+        """以内存映射方式打开索引文件"""
+        with open(index_path, 'rb') as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            index = cls(source, source)
+        except Exception:
+            source.close()
+            raise
+        index.path = index_path
+        return index
+
+    def is_current(self, csv_path):
+        """索引是否由当前的CSV生成：大小和修改时间相同，或内容校验和相同"""
+        stat = os.stat(csv_path)
+        if stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime:
+            return True
+        return stat.st_size == self.source_size and file_digest(csv_path) == self.source_digest
+
+    def close(self):
+        """释放内存映射"""
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+
+def index_file_path(index_path, digest):
+    """某一版CSV的索引文件路径，在索引文件名的扩展名前加入CSV校验和
+
+    Args:
+        index_path: 索引文件路径
+        digest: CSV校验和
+
+    Returns:
+        str: 索引文件路径，如strategies.csv.0123456789abcdef.idx
+    """
+    base, ext = os.path.splitext(index_path)
+    return f"{base}.{digest.hex()[:16]}{ext}"
+
+
+def index_file_paths(index_path):
+    """已有的各版索引文件路径，按修改时间从新到旧排列"""
+    base, ext = os.path.splitext(index_path)
+    paths = []
+    for path in glob.glob(f"{glob.escape(base)}.{'[0-9a-f]' * 16}{glob.escape(ext)}"):
+        try:
+            paths.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    return [path for _, path in sorted(paths, reverse=True)]
+
+
+def remove_old_indexes(index_path, keep):
+    """删除其他版本的索引文件，仍被内存映射而无法删除的文件留到下次
+
+    Args:
+        index_path: 索引文件路径
+        keep: 保留的索引文件路径
+    """
+    for path in index_file_paths(index_path) + [index_path]:
+        if path != keep and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def build_index(csv_path, index_path=None):
+    """读取CSV并编译索引，写入带有CSV校验和的索引文件
+
+    Args:
+        csv_path: 策略数据CSV路径
+        index_path: 索引文件路径，为None或写入失败时只在内存中创建索引
+
+    Returns:
+        StrategyIndex: 索引，CSV无法读取时返回None
+    """
+    stat = os.stat(csv_path)
+    digest = file_digest(csv_path)
+    strategies, encoding = read_strategy_csv(csv_path)
+    if not strategies:
+        return None
+    print(f"使用编码{encoding}成功加载策略数据")
+    data = compile_index(strategies, stat.st_size, stat.st_mtime_ns, digest)
+    if index_path:
+        path = index_file_path(index_path, digest)
+        index = None
+        if os.path.exists(path):
+            # 相同内容的CSV编译过(例如改动后又改回)，文件可能仍被内存映射，不覆盖
+            try:
+                index = StrategyIndex.open(path)
+            except Exception:
+                index = None
+        if index is None:
+            try:
+                temp_path = path + ".tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+                index = StrategyIndex.open(path)
+            except Exception as e:
+                print(f"写入策略索引文件失败: {e}")
+        if index is not None:
+            remove_old_indexes(index_path, path)
+            return index
+    return StrategyIndex(data)
+
+
+def load_index(csv_path, index_path=None):
+    """打开策略索引，索引文件不存在、损坏或CSV已变化时重新编译
+
+    Args:
+        csv_path: 策略数据CSV路径
+        index_path: 索引文件路径，默认为CSV路径加.idx，实际的文件名中带有CSV校验和
+
+    Returns:
+        StrategyIndex: 索引，CSV无法读取时返回None
+    """
+    index_path = index_path or csv_path + ".idx"
+    paths = index_file_paths(index_path)
+    for path in paths:
+        try:
+            index = StrategyIndex.open(path)
+        except Exception as e:
+            print(f"打开策略索引文件失败: {e}")
+            continue
+        if index.is_current(csv_path):
+            remove_old_indexes(index_path, path)
+            return index
+        index.close()
+    if paths:
+        print("策略数据已变化，重新编译索引")
+    return build_index(csv_path, index_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="编译策略数据索引")
+    parser.add_argument("csv", help="策略数据CSV路径")
+    parser.add_argument("-o", "--output", default=None,
+                        help="索引文件路径，默认为CSV路径加.idx，实际的文件名中带有CSV校验和")
+    args = parser.parse_args()
+    index_path = args.output or args.csv + ".idx"
+    index = build_index(args.csv, index_path)
+    if index is None:
+        print("无法读取策略数据")
+        sys.exit(1)
+    if index.path is None:
+        print("写入策略索引文件失败")
+        index.close()
+        sys.exit(1)
+    print(f"策略索引已写入{index.path}：{index.count}条记录，{index.state_count}个状态，"
+          f"{os.path.getsize(index.path)}字节")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+策略数据热加载模块
+"""
+
+import os
+import threading
+import time
+
+
+class StrategyFileWatcher:
+    """策略数据文件监视类
+
+    在后台线程定期检查策略数据CSV的大小和修改时间。文件变化后再等一个检查间隔，确认文件已经写完
+    (编辑器可能分多次写入)，然后在监视线程中重新编译索引并替换DataMatcher的策略数据快照。
+    界面线程不需要等待，正在进行的匹配继续使用旧的快照。
+    """
+
+    def __init__(self, data_matcher, interval=1.0, on_reload=None):
+        """初始化并在后台开始监视
+
+        Args:
+            data_matcher: 数据匹配实例
+            interval: 检查间隔(秒)
+            on_reload: 重新加载成功后在监视线程中调用的函数，参数为策略数量
+        """
+        self.data_matcher = data_matcher
+        self.interval = interval
+        self.on_reload = on_reload
+        self.last_stat = self.stat()
+        self.pending_stat = None  # 已发现变化、等待确认写完的文件状态
+        self.reloads = 0
+        self.last_reload_time = None  # 最近一次重新加载的耗时(秒)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stat(self):
+        """策略数据文件的(大小, 修改时间)，文件不存在时为None"""
+        try:
+            stat = os.stat(self.data_matcher.strategy_data_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def check(self):
+        """检查一次文件，文件变化且保持了一个检查间隔时重新加载
+
+        Returns:
+            bool: 是否重新加载成功
+        """
+        current = self.stat()
+        if current is None or current == self.last_stat:
+            self.pending_stat = None
+            return False
+        if current != self.pending_stat:
+            self.pending_stat = current
+            return False
+        self.pending_stat = None
+        self.last_stat = current
+        return self.reload()
+
+    def reload(self):
+        """重新加载策略数据，失败时保留原来的策略数据
+
+        Returns:
+            bool: 是否重新加载成功
+        """
+        start = time.perf_counter()
+        if not self.data_matcher.load_strategy_data():
+            return False
+        self.last_reload_time = time.perf_counter() - start
+        self.reloads += 1
+        if self.on_reload:
+            try:
+                self.on_reload(len(self.data_matcher.strategy_data))
+            except Exception as e:
+                print(f"策略数据重新加载回调错误: {e}")
+        return True
+
+    def run(self):
+        """监视线程"""
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"检查策略数据文件失败: {e}")
+
+    def close(self):
+        """停止监视"""
+        self.stop_event.set()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试卡牌标题哈希识别
+"""
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFont
+
+from card_hash import CardHashIndex, CardHashRecognizer, dhash, hamming_distance
+from roi_profiles import ROIProfile
+
+
+CARDS = ["PLAN ALPHA", "BETA TRADE", "GAMMA RUSH", "DELTA COIN"]
+
+
+def make_frame(cards):
+    """生成三张卡牌的画面，标题文字颜色的蓝色分量表示卡牌序号，供模拟OCR引擎识别"""
+    image = Image.new("RGB", (1920, 1080), (30, 30, 60))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=40)
+    regions = ROIProfile.from_config("currency_war_titles").regions(image.size)
+    for (left, top, _, _), card in zip(regions, cards):
+        draw.text((left + 20, top + 30), CARDS[card], fill=(255, 255, 250 - card), font=font)
+    return image
+
+
+class ColorEngine:
+    """按标题文字颜色识别卡牌的模拟OCR引擎"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def recognize_text(self, image, preprocess=True):
+        self.calls += 1
+        colors = [color for _, color in image.getcolors(65536) if color[0] == 255]
+        if not colors:
+            return []
+        card = 250 - max(colors)[2]
+        box = [[0, 0], [image.width, 0], [image.width, image.height], [0, image.height]]
+        return [{"text": CARDS[card], "score": 0.95, "box": box}]
+
+
+def match(results):
+    return [{"名称": result["text"]} for result in results]
+
+
+def test_dhash():
+    """测试哈希对亮度变化不敏感，对不同标题敏感"""
+    image = make_frame([0, 1, 2])
+    regions = ROIProfile.from_config("currency_war_titles").regions(image.size)
+    first, second = image.crop(regions[0]), image.crop(regions[1])
+    darker = ImageEnhance.Brightness(first).enhance(0.8)
+    assert hamming_distance(dhash(first), dhash(darker)) < 10
+    assert hamming_distance(dhash(first), dhash(second)) > 30
+
+
+def test_card_hash_recognizer():
+    """测试确认过的卡牌标题跳过OCR"""
+    engine = ColorEngine()
+    recognizer = CardHashRecognizer(engine, match)
+
+    # 第一次出现时需要OCR，并加入索引
+    results = recognizer.recognize(make_frame([0, 1, 2]))
+    assert [r["text"] for r in results] == CARDS[:3]
+    assert engine.calls == 3
+    assert len(recognizer.index.entries) == 3
+
+    # 再次出现(亮度略有变化)时直接从索引得到名称
+    frame = ImageEnhance.Brightness(make_frame([2, 0, 1])).enhance(0.9)
+    results = recognizer.recognize(frame)
+    assert [r["text"] for r in results] == [CARDS[2], CARDS[0], CARDS[1]]
+    assert engine.calls == 3
+    assert all(r["score"] == 1.0 for r in results)
+
+    # 新卡牌只对该区域OCR
+    results = recognizer.recognize(make_frame([3, 1, 2]))
+    assert [r["text"] for r in results] == [CARDS[3], CARDS[1], CARDS[2]]
+    assert engine.calls == 4
+    assert recognizer.hit_rate() == 5 / 9
+    assert recognizer.average_lookup_time() < 0.005
+
+
+def test_card_hash_index_persist(tmp_path):
+    """测试索引保存和加载，以及低置信度结果不加入索引"""
+    path = str(tmp_path / "cards.json")
+    index = CardHashIndex(path=path)
+    engine = ColorEngine()
+    recognizer = CardHashRecognizer(engine, match, index=index, min_confidence=0.99)
+    recognizer.recognize(make_frame([0, 1, 2]))
+    assert index.entries == []
+
+    recognizer.min_confidence = 0.9
+    recognizer.recognize(make_frame([0, 1, 2]))
+    index.save()
+    loaded = CardHashIndex(path=path)
+    assert loaded.entries == index.entries
+    crop = make_frame([1]).crop(ROIProfile.from_config("currency_war_titles").regions((1920, 1080))[0])
+    assert loaded.lookup(crop)[0] == CARDS[1]
+
+
+if __name__ == '__main__':
+    test_dhash()
+    test_card_hash_recognizer()
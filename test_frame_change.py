@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试画面变化检测
+"""
+
+from PIL import Image, ImageDraw
+
+from frame_change import FrameChangeDetector
+from tiled_ocr import TiledOCR
+
+
+def make_frame(card_text_color=(255, 255, 255)):
+    """生成一张模拟的选择界面截图"""
+    image = Image.new("RGB", (1920, 1080), (30, 30, 60))
+    draw = ImageDraw.Draw(image)
+    # 模拟一张卡牌的标题区域
+    draw.rectangle((800, 280, 1100, 340), fill=card_text_color)
+    return image
+
+
+def test_frame_change():
+    """测试画面变化检测"""
+    detector = FrameChangeDetector()
+
+    # 第一帧必定视为变化
+    assert detector.has_changed(make_frame())
+
+    # 相同画面不应触发识别
+    assert not detector.has_changed(make_frame())
+
+    # 卡牌区域变化应触发识别
+    assert detector.has_changed(make_frame((200, 40, 40)))
+
+    # 重置后再次视为变化
+    detector.reset()
+    assert detector.has_changed(make_frame((200, 40, 40)))
+
+
+class RegionRecorder:
+    """记录被识别区域的模拟OCR引擎"""
+
+    def __init__(self):
+        self.regions = []
+
+    def recognize_regions(self, image, regions, preprocess=True):
+        self.regions.extend(regions)
+        # 每个区域返回一个位于区域中心的文本框
+        results = []
+        for left, top, right, bottom in regions:
+            x, y = (left + right) // 2, (top + bottom) // 2
+            box = [[x - 5, y - 5], [x + 5, y - 5], [x + 5, y + 5], [x - 5, y + 5]]
+            results.append([{"text": f"{x},{y}", "score": 0.9, "box": box}])
+        return results
+
+
+def test_tiled_ocr():
+    """测试只重新识别变化的分块"""
+    detector = FrameChangeDetector(grid=(3, 3))
+    engine = RegionRecorder()
+    tiled = TiledOCR(engine, grid=(3, 3), margin=0)
+
+    # 第一帧识别全部分块
+    frame = make_frame()
+    results = tiled.recognize(frame, detector.changed_tiles(frame))
+    assert len(engine.regions) == 9
+    assert len(results) == 9
+
+    # 只有卡牌所在的中间分块变化
+    engine.regions.clear()
+    frame = make_frame((200, 40, 40))
+    changed = detector.changed_tiles(frame)
+    assert changed == [1]
+    results = tiled.recognize(frame, changed)
+    assert engine.regions == [detector.tile_rect(1, frame.size)]
+    assert len(results) == 9
+
+
+def test_tiled_ocr_failure_retry():
+    """测试没有文字的分块保存结果，识别失败(None)的分块在下次识别时重试"""
+    engine = RegionRecorder()
+    recognize_regions = engine.recognize_regions
+    # 前三个分块识别失败，其余分块没有文字
+    engine.recognize_regions = lambda image, regions, preprocess=True: [
+        None if index < 3 else [] for index in range(len(regions))]
+    tiled = TiledOCR(engine, grid=(3, 3), margin=0)
+    frame = make_frame()
+    assert tiled.recognize(frame) == []
+
+    engine.recognize_regions = recognize_regions
+    results = tiled.recognize(frame, [4])
+    # 只重新识别变化的分块和识别失败的分块，没有文字的分块不重新识别
+    assert len(engine.regions) == 4
+    assert len(results) == 4
+
+
+def test_tiled_ocr_margin_scale():
+    """测试扩展像素数随画面高度缩放"""
+    tiled = TiledOCR(RegionRecorder(), margin=32)
+    assert tiled.scaled_margin((1920, 1080)) == 32
+    assert tiled.scaled_margin((2560, 1440)) == 43
+    assert tiled.expand((1280, 720, 2560, 1440), (3840, 2160)) == (1216, 656, 2624, 1504)
+
+
+if __name__ == '__main__':
+    test_frame_change()
+    test_tiled_ocr()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试图像预处理
+"""
+
+from PIL import Image, ImageDraw
+
+from image_preprocess import otsu_value, preprocess
+
+
+def make_card():
+    """生成一张渐变背景上有白色文字块的卡牌"""
+    image = Image.linear_gradient("L").rotate(90).resize((400, 200)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 80, 120, 100), fill=(255, 255, 255))
+    draw.rectangle((250, 80, 350, 100), fill=(255, 255, 255))
+    return image
+
+
+def test_threshold_matches_original():
+    """测试默认预处理与原有的PIL lambda二值化结果一致"""
+    image = make_card()
+    original = image.convert("L").point(lambda p: p > 128 and 255)
+    assert preprocess(image).tobytes() == original.tobytes()
+    assert preprocess(image, threshold_value=200).histogram()[255] < original.histogram()[255]
+
+
+def test_otsu_value():
+    """测试大津法阈值位于两类灰度之间"""
+    histogram = [0] * 256
+    histogram[40] = 1000
+    histogram[220] = 100
+    assert 40 <= otsu_value(histogram) < 220
+    # 纯色图像不报错
+    assert 0 <= otsu_value([0] * 100 + [10] + [0] * 155) < 256
+
+
+def test_adaptive_threshold():
+    """测试渐变背景下自适应二值化只保留文字"""
+    image = make_card()
+    fixed = preprocess(image, "threshold")
+    adaptive = preprocess(image, "adaptive")
+    text_pixels = 2 * 101 * 21
+    # 固定阈值把较亮一侧的背景也二值化为白色
+    assert fixed.histogram()[255] > text_pixels * 5
+    # 自适应二值化保留文字，背景为黑色
+    assert adaptive.getpixel((70, 90)) == 255 and adaptive.getpixel((300, 90)) == 255
+    assert adaptive.getpixel((200, 10)) == 0 and adaptive.getpixel((380, 190)) == 0
+    assert adaptive.histogram()[255] < text_pixels * 1.5
+
+
+def test_stretch_and_upscale():
+    """测试对比度拉伸和小图放大"""
+    image = Image.new("L", (100, 20), 100)
+    ImageDraw.Draw(image).rectangle((10, 5, 50, 15), fill=140)
+    stretched = preprocess(image, "stretch")
+    assert stretched.getextrema() == (0, 255)
+    assert preprocess(image, "none", upscale_min_height=40).size == (200, 40)
+    assert preprocess(image, "none", upscale_min_height=10).size == (100, 20)
+
+
+if __name__ == '__main__':
+    test_threshold_matches_original()
+    test_otsu_value()
+    test_adaptive_threshold()
+    test_stretch_and_upscale()
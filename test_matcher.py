@@ -4,7 +4,16 @@
 测试匹配逻辑
 """
 
-from data_matcher import DataMatcher
+import os
+import threading
+
+import pytest
+
+from data_matcher import AhoCorasick, DataMatcher
+from fuzzy_index import FuzzyNameIndex, NGramIndex, ngrams, substring_distance
+from strategy_watcher import StrategyFileWatcher
+from strategy_index import (DFAAhoCorasick, FlatAhoCorasick, Strategy, StrategyIndex, build_automaton,
+                            create_automaton, load_index, read_strategy_csv)
 
 
 def test_matcher():
@@ -52,5 +61,345 @@ def test_matcher():
         print()
 
 
+def test_read_strategy_csv(tmp_path):
+    """测试自动识别编码，缺少的列补为None"""
+    dm = DataMatcher('货币战争策略数据.csv')
+    gbk_rows, encoding = read_strategy_csv('货币战争策略数据.csv')
+    assert encoding == 'gbk'
+    assert gbk_rows == [s.to_dict() for s in dm.strategy_data]
+    
+    path = tmp_path / 'strategies.csv'
+    path.write_text('类别,名称,效果,推荐\n敌方强化,复仇心切,伤害+8%\n,,,\n', encoding='utf-8-sig')
+    rows, encoding = read_strategy_csv(str(path))
+    assert encoding == 'utf-8-sig'
+    assert rows == [{'类别': '敌方强化', '名称': '复仇心切', '效果': '伤害+8%', '推荐': None}]
+
+
+def test_flat_automaton():
+    """测试展开为数组的AC自动机和DFA与原有实现的搜索结果相同"""
+    patterns = ['复仇心切', '仇心切切', '第三位面强化', '位面强化', '心切', 'abcd', 'bcd', 'c']
+    tree = AhoCorasick()
+    for index, pattern in enumerate(patterns):
+        tree.add_pattern(pattern, index)
+    tree.build_fail_links()
+    dfa = create_automaton(build_automaton([(p, i) for i, p in enumerate(patterns)]))
+    assert isinstance(dfa, DFAAhoCorasick)
+    # 转移表超过上限时使用稀疏的转移和失败指针
+    flat = create_automaton(build_automaton([(p, i) for i, p in enumerate(patterns)], max_dfa_entries=10))
+    assert isinstance(flat, FlatAhoCorasick)
+    for text in ['送复仇心切切', '第三位面强化', 'xabcdx', '位面强第三位面', '', 'ccc', '\U0001f600复仇心切!']:
+        assert sorted(dfa.search(text)) == sorted(tree.search(text))
+        assert sorted(flat.search(text)) == sorted(tree.search(text))
+
+
+def test_strategy_index_rebuild(tmp_path):
+    """测试索引文件在CSV变化时自动重新编译"""
+    csv_path = tmp_path / 'strategies.csv'
+    index_path = str(tmp_path / 'strategies.idx')
+    csv_path.write_text('类别,名称,效果,推荐\n敌方强化,复仇心切,伤害+8%,\n', encoding='utf-8')
+    index = load_index(str(csv_path), index_path)
+    assert index.source is not None  # 使用内存映射
+    assert [s.to_dict() for s in index.records] == [{'类别': '敌方强化', '名称': '复仇心切', '效果': '伤害+8%', '推荐': None}]
+    assert index.automaton.search('送复仇心切') == [0]
+    index.close()
+    
+    # CSV未变化时直接打开索引文件
+    index = load_index(str(csv_path), index_path)
+    assert index.is_current(str(csv_path))
+    old_path = index.path
+    
+    # CSV变化后写入新的索引文件，不覆盖仍在使用的旧文件
+    csv_path.write_text('类别,名称,效果,推荐\n敌方强化,复仇心切,伤害+8%,\n位面强化,第三位面强化,速度+60%,准备\n',
+                        encoding='utf-8')
+    dm = DataMatcher(str(csv_path), index_path)
+    assert len(dm.strategy_data) == 2
+    assert [s['名称'] for s in dm.match_strategy([{'text': '第三位面强化', 'score': 1.0}])] == ['第三位面强化']
+    assert dm.strategy_index.path != old_path
+    assert index.records[0]['名称'] == '复仇心切'
+    index.close()
+    new_path = dm.strategy_index.path
+    dm.strategy_index.close()
+    
+    # 损坏的索引文件重新编译
+    with open(new_path, 'wb') as f:
+        f.write(b'broken')
+    index = load_index(str(csv_path), index_path)
+    assert len(index.records) == 2
+    index.close()
+    assert isinstance(StrategyIndex(open(new_path, 'rb').read()).records[1], Strategy)
+    # 旧版本的索引文件已删除
+    assert sorted(str(path) for path in tmp_path.glob('strategies.*.idx')) == [new_path]
+
+
+def test_strategy_index_reload_mapped(tmp_path, monkeypatch):
+    """测试热加载时不覆盖、不依赖删除仍被内存映射的索引文件(模拟Windows)"""
+    import strategy_index
+    mapped = set()
+    open_index = StrategyIndex.open.__func__
+
+    def open_mapped(cls, path):
+        index = open_index(cls, path)
+        mapped.add(path)
+        return index
+
+    def replace(src, dst):
+        if dst in mapped:
+            raise PermissionError("文件已被内存映射")
+        os.rename(src, dst)
+
+    def remove(path):
+        if path in mapped:
+            raise PermissionError("文件已被内存映射")
+        os.unlink(path)
+
+    monkeypatch.setattr(StrategyIndex, 'open', classmethod(open_mapped))
+    monkeypatch.setattr(strategy_index.os, 'replace', replace)
+    monkeypatch.setattr(strategy_index.os, 'remove', remove)
+
+    csv_path = tmp_path / 'strategies.csv'
+    contents = ['类别,名称,效果,推荐\n敌方强化,复仇心切,伤害+8%,\n',
+                '类别,名称,效果,推荐\n敌方强化,战个痛快,伤害+8%,\n']
+    csv_path.write_text(contents[0], encoding='utf-8')
+    dm = DataMatcher(str(csv_path), str(tmp_path / 'strategies.idx'))
+    for i in range(3):
+        csv_path.write_text(contents[(i + 1) % 2], encoding='utf-8')
+        assert dm.load_strategy_data()
+        # 每次都使用内存映射的索引文件，而不是写入失败后在内存中编译的索引
+        assert dm.strategy_index.path is not None
+        assert dm.strategy_data[0]['名称'] == ['战个痛快', '复仇心切'][i % 2]
+
+
+def test_strategy_records():
+    """测试策略记录按列名、属性和下标访问，解码后缓存"""
+    dm = DataMatcher('货币战争策略数据.csv')
+    records = dm.strategy_data
+    strategy = records[3]
+    assert strategy['名称'] == strategy.name == strategy[1]
+    assert records[3] is strategy and records[-1] is records[len(records) - 1]
+    assert dm.get_strategy_by_name(strategy.name) is strategy
+    with pytest.raises(AttributeError):
+        strategy.name = '其他'
+    with pytest.raises(IndexError):
+        records[len(records)]
+    
+    # 导出为DataFrame需要安装pandas
+    pytest.importorskip('pandas')
+    frame = records.to_dataframe()
+    assert list(frame.columns) == ['类别', '名称', '效果', '推荐']
+    assert frame.iloc[3]['名称'] == strategy.name
+
+
+def test_match_stream():
+    """测试逐块输入时立即返回完成的匹配及其位置"""
+    dm = DataMatcher('货币战争策略数据.csv')
+    stream = dm.match_stream()
+    hits = stream.feed({'text': '送复仇心切', 'score': 0.78})
+    assert [(dm.strategy_data[h['index']]['名称'], h['start'], h['end']) for h in hits] == [('复仇心切', (0, 1), (0, 5))]
+    # 低置信度的文本块不参与匹配，但占用文本块下标
+    assert stream.feed({'text': '战个痛快', 'score': 0.5}) == []
+    # 跨文本块的匹配
+    assert stream.feed({'text': '第三位', 'score': 1.0}) == []
+    hits = stream.feed({'text': '面强化', 'score': 1.0})
+    assert [(h['start'], h['end']) for h in hits] == [((2, 0), (3, 3))]
+    # 已经匹配过的策略不再返回
+    assert stream.feed({'text': '复仇心切', 'score': 1.0}) == []
+    assert [s['名称'] for s in stream.strategies()] == ['复仇心切', '第三位面强化']
+    
+    # 只有去掉非汉字字符后才能匹配时，位置对应原文本块
+    stream = dm.match_stream()
+    hits = stream.feed({'text': '复仇1心切', 'score': 1.0})
+    assert [(h['start'], h['end']) for h in hits] == [((0, 0), (0, 5))]
+    assert [s['名称'] for s in stream.strategies()] == ['复仇心切']
+
+
+def test_fuzzy_match():
+    """测试个别字识别错误时的容错匹配"""
+    # 形近字替换的代价低于其他替换
+    assert substring_distance('复仇心切', '送复仇心初') == 0.3
+    assert substring_distance('复仇心切', '送复仇心X') == 1.0
+    assert substring_distance('复仇心切', '复仇切') == 1.0
+    
+    index = FuzzyNameIndex([('复仇心切', 0), ('战个痛快', 1), ('切切切切', 2)])
+    assert index.search('送复仇心初') == [(0, 0.3)]
+    assert index.search('切切切切') == [(2, 0.0)]
+    assert index.search('完全无关的文本') == []
+    # 两处非形近字替换后一个二元组也不保留，距离仍在允许范围内(5 * 0.4 = 2)
+    index = FuzzyNameIndex([('星辰大海洋', 0), ('复仇心切', 1)])
+    assert index.search('送星X大Y洋') == [(0, 2.0)]
+    
+    dm = DataMatcher('货币战争策略数据.csv')
+    ocr_results = [{'text': '送复仇心初', 'score': 0.78}]
+    assert dm.match_strategy(ocr_results) == ()
+    assert [s['名称'] for s in dm.match_strategy(ocr_results, fuzzy_threshold=0.6)] == ['复仇心切']
+    # 相似度低于阈值时不匹配
+    assert dm.match_strategy([{'text': '复仇XX', 'score': 1.0}], fuzzy_threshold=0.6) == ()
+    # 精确匹配到策略时不进行容错匹配
+    results = dm.match_strategy([{'text': '战个痛快', 'score': 1.0}, {'text': '复仇心初', 'score': 1.0}],
+                                fuzzy_threshold=0.6)
+    assert [s['名称'] for s in results] == ['战个痛快']
+
+
+def test_match_blocks():
+    """测试逐块匹配保留文本框和置信度"""
+    dm = DataMatcher('货币战争策略数据.csv')
+    ocr_results = [
+        {'text': '战个', 'score': 1.0, 'box': [[0, 0], [10, 0], [10, 5], [0, 5]]},
+        {'text': '痛快', 'score': 1.0, 'box': [[20, 0], [30, 0], [30, 5], [20, 5]]},
+        {'text': '送复仇 心切', 'score': 0.8, 'box': [[100, 50], [150, 50], [150, 60], [100, 60]]},
+        {'text': '应激反应', 'score': 0.95, 'box': [[300, 10], [400, 10], [400, 20], [300, 20]]},
+        {'text': '第三位面强化', 'score': 0.95, 'box': [[200, 10], [280, 10], [280, 20], [200, 20]]},
+        {'text': '战个痛快', 'score': 0.5, 'box': [[0, 80], [40, 80], [40, 90], [0, 90]]},
+    ]
+    hits = dm.match_blocks(ocr_results)
+    # 跨文本块的名称和低置信度的文本块不匹配；置信度相同时按位置从左到右
+    assert [(hit['strategy']['名称'], hit['block']) for hit in hits] == [
+        ('第三位面强化', 4), ('应激反应', 3), ('复仇心切', 2)]
+    # 只保留汉字时匹配到的名称，位置换算回原文
+    assert (hits[2]['start'], hits[2]['end']) == (1, 6)
+    assert hits[2]['box'] == ocr_results[2]['box'] and hits[2]['score'] == 0.8
+
+
+def test_match_cache():
+    """测试相同输入返回缓存的结果，重新加载策略数据时清空缓存"""
+    dm = DataMatcher('货币战争策略数据.csv', match_cache_size=2)
+    ocr_results = [{'text': '战个痛快', 'score': 1.0}, {'text': '噪声', 'score': 0.3}]
+    strategies = dm.match_strategy(ocr_results)
+    assert [s['名称'] for s in strategies] == ['战个痛快']
+    # 低于min_score的文本块不影响结果，置信度变化时仍然命中缓存
+    assert dm.match_strategy([{'text': '战个痛快', 'score': 0.9}, {'text': '其他', 'score': 0.5}]) is strategies
+    # 容错阈值不同的结果分别缓存
+    assert dm.match_strategy(ocr_results, fuzzy_threshold=0.6) is not strategies
+    # 超过容量时淘汰最久未使用的结果
+    dm.match_strategy([{'text': '应激反应', 'score': 1.0}])
+    assert len(dm.match_cache) == 2
+    assert dm.match_strategy(ocr_results) is not strategies
+    
+    dm.load_strategy_data()
+    assert len(dm.match_cache) == 0
+
+
+def test_strategy_watcher(tmp_path):
+    """测试策略数据文件变化后在后台重新加载，正在进行的匹配继续使用旧数据"""
+    csv_path = tmp_path / 'strategies.csv'
+    csv_path.write_text('类别,名称,效果,推荐\n敌方强化,复仇心切,伤害+8%,\n', encoding='utf-8')
+    dm = DataMatcher(str(csv_path), str(tmp_path / 'strategies.idx'))
+    stream = dm.match_stream()
+    reloaded = []
+    watcher = StrategyFileWatcher(dm, interval=60, on_reload=reloaded.append)
+    assert not watcher.check()
+    
+    csv_path.write_text('类别,名称,效果,推荐\n敌方强化,战个痛快,伤害+8%,\n位面强化,复仇心切,速度+60%,准备\n',
+                        encoding='utf-8')
+    mtime = os.stat(csv_path).st_mtime_ns
+    os.utime(csv_path, ns=(mtime, mtime + 10 ** 9))
+    # 文件变化后等下一次检查确认没有继续写入
+    assert not watcher.check()
+    assert watcher.check()
+    assert reloaded == [2] and watcher.reloads == 1
+    assert [s['名称'] for s in dm.match_strategy([{'text': '战个痛快', 'score': 1.0}])] == ['战个痛快']
+    # 重新加载前创建的匹配器仍使用旧的快照
+    assert [h['index'] for h in stream.feed({'text': '复仇心切', 'score': 1.0})] == [0]
+    assert stream.strategies()[0]['效果'] == '伤害+8%'
+    
+    # 新的CSV无法加载时保留原来的策略数据
+    csv_path.write_text('类别,名称,效果,推荐\n', encoding='utf-8')
+    os.utime(csv_path, ns=(mtime, mtime + 2 * 10 ** 9))
+    assert not watcher.check() and not watcher.check()
+    assert len(dm.strategy_data) == 2
+    watcher.close()
+
+
+def test_reload_during_match(tmp_path):
+    """测试匹配与重新加载同时进行时每次匹配都使用一致的数据"""
+    csv_path = tmp_path / 'strategies.csv'
+    contents = ['类别,名称,效果,推荐\n敌方强化,复仇心切,伤害+8%,\n',
+                '类别,名称,效果,推荐\n敌方强化,战个痛快,伤害+8%,\n位面强化,复仇心切,速度+60%,准备\n']
+    csv_path.write_text(contents[0], encoding='utf-8')
+    dm = DataMatcher(str(csv_path), str(tmp_path / 'strategies.idx'), match_cache_size=0)
+    errors = []
+    stop = threading.Event()
+    
+    def match():
+        while not stop.is_set():
+            try:
+                strategies = dm.match_strategy([{'text': '送复仇心切', 'score': 1.0}])
+                assert [s['名称'] for s in strategies] == ['复仇心切']
+            except Exception as e:
+                errors.append(e)
+                return
+    
+    thread = threading.Thread(target=match, daemon=True)
+    thread.start()
+    mtime = os.stat(csv_path).st_mtime_ns
+    try:
+        for i in range(10):
+            csv_path.write_text(contents[(i + 1) % 2], encoding='utf-8')
+            os.utime(csv_path, ns=(mtime, mtime + (i + 1) * 10 ** 9))
+            assert dm.load_strategy_data()
+    finally:
+        stop.set()
+        thread.join()
+    assert errors == []
+
+
+def test_match_many():
+    """测试批量匹配与逐帧匹配的结果相同"""
+    dm = DataMatcher('货币战争策略数据.csv')
+    frames = [
+        [{'text': '战个痛快', 'score': 1.0}, {'text': '应激反应', 'score': 0.5}],
+        [{'text': '送复仇心切', 'score': 0.78}],
+        [{'text': '战个痛快', 'score': 0.9}, {'text': '应激反应', 'score': 0.6}],
+        [{'text': '复仇心初', 'score': 0.9}],
+        [],
+    ]
+    expected = [dm.match_strategy(frame, fuzzy_threshold=0.6) for frame in frames]
+    assert dm.match_many(frames, fuzzy_threshold=0.6) == expected
+    assert dm.match_many(frames * 3, fuzzy_threshold=0.6, workers=2, chunk_size=1) == expected * 3
+
+
+def test_match_many_stale_csv(tmp_path):
+    """测试CSV在加载后变化时，子进程的匹配结果仍对应主进程的策略数据，且不写入索引文件"""
+    csv_path = tmp_path / 'strategies.csv'
+    names = ['复仇心切', '战个痛快', '应激反应', '第三位面强化']
+    csv_path.write_text('类别,名称,效果,推荐\n' + ''.join(f'敌方强化,{name},效果,\n' for name in names),
+                        encoding='utf-8')
+    index_path = str(tmp_path / 'strategies.idx')
+    dm = DataMatcher(str(csv_path), index_path)
+    frames = [[{'text': name, 'score': 1.0}] for name in names]
+    
+    # 调换顺序后不重新加载：子进程使用主进程快照的索引文件
+    csv_path.write_text('类别,名称,效果,推荐\n' + ''.join(f'敌方强化,{name},效果,\n' for name in names[::-1]),
+                        encoding='utf-8')
+    files = sorted(os.listdir(tmp_path))
+    results = dm.match_many(frames, workers=2, chunk_size=1)
+    assert [[s['名称'] for s in strategies] for strategies in results] == [[name] for name in names]
+    assert sorted(os.listdir(tmp_path)) == files
+    
+    # 快照的索引文件已被删除时在当前进程中匹配
+    os.remove(dm.strategy_index.path)
+    results = dm.match_many(frames, workers=2, chunk_size=1)
+    assert [[s['名称'] for s in strategies] for strategies in results] == [[name] for name in names]
+    assert sorted(os.listdir(tmp_path)) == sorted(set(files) - {os.path.basename(dm.strategy_index.path)})
+
+
+def test_ngram_index():
+    """测试名称和效果的n元组BM25索引"""
+    # n元组不跨越标点
+    assert ngrams('AB，CD', sizes=(2,)) == ['AB', 'CD']
+    
+    index = NGramIndex([('复仇心切\n敌人速度提高', 0), ('战个痛快\n敌人血量提高', 1)])
+    results = index.search('战个痛快敌人血量提高')
+    assert results[0] == (1, 1.0)
+    assert all(relevance < 1.0 for _, relevance in results[1:])
+    assert index.search('完全无关') == []
+    
+    dm = DataMatcher('货币战争策略数据.csv')
+    row = dm.strategy_data[3]
+    ocr_results = [{'text': row['名称'], 'score': 0.9}, {'text': row['效果'], 'score': 0.9}]
+    assert [s['名称'] for s in dm.fuzzy_match(ocr_results)] == [row['名称']]
+    # 低置信度的识别结果不参与匹配
+    assert dm.fuzzy_match([{'text': row['效果'], 'score': 0.5}]) == []
+
+
 if __name__ == '__main__':
     test_matcher()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试OCR引擎及引擎进程池
+"""
+
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from ocr_cache import OCRCache
+from ocr_engine import OCREngine
+from ocr_manager import ManagedOCREngine
+from ocr_pool import OCREnginePool
+
+
+def test_transports(fake_engine_path):
+    """测试各种图像传输方式得到相同的结果"""
+    image = Image.new("RGB", (64, 32), (255, 255, 255))
+    for transport in ("png", "png_fast", "bmp", "file"):
+        engine = OCREngine(fake_engine_path, transport=transport)
+        try:
+            results = engine.recognize_text(image)
+            assert [r["text"] for r in results] == ["64x32"]
+        finally:
+            engine.close()
+
+
+def test_regions_no_text_and_failure(fake_engine_path):
+    """测试区域识别区分没有文字(空列表)和识别失败(None)"""
+    engine = OCREngine(fake_engine_path)
+    try:
+        image = Image.new("RGB", (64, 32), (255, 255, 255))
+        results = engine.recognize_regions(image, [(0, 0, 32, 32), (32, 0, 33, 32)])
+        assert [r["text"] for r in results[0]] == ["32x32"] and results[1] == []
+        engine.ocr_api.ret.kill()
+        engine.ocr_api.ret.wait()
+        assert engine.recognize_regions(image, [(0, 0, 32, 32)]) == [None]
+        assert engine.recognize_text(image) == []
+    finally:
+        engine.close()
+
+
+def test_pool_respawn(fake_engine_path):
+    """测试进程池并行识别区域，以及引擎崩溃后重新启动"""
+    pool = OCREnginePool(fake_engine_path, size=2)
+    try:
+        image = Image.new("RGB", (300, 100), (255, 255, 255))
+        regions = [(0, 0, 100, 100), (100, 0, 300, 100), (0, 0, 300, 50)]
+        results = pool.recognize_regions(image, regions)
+        assert [r[0]["text"] for r in results] == ["100x100", "200x100", "300x50"]
+        # 文本框坐标换算为整幅图像中的坐标
+        assert results[1][0]["box"][0] == [100, 0]
+
+        # 杀掉所有引擎进程，请求应在新引擎上完成
+        for engine in list(pool.engines):
+            engine.ocr_api.ret.kill()
+            engine.ocr_api.ret.wait()
+        assert [r["text"] for r in pool.recognize_text(image)] == ["300x100"]
+        assert all(engine.is_alive() for engine in pool.engines)
+    finally:
+        pool.close()
+
+
+def test_pool_close_wakes_waiters(fake_engine_path):
+    """测试关闭进程池后等待空闲引擎的请求立即失败，使用中的引擎不再放回队列"""
+    pool = OCREnginePool(fake_engine_path, size=1)
+    image = Image.new("RGB", (64, 32), (255, 255, 255))
+    engine = pool.acquire_engine()
+    errors = []
+
+    def waiter():
+        try:
+            pool.recognize_text(image)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=waiter, daemon=True)
+    thread.start()
+    pool.close()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+
+    pool.release_engine(engine)
+    with pytest.raises(RuntimeError):
+        pool.recognize_text(image)
+
+
+def test_pool_spawn_failure(fake_engine_path):
+    """测试所有引擎都启动失败时，等待空闲引擎的请求立即失败"""
+    pool = OCREnginePool(fake_engine_path, size=2, transport="unknown", wait=False)
+    try:
+        with pytest.raises(RuntimeError):
+            pool.recognize_text(Image.new("RGB", (64, 32), (255, 255, 255)))
+        assert pool.starting == 0 and not pool.engines
+    finally:
+        pool.close()
+
+
+def wait_until(condition, timeout=10):
+    """等待条件成立"""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.02)
+
+
+def test_managed_engine_restart(fake_engine_path):
+    """测试后台启动、首次识别统计，以及引擎崩溃后重新启动"""
+    manager = ManagedOCREngine(fake_engine_path, heartbeat_interval=60)
+    try:
+        # 构造时不等待引擎启动
+        assert manager.report()["state"] == "starting"
+        image = Image.new("RGB", (64, 32), (255, 255, 255))
+        assert [r["text"] for r in manager.recognize_text(image)] == ["64x32"]
+        report = manager.report()
+        assert report["state"] == "running"
+        assert 0 < report["startup_time"] <= report["first_frame_time"]
+
+        # 进程崩溃后，请求在重新启动的引擎上完成
+        old_engine = manager.engine
+        old_engine.ocr_api.ret.kill()
+        old_engine.ocr_api.ret.wait()
+        assert [r["text"] for r in manager.recognize_text(image)] == ["64x32"]
+        assert manager.engine is not old_engine
+        report = manager.report()
+        assert report["restarts"] == 1
+        assert report["last_recovery_time"] > 0
+    finally:
+        manager.close()
+    assert manager.report()["state"] == "closed"
+
+
+def test_managed_engine_standby(fake_engine_path):
+    """测试心跳发现空闲引擎崩溃后立即切换到备用引擎"""
+    manager = ManagedOCREngine(fake_engine_path, standby=True, heartbeat_interval=0.1)
+    try:
+        wait_until(lambda: manager.report()["standby"])
+        standby = manager.standby
+        manager.engine.ocr_api.ret.kill()
+        # 无需识别请求，由心跳检查发现
+        wait_until(lambda: manager.report()["restarts"] == 1)
+        assert manager.engine is standby
+        # 切换到备用引擎不需要启动新进程，耗时只留宽松的上限，避免CI机器负载高时误报
+        assert manager.report()["last_recovery_time"] < 5
+        image = Image.new("RGB", (48, 16), (255, 255, 255))
+        assert [r["text"] for r in manager.recognize_text(image)] == ["48x16"]
+        # 后台补充新的备用引擎
+        wait_until(lambda: manager.report()["standby"])
+    finally:
+        manager.close()
+
+
+def test_managed_engine_heartbeat_hang(fake_engine_path):
+    """测试心跳卡死时仍按hang_timeout结束引擎进程，之后的请求在新引擎上完成"""
+    manager = ManagedOCREngine(fake_engine_path, heartbeat_interval=0.1, hang_timeout=0.3, backoff=0.1)
+    try:
+        image = Image.new("RGB", (48, 16), (255, 255, 255))
+        assert [r["text"] for r in manager.recognize_text(image)] == ["48x16"]
+        engine = manager.engine
+        process = engine.ocr_api.ret
+
+        def hanging_run_dict(writeDict):
+            # 引擎卡死：不再响应，直到进程被结束
+            process.wait()
+            return {"code": 902, "data": "引擎进程已结束"}
+
+        engine.ocr_api.runDict = hanging_run_dict
+        wait_until(lambda: process.poll() is not None)
+        assert [r["text"] for r in manager.recognize_text(image)] == ["48x16"]
+        assert manager.engine is not engine
+        assert manager.report()["restarts"] == 1
+    finally:
+        manager.close()
+
+
+def test_cache(fake_engine_path, tmp_path):
+    """测试相同内容的图像直接返回缓存结果"""
+    cache = OCRCache(max_entries=2, path=str(tmp_path / "ocr_cache.json"))
+    engine = OCREngine(fake_engine_path, cache=cache)
+    try:
+        image = Image.new("RGB", (64, 32), (255, 255, 255))
+        first = engine.recognize_text(image)
+        # 调用方修改结果不影响缓存
+        first[0]["box"][0][0] = 999
+        # 引擎退出后仍能从缓存得到结果
+        engine.ocr_api.exit()
+        engine.ocr_api = None
+        engine.init_ocr = lambda: None
+        second = engine.recognize_text(image.copy())
+        assert [r["text"] for r in second] == ["64x32"]
+        assert second[0]["box"][0][0] == 0
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    finally:
+        engine.close()
+
+    # 保存后重新加载
+    cache.save()
+    loaded = OCRCache(max_entries=2, path=cache.path)
+    assert len(loaded.entries) == 1
+
+
+def test_cache_eviction():
+    """测试按条目数和存活时间淘汰"""
+    now = [0.0]
+    cache = OCRCache(max_entries=2, max_age=10, clock=lambda: now[0])
+    cache.put("a", [])
+    cache.put("b", [])
+    assert cache.get("a") == []
+    cache.put("c", [])
+    # b最久未使用，被淘汰
+    assert cache.get("b") is None
+    assert cache.get("a") == [] and cache.get("c") == []
+    now[0] = 10
+    assert cache.get("a") == []
+    now[0] = 10.5
+    assert cache.get("a") is None
+    assert cache.hit_rate() == 4 / 6
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试识别流水线
+"""
+
+import threading
+import time
+
+from pipeline import LatestQueue, RecognitionPipeline
+from scheduler import AdaptiveScheduler
+
+
+def test_latest_queue():
+    """测试队列已满时丢弃旧数据并合并"""
+    queue = LatestQueue(merge=lambda old, new: new + old)
+    queue.put([1])
+    queue.put([2])
+    queue.put([3])
+    assert queue.get() == [3, 2, 1]
+    assert queue.dropped == 2
+    assert queue.get(timeout=0.01) is None
+
+
+def test_pipeline_drops_stale_frames():
+    """测试OCR较慢时只识别最新画面"""
+    frames = iter(range(1000))
+    recognized = []
+    matched = threading.Event()
+    results = []
+
+    def slow_ocr(frame):
+        recognized.append(frame)
+        time.sleep(0.05)
+        return frame
+
+    def on_match(strategies, latency):
+        results.append((strategies, latency))
+        if len(results) >= 3:
+            matched.set()
+
+    pipeline = RecognitionPipeline(
+        lambda: next(frames), slow_ocr, lambda ocr: ocr * 10,
+        on_match=on_match, capture_interval=0.005
+    )
+    pipeline.start()
+    try:
+        assert matched.wait(2)
+    finally:
+        pipeline.stop()
+
+    # 截图速度远高于OCR速度，中间的画面被丢弃
+    assert recognized[1] - recognized[0] > 1
+    assert results[0][0] == recognized[0] * 10
+    report = pipeline.report()
+    assert report["ocr"]["dropped"] > 0
+    assert report["capture"]["throughput"] > report["ocr"]["throughput"]
+
+
+def test_pipeline_dispatch():
+    """测试回调交给dispatch执行，停止后不再执行上一次运行的回调"""
+    pending = []
+    shown = []
+    frames = iter(range(1000))
+    pipeline = RecognitionPipeline(
+        lambda: next(frames), lambda frame: frame, lambda ocr: ocr,
+        on_ocr=lambda ocr: shown.append((ocr, threading.current_thread())),
+        capture_interval=0.01, dispatch=pending.append
+    )
+
+    def wait_for(count):
+        deadline = time.time() + 2
+        while len(pending) < count and time.time() < deadline:
+            time.sleep(0.01)
+        return len(pending) >= count
+
+    pipeline.start()
+    try:
+        assert wait_for(1)
+        # 回调在调用dispatch的一方执行，而不是阶段线程
+        pending[0]()
+        assert shown[0][1] is threading.current_thread()
+        assert wait_for(2)
+    finally:
+        pipeline.stop()
+    # 停止后执行的回调被丢弃
+    for func in pending[1:]:
+        func()
+    assert len(shown) == 1
+
+    # 重新启动后上一次运行的队列和回调不影响新的运行
+    old_queue = pipeline.ocr_queue
+    pipeline.start()
+    try:
+        assert pipeline.ocr_queue is not old_queue
+    finally:
+        pipeline.stop()
+
+
+def test_adaptive_scheduler():
+    """测试画面稳定后才触发识别，静止时轮询间隔退避"""
+    scheduler = AdaptiveScheduler(min_interval=0.05, max_interval=0.4, backoff=2,
+                                  settle_time=0.15, max_settle_wait=1.0)
+    # 画面静止时间隔指数退避到上限
+    for _ in range(5):
+        assert not scheduler.observe(False, now=0.0)
+    assert scheduler.interval == 0.4
+
+    # 动画期间不触发，稳定settle_time后触发，延迟从变化开始计算
+    assert not scheduler.observe(True, now=1.0)
+    assert scheduler.interval == 0.05
+    assert not scheduler.observe(True, now=1.1)
+    assert not scheduler.observe(False, now=1.2)
+    assert scheduler.observe(False, now=1.3)
+    assert scheduler.last_trigger_origin == 1.0
+    assert not scheduler.observe(False, now=1.4)
+
+    # 持续变化超过max_settle_wait也会触发
+    triggered = [scheduler.observe(True, now=2.0 + i * 0.1) for i in range(12)]
+    assert triggered.index(True) == 10
+
+    # CPU预算限制轮询频率
+    scheduler.cpu_budget = 0.5
+    scheduler.work_average = 0.2
+    assert abs(scheduler.next_interval(0.2) - 0.2) < 1e-9
+
+
+def test_scheduler_probe():
+    """测试画面静止时只截取缩略图，定期完整截图，有待稳定的变化时完整截图"""
+    scheduler = AdaptiveScheduler(settle_time=0.1, full_poll_interval=2.0)
+    # 第一次轮询完整截图
+    assert not scheduler.should_probe(now=0.0)
+    assert scheduler.observe(True, now=0.0) is False
+    # 变化尚未稳定时完整截图
+    assert not scheduler.should_probe(now=0.05)
+    assert scheduler.observe(False, now=0.2)
+    assert scheduler.should_probe(now=0.3)
+    scheduler.observe(False, now=0.3, probe=True)
+    assert scheduler.probes == 1
+    # 距上一次完整截图超过full_poll_interval
+    assert scheduler.should_probe(now=2.1)
+    assert not scheduler.should_probe(now=2.3)
+    scheduler.observe(False, now=2.3)
+    assert scheduler.should_probe(now=2.5)
+    scheduler.request_full_poll()
+    assert not scheduler.should_probe(now=2.6)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试PaddleOCR-json调用接口
+"""
+
+import asyncio
+import io
+import socket
+
+from PIL import Image
+
+from PPOCR_api import AsyncPPOCR, GetAsyncOcrApi, GetOcrApi
+
+
+def image_bytes(width, height):
+    """生成指定大小的PNG图片字节流"""
+    buffer = io.BytesIO()
+    Image.new("L", (width, height), 255).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_pipe_run_bytes(fake_engine_path):
+    """测试管道模式识别字节流"""
+    ocr = GetOcrApi(fake_engine_path)
+    try:
+        result = ocr.runBytes(image_bytes(40, 20))
+        assert result["code"] == 100
+        assert result["data"][0]["text"] == "40x20"
+    finally:
+        ocr.exit()
+
+
+def test_socket_prefetch_many(fake_engine_path):
+    """测试套接字模式预连接及多条指令同时在途"""
+    ocr = GetOcrApi(fake_engine_path, ipcMode="socket", prefetch=2)
+    try:
+        assert ocr.runBytes(image_bytes(10, 10))["data"][0]["text"] == "10x10"
+
+        sizes = [(30 + i, 20) for i in range(8)]
+        results = ocr.runBytesMany([image_bytes(w, h) for w, h in sizes])
+        assert [r["data"][0]["text"] for r in results] == [f"{w}x{h}" for w, h in sizes]
+
+        # 连接复用后仍能正常处理单条指令
+        assert ocr.runDict({})["code"] == 200
+    finally:
+        ocr.exit()
+
+
+def test_socket_stale_prefetch(fake_engine_path):
+    """测试预连接失效时用新连接重试，补足预连接失败不影响本次指令"""
+    ocr = GetOcrApi(fake_engine_path, ipcMode="socket", prefetch=2)
+    try:
+        assert ocr.runBytes(image_bytes(10, 10))["code"] == 100
+
+        # 换成已被对方关闭的连接，模拟引擎重启后留下的预连接
+        idle = ocr._PPOCR_socket__idleSockets
+        while idle:
+            idle.popleft().close()
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            for _ in range(2):
+                stale = socket.create_connection(server.getsockname())
+                server.accept()[0].close()
+                idle.append(stale)
+
+        connect = ocr._PPOCR_socket__connect
+        calls = []
+
+        def failing_connect():
+            calls.append(None)
+            if len(calls) > 1:
+                raise ConnectionRefusedError("prefetch failed")
+            return connect()
+
+        ocr._PPOCR_socket__connect = failing_connect
+        assert ocr.runBytes(image_bytes(20, 10))["data"][0]["text"] == "20x10"
+        assert len(idle) == 0
+
+        del ocr._PPOCR_socket__connect
+        assert ocr.runBytes(image_bytes(30, 10))["data"][0]["text"] == "30x10"
+        assert len(idle) == 2
+    finally:
+        ocr.exit()
+
+
+def test_async_pipelined(fake_engine_path):
+    """测试asyncio接口，多条指令同时在途且结果顺序正确"""
+    sizes = [(20 + i, 10 + i) for i in range(6)]
+
+    async def run(ipcMode):
+        async with AsyncPPOCR(fake_engine_path, ipcMode=ipcMode) as ocr:
+            results = await asyncio.gather(*(ocr.runBytes(image_bytes(w, h)) for w, h in sizes))
+            assert [r["data"][0]["text"] for r in results] == [f"{w}x{h}" for w, h in sizes]
+            assert (await ocr.runDict({}))["code"] == 200
+
+    asyncio.run(run("pipe"))
+    asyncio.run(run("socket"))
+
+
+def test_async_crash(fake_engine_path):
+    """测试引擎进程退出后等待中的指令得到错误码"""
+
+    async def run():
+        ocr = await GetAsyncOcrApi(fake_engine_path)
+        ocr.ret.kill()
+        await ocr.ret.wait()
+        result = await ocr.runBytes(image_bytes(10, 10))
+        assert result["code"] == 902
+        await ocr.exit()
+
+    asyncio.run(run())
+
+
+def test_async_write_failure(fake_engine_path):
+    """测试写入指令失败后，后续指令的结果不会错位"""
+
+    async def run():
+        async with AsyncPPOCR(fake_engine_path) as ocr:
+            write = ocr.ret.stdin.write
+
+            def failing_write(data):
+                ocr.ret.stdin.write = write
+                raise BrokenPipeError("write failed")
+
+            ocr.ret.stdin.write = failing_write
+            assert (await ocr.runBytes(image_bytes(10, 10)))["code"] == 902
+            assert (await ocr.runBytes(image_bytes(30, 20)))["data"][0]["text"] == "30x20"
+            assert (await ocr.runBytes(image_bytes(40, 20)))["data"][0]["text"] == "40x20"
+
+    asyncio.run(run())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试识别区域配置
+"""
+
+from PIL import Image, ImageDraw
+
+from roi_learner import LearnedRegionOCR, ROILearner, matched_blocks
+from roi_profiles import ROIProfile, RegionOCR, compose_regions
+
+
+class BandEngine:
+    """把图像中每一段含白色像素的连续行识别为一个文本框的模拟OCR引擎"""
+
+    def __init__(self):
+        self.sizes = []
+
+    def recognize_text(self, image, preprocess=True):
+        self.sizes.append(image.size)
+        # 只保留白色像素
+        mask = image.convert("L").point(lambda p: 255 if p > 200 else 0)
+        results = []
+        start = None
+        for y in range(mask.height + 1):
+            has_text = y < mask.height and mask.crop((0, y, mask.width, y + 1)).getbbox() is not None
+            if has_text and start is None:
+                start = y
+            elif not has_text and start is not None:
+                left, _, right, _ = mask.crop((0, start, mask.width, y)).getbbox()
+                box = [[left, start], [right, start], [right, y], [left, y]]
+                results.append({"text": f"{left},{start}", "score": 0.9, "box": box})
+                start = None
+        return results
+
+
+def make_frame(size=(1920, 1080)):
+    """生成一张模拟的选择界面截图，每张卡牌标题处有一块白色文字，右上角有HUD数字"""
+    image = Image.new("RGB", size, (30, 30, 60))
+    draw = ImageDraw.Draw(image)
+    profile = ROIProfile.from_config("currency_war_titles")
+    for left, top, right, bottom in profile.regions(size):
+        draw.rectangle((left + 20, top + 30, right - 20, top + 60), fill=(255, 255, 255))
+    draw.rectangle((1700, 20, 1880, 60), fill=(255, 255, 255))
+    return image
+
+
+def test_profile_layout():
+    """测试按画面比例选择区域"""
+    profile = ROIProfile.from_config("currency_war_cards")
+    regions_16_9 = profile.regions((1920, 1080))
+    regions_21_9 = profile.regions((2560, 1080))
+    assert len(regions_16_9) == 3
+    assert regions_16_9[0] == (326, 238, 710, 842)
+    # 宽屏下卡牌靠近中间
+    assert regions_21_9[0][0] > 2560 * 0.2
+    # 没有精确对应的比例时使用最接近的比例
+    assert profile.layout((1280, 720)) == profile.layout((1920, 1080))
+    assert profile.layout((1920, 1200)) != profile.layout((1920, 1080))
+
+
+def test_compose_regions():
+    """测试区域拼接"""
+    image = make_frame()
+    regions = [(0, 0, 100, 50), (200, 100, 250, 130)]
+    composite, offsets = compose_regions(image, regions, spacing=10)
+    assert composite.size == (100, 90)
+    assert offsets == [0, 60]
+
+
+def test_region_ocr():
+    """测试拼接识别和分别识别的结果一致，且不包含区域外的文字"""
+    image = make_frame()
+    profile = ROIProfile.from_config("currency_war_titles")
+    engine = BandEngine()
+    results = RegionOCR(engine, profile).recognize(image)
+
+    # 只发送一张拼接图像，像素数远小于整幅画面
+    assert len(engine.sizes) == 1
+    width, height = engine.sizes[0]
+    assert width * height < 1920 * 1080 / 10
+
+    # 文本框坐标换算回原图，HUD文字不在结果中
+    expected = []
+    for left, top, right, bottom in profile.regions(image.size):
+        expected.append([[left + 20, top + 30], [right - 19, top + 30], [right - 19, top + 61], [left + 20, top + 61]])
+    assert [result["box"] for result in results] == expected
+
+    class SeparateEngine(BandEngine):
+        def recognize_regions(self, image, regions, preprocess=True):
+            region_results = []
+            for left, top, right, bottom in regions:
+                results = self.recognize_text(image.crop((left, top, right, bottom)))
+                for result in results:
+                    result["box"] = [[x + left, y + top] for x, y in result["box"]]
+                region_results.append(results)
+            return region_results
+
+    separate = RegionOCR(SeparateEngine(), profile, mode="separate").recognize(image)
+    assert [result["box"] for result in separate] == expected
+
+
+def test_region_preprocess_options():
+    """测试按区域放大后文本框换算回原图坐标"""
+    image = make_frame()
+    layouts = {"16:9": [
+        ("标题1", (0.170, 0.220, 0.370, 0.320), {"preprocess": "otsu", "upscale_min_height": 216}),
+        ("标题2", (0.400, 0.220, 0.600, 0.320), "threshold"),
+    ]}
+    profile = ROIProfile("test", layouts)
+    assert profile.region_options(image.size)[0] == {"preprocess": "otsu", "upscale_min_height": 216}
+    engine = BandEngine()
+    results = RegionOCR(engine, profile).recognize(image)
+    # 第一个区域放大为2倍
+    assert engine.sizes[0][0] == 768
+    first = results[0]["box"]
+    assert abs(first[0][0] - 346) <= 1 and abs(first[0][1] - 268) <= 1
+    assert abs(first[2][0] - 691) <= 1 and abs(first[2][1] - 299) <= 1
+
+
+def test_matched_blocks():
+    """测试找出与策略名称有关的文本块"""
+    box = [[0, 0], [10, 0], [10, 10], [0, 10]]
+    ocr_results = [
+        {"text": "【买入】投资策略", "score": 0.9, "box": box},
+        {"text": "投资", "score": 0.9, "box": box},
+        {"text": "12345", "score": 0.9, "box": box},
+        {"text": "刷新", "score": 0.9, "box": box},
+    ]
+    blocks = matched_blocks(ocr_results, [{"名称": "投资策略"}])
+    assert [block["text"] for block in blocks] == ["【买入】投资策略", "投资"]
+
+
+def test_learned_region_ocr():
+    """测试学习到识别区域后只识别区域，并定期识别完整画面"""
+    image = make_frame()
+    engine = BandEngine()
+    learned = LearnedRegionOCR(engine, ROILearner(min_hits=1.5), refresh_interval=3)
+    strategies = [{"名称": "策略"}]
+
+    def recognize_and_learn(useful):
+        results = learned.recognize(image)
+        # 卡牌标题位于画面上方三分之一，HUD位于右上角
+        for result in results:
+            result["text"] = "策略" if useful(result) else "99"
+        learned.feedback(results, strategies if results else [])
+        return results
+
+    # 完整画面中识别到HUD和三张卡牌标题所在的一行
+    is_title = lambda result: result["box"][0][1] > 200
+    # 学习到区域之前识别完整画面
+    assert len(recognize_and_learn(is_title)) == 2
+    assert len(recognize_and_learn(is_title)) == 2
+    assert engine.sizes == [(1920, 1080), (1920, 1080)]
+
+    # 只有标题所在的一行被学习为识别区域
+    regions = learned.learner.regions(image.size)
+    assert len(regions) == 1
+    left, top, right, bottom = regions[0]
+    assert top < 268 < bottom < 400 and left < 346 and right > 1574
+
+    for _ in range(3):
+        results = recognize_and_learn(is_title)
+        assert [result["text"] for result in results] == ["策略"]
+    assert engine.sizes[2][1] < 200
+    # 每隔refresh_interval帧识别一次完整画面
+    assert len(recognize_and_learn(is_title)) == 2
+
+    # 区域内没有匹配到策略时下一帧识别完整画面
+    assert len(learned.recognize(image)) == 1
+    learned.feedback([], [])
+    assert len(learned.recognize(image)) == 2
+
+
+if __name__ == '__main__':
+    test_profile_layout()
+    test_compose_regions()
+    test_region_ocr()
+    test_region_preprocess_options()
+    test_matched_blocks()
+    test_learned_region_ocr()
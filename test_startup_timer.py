@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试启动耗时统计及延迟导入
+"""
+
+import subprocess
+import sys
+
+from startup_timer import StartupTimer
+
+
+def test_startup_timer():
+    """测试阶段耗时和模块导入耗时统计"""
+    timer = StartupTimer()
+    timer.track_imports()
+    try:
+        sys.modules.pop("colorsys", None)
+        import colorsys  # noqa: F401
+    finally:
+        timer.stop_tracking()
+    timer.mark("导入")
+    assert [name for name, _ in timer.phases] == ["导入"]
+    assert "colorsys" in [name for _, _, name, _ in timer.imports]
+    report = timer.report(min_import_time=0)
+    assert "导入" in report and "colorsys" in report
+
+
+def test_lazy_imports():
+    """测试匹配和识别相关模块导入时不加载pandas、NumPy和PaddleOCR API"""
+    code = (
+        "import sys\n"
+        "import data_matcher, ocr_engine, ocr_manager, roi_profiles, image_preprocess\n"
+        "print(sorted({'pandas', 'numpy', 'PPOCR_api', 'asyncio'} & set(sys.modules)))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
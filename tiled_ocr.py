@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分块增量OCR模块
+"""
+
+from frame_change import grid_rects
+
+
+def box_center(box):
+    """计算文本框中心点
+
+    Args:
+        box: 文本框四角坐标[[x, y], ...]
+
+    Returns:
+        tuple: 中心点(x, y)
+    """
+    xs = [point[0] for point in box]
+    ys = [point[1] for point in box]
+    return (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+
+
+class TiledOCR:
+    """分块增量OCR类
+
+    将画面划分为网格，保存每个分块上一次的识别结果，
+    只对发生变化的分块重新识别，再把所有分块的结果合并为一个列表。
+    没有文字的分块同样保存结果，识别失败(引擎返回None)的分块不保存，下次有分块变化时重新识别。
+    """
+
+    def __init__(self, ocr_engine, grid=(3, 3), margin=32, reference_height=1080):
+        """初始化分块增量OCR
+
+        Args:
+            ocr_engine: OCR引擎实例，需要提供recognize_regions方法
+            grid: 分块网格(列数, 行数)，应与画面变化检测器的网格一致
+            margin: 裁剪分块时向外扩展的像素数，避免切断跨越分块边界的文字
+            reference_height: margin对应的画面高度，其他分辨率下按画面高度等比缩放margin
+        """
+        self.ocr_engine = ocr_engine
+        self.grid = grid
+        self.margin = margin
+        self.reference_height = reference_height
+        self.image_size = None
+        self.tile_results = {}  # 分块序号到识别结果的映射
+
+    def recognize(self, image, changed_tiles=None, preprocess=True):
+        """识别图像，只重新识别变化的分块
+
+        Args:
+            image: PIL.Image对象
+            changed_tiles: 变化分块的序号列表，为None时识别全部分块
+            preprocess: 是否进行图像预处理
+
+        Returns:
+            list: 合并后的识别结果，按文本框从上到下、从左到右排序
+        """
+        tiles = grid_rects(image.size, self.grid)
+
+        # 画面尺寸变化时之前的结果全部失效
+        if image.size != self.image_size:
+            self.tile_results.clear()
+            self.image_size = image.size
+
+        if changed_tiles is None:
+            changed_tiles = range(len(tiles))
+        # 没有缓存结果的分块也需要识别
+        dirty = sorted(set(changed_tiles) | (set(range(len(tiles))) - set(self.tile_results)))
+
+        if dirty:
+            regions = [self.expand(tiles[index], image.size) for index in dirty]
+            region_results = self.ocr_engine.recognize_regions(image, regions, preprocess)
+            for index, results in zip(dirty, region_results):
+                if results is None:
+                    self.tile_results.pop(index, None)
+                    continue
+                left, top, right, bottom = tiles[index]
+                # 只保留中心点落在分块内部的文本，扩展区域中的文本归属于相邻分块
+                kept = []
+                for result in results:
+                    x, y = box_center(result["box"])
+                    if left <= x < right and top <= y < bottom:
+                        kept.append(result)
+                self.tile_results[index] = kept
+
+        merged = [result for index in range(len(tiles)) for result in self.tile_results.get(index, [])]
+        merged.sort(key=lambda result: (box_center(result["box"])[1], box_center(result["box"])[0]))
+        return merged
+
+    def scaled_margin(self, size):
+        """按画面高度缩放扩展像素数，1440p、4K下文字更大，需要扩展得更多
+
+        Args:
+            size: 图像大小(宽, 高)
+
+        Returns:
+            int: 扩展的像素数
+        """
+        return round(self.margin * size[1] / self.reference_height)
+
+    def expand(self, rect, size):
+        """向外扩展分块区域
+
+        Args:
+            rect: 分块区域(left, top, right, bottom)
+            size: 图像大小(宽, 高)
+
+        Returns:
+            tuple: 扩展后的区域
+        """
+        left, top, right, bottom = rect
+        margin = self.scaled_margin(size)
+        return (
+            max(0, left - margin),
+            max(0, top - margin),
+            min(size[0], right + margin),
+            min(size[1], bottom + margin)
+        )
+
+    def reset(self):
+        """清除所有分块的识别结果"""
+        self.image_size = None
+        self.tile_results.clear()